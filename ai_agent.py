@@ -1,167 +1,459 @@
-import google.generativeai as genai
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
 import json
 import math
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import strategies
+from jump_physics import (
+    config_for,
+    heuristic_for,
+    heuristic_power,
+    landing_error,
+    load_heuristic_profile,
+    physics_key,
+    simulate_jump,
+)
+from power_correction import PowerCorrection
+from prompt_templates import (
+    DEFAULT_PROMPT_VARIANT,
+    PROMPT_VARIANTS,
+    PromptStats,
+    compile_prompt,
+    estimate_tokens,
+)
 
 app = Flask(__name__)
 CORS(app)  # 允许跨域请求
 os.environ["http_proxy"] = "http://127.0.0.1:7890"
 os.environ["https_proxy"] = "http://127.0.0.1:7890"
 
+INDEX_SAVE_EVERY = 20  # 最近邻索引每新增多少条写回一次文件
+PENDING_LIMIT = 1000  # 最多保留多少条等待回报落点的推荐（更早的直接丢弃）
+MAX_CANDIDATES = 10  # 多候选验证模式每次请求最多的候选数
+CANDIDATE_DIGITS = 2  # 候选力度保留的小数位数（整数力度经常落不到平台上）
+
+# Gemini SDK 导入需要数秒，只在第一次真正调用模型时导入
+_genai = None
+
+
+def get_genai():
+    """延迟导入 google.generativeai"""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+
+        _genai = genai
+    return _genai
+
+
 class JumpAIAgent:
-    def __init__(self, api_key=None):
-        self.api_key = api_key
+    def __init__(
+        self,
+        api_key=None,
+        prompt_variant=DEFAULT_PROMPT_VARIANT,
+        candidate_count=0,
+        physics_only=False,
+        fake_model=None,
+        index=None,
+        index_path=None,
+        fallback_policy="heuristic",
+    ):
+        self.api_key = None
+        self.model = None
+        # 本地替身模型（fake_gemini.FakeGeminiModel），设置后不再使用Gemini
+        self.fake_model = fake_model
+        self.prompt_variant = prompt_variant
+        # 多候选验证模式下每次请求的候选数，0 表示只请求单个力度
+        self.candidate_count = candidate_count
+        # 纯物理模式：从不导入或调用Gemini SDK
+        self.physics_only = physics_only
+        self.prompt_stats = PromptStats()
+        # 物理计算推荐的系数配置 {物理参数: 系数}，启动时读取一次
+        self.heuristic_profile = load_heuristic_profile()
+        # 历史成功跳跃的最近邻索引（jump_index.JumpIndex）：命中时不请求模型，
+        # 模型给出的力度经物理模拟验证成功后加入索引，每 INDEX_SAVE_EVERY 条写回 index_path
+        self.index = index
+        self.index_path = index_path
+        self.index_added = 0
+        self._index_lock = threading.Lock()
+        # 未启用AI或AI失败时使用的推荐策略（strategies.py 中不请求模型的策略），按物理参数缓存
+        if fallback_policy not in strategies.STRATEGIES:
+            raise ValueError(f"未知的推荐策略: {fallback_policy}")
+        if strategies.STRATEGIES[fallback_policy].uses_model:
+            raise ValueError(f"备用推荐策略不能请求模型: {fallback_policy}")
+        self.fallback_policy = fallback_policy
+        self._fallbacks = {}
+        # 按回报的落点在线修正推荐力度（power_correction.PowerCorrection），对所有来源生效；
+        # pending 记录带ID的推荐 {推荐ID: (玩家位置, 目标平台, 物理参数, 来源, 原始力度, 推荐力度)}
+        self.corrections = PowerCorrection()
+        self.pending = OrderedDict()
+        self._pending_lock = threading.Lock()
+        if fake_model is not None:
+            self.model = fake_model
         if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel("gemini-2.5-flash-preview-05-20")
+            self.set_api_key(api_key)
+
+    @property
+    def ai_available(self):
+        """当前是否会向模型请求推荐"""
+        if self.physics_only:
+            return False
+        if self.fake_model is not None:
+            return True
+        # 检查API Key是否有效（简单验证）
+        return bool(
+            self.api_key
+            and len(self.api_key) >= 10
+            and not self.api_key.startswith("test_")
+        )
 
     def set_api_key(self, api_key):
         """设置API Key"""
         self.api_key = api_key
+        if self.physics_only or self.fake_model is not None:
+            return
+        genai = get_genai()
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel("gemini-2.5-flash-preview-05-20")
 
+    def set_prompt_variant(self, variant):
+        """切换prompt变体"""
+        if variant not in PROMPT_VARIANTS:
+            raise ValueError(f"未知的prompt变体: {variant}")
+        self.prompt_variant = variant
+
     def calculate_physics_recommendation(
         self, player_pos, target_platform, physics_params
     ):
         """
         基于物理计算的简单推荐算法（备用方案）
         """
+        coefficients = heuristic_for(config_for(physics_params), self.heuristic_profile)
+        power = heuristic_power(player_pos, target_platform, coefficients)
         px, py = player_pos
         plat_left, plat_top, plat_right = target_platform
-        vx_mul, vy_mul, gravity = physics_params
-
-        # 目标平台中心
         target_x = (plat_left + plat_right) / 2
-        target_y = plat_top
+        print(
+            f"[物理计算推荐] 玩家({px},{py}) -> 平台中心({target_x:.1f},{plat_top:.1f})，"
+            f"系数={tuple(coefficients)}，推荐力度={power}"
+        )
+        return power
 
-        # 计算水平和垂直距离
-        dx = target_x - px
-        dy = target_y - py
+    def fallback_recommendation(self, player_pos, target_platform, physics_params):
+        """备用推荐：默认为物理计算推荐，fallback_policy 策略无法作答时也退回物理计算推荐"""
+        if self.fallback_policy == "heuristic":
+            return self.calculate_physics_recommendation(
+                player_pos, target_platform, physics_params
+            )
+        config = config_for(physics_params)
+        key = physics_key(config)
+        if key not in self._fallbacks:
+            self._fallbacks[key] = strategies.make_strategy(self.fallback_policy, config)
+        power = self._fallbacks[key](player_pos, target_platform)
+        if power is None:
+            return self.calculate_physics_recommendation(
+                player_pos, target_platform, physics_params
+            )
+        print(f"[{self.fallback_policy}推荐] 推荐力度={power}")
+        return power
 
-        # 使用抛物线运动公式估算
-        # 假设最优角度约为45度，调整力度
-        distance = math.sqrt(dx * dx + dy * dy)
+    def get_ai_recommendation(
+        self, player_pos, target_platform, physics_params, candidates=None
+    ):
+        """
+        获取AI推荐的跳跃力度
+        candidates > 0 时使用多候选验证模式，默认取 self.candidate_count
+        """
+        power, _ = self.recommend(
+            player_pos, target_platform, physics_params, candidates
+        )
+        return power
 
-        # 基础力度估算
-        base_power = min(100, max(0, distance / 3))
+    def recommend(self, player_pos, target_platform, physics_params, candidates=None):
+        """
+        获取推荐力度及其来源，返回 (力度, 来源)，力度已按该区域回报过的落点修正
+        来源: "index" - 最近邻索引命中；"ai" - 模型给出；"physics" - 未启用AI；
+        "fallback" - AI失败后物理计算兜底
+        """
+        _, power, source = self._corrected_recommend(
+            player_pos, target_platform, physics_params, candidates
+        )
+        return power, source
 
-        # 根据高度差调整
-        if dy < 0:  # 需要向上跳
-            height_adjustment = abs(dy) / 2
-            base_power += height_adjustment
-        else:  # 向下跳
-            base_power -= dy / 4
-        print(
-            f"[物理计算推荐] 玩家({px},{py}) -> 平台中心({target_x:.1f},{target_y:.1f})，"
-            f"dx={dx:.1f}, dy={dy:.1f}, distance={distance:.1f}，推荐力度={base_power:.1f}"
+    def recommend_with_id(
+        self, player_pos, target_platform, physics_params, candidates=None
+    ):
+        """
+        获取修正后的推荐并登记，返回 (力度, 来源, 推荐ID)；
+        跳跃结束后用 report_outcome(推荐ID, ...) 回报落点
+        """
+        raw_power, power, source = self._corrected_recommend(
+            player_pos, target_platform, physics_params, candidates
         )
-        return max(0, min(100, int(base_power)))
+        recommendation_id = uuid.uuid4().hex
+        with self._pending_lock:
+            self.pending[recommendation_id] = (
+                player_pos,
+                target_platform,
+                physics_params,
+                source,
+                raw_power,
+                power,
+            )
+            if len(self.pending) > PENDING_LIMIT:
+                self.pending.popitem(last=False)
+        return power, source, recommendation_id
 
-    def get_ai_recommendation(self, player_pos, target_platform, physics_params):
+    def report_outcome(self, recommendation_id, landing_x, success, power=None):
         """
-        获取AI推荐的跳跃力度
+        回报一次推荐的落点，更新该区域的修正倍数并返回它（回报不可靠时为 None）。
+        landing_x 为下落到平台顶面高度时的水平位置；power 为实际使用的力度，
+        默认即推荐的力度（浏览器手动改过力度时应一并回报）。推荐ID未知时抛出 KeyError
         """
-        # 检查API Key是否有效（简单验证）
-        if (
-            not self.api_key
-            or len(self.api_key) < 10
-            or self.api_key.startswith("test_")
-        ):
-            print("使用物理计算模式（API Key无效或未设置）")
-            return self.calculate_physics_recommendation(
+        with self._pending_lock:
+            entry = self.pending.pop(recommendation_id)
+        player_pos, target_platform, physics_params, source, raw_power, recommended = entry
+        if power is None:
+            power = recommended
+        factor = self.corrections.update(
+            player_pos,
+            target_platform,
+            physics_params,
+            source,
+            power / raw_power if raw_power else 0.0,
+            landing_x,
+        )
+        print(
+            f"[落点回报] 来源={source}，力度={power}，落点x={landing_x}，"
+            f"{'成功' if success else '失败'}，修正倍数={factor}"
+        )
+        return factor
+
+    def pending_count(self):
+        """等待回报落点的推荐数"""
+        with self._pending_lock:
+            return len(self.pending)
+
+    def _corrected_recommend(
+        self, player_pos, target_platform, physics_params, candidates=None
+    ):
+        """recommend 和 recommend_with_id 共用：返回 (修正前力度, 修正后力度, 来源)"""
+        raw_power, source = self.raw_recommend(
+            player_pos, target_platform, physics_params, candidates
+        )
+        power = self.corrections.apply(
+            player_pos, target_platform, physics_params, source, raw_power
+        )
+        return raw_power, power, source
+
+    def raw_recommend(
+        self, player_pos, target_platform, physics_params, candidates=None
+    ):
+        """未经落点修正的推荐，返回 (力度, 来源)"""
+        if self.index is not None:
+            power = self.index.lookup(player_pos, target_platform, physics_params)
+            if power is not None:
+                print(f"[索引命中] 推荐力度={power}")
+                return power, "index"
+
+        if not self.ai_available:
+            print("使用物理计算模式（纯物理模式或API Key无效/未设置）")
+            power = self.fallback_recommendation(
                 player_pos, target_platform, physics_params
             )
+            return power, "physics"
 
-        px, py = player_pos
-        plat_left, plat_top, plat_right = target_platform
-        vx_mul, vy_mul, gravity = physics_params
-
-        prompt = f"""你是一个跳一跳游戏的AI助手。根据以下物理参数和游戏状态，计算出最佳的跳跃力度。
-
-=== 游戏参数详解 ===
-
-【坐标系统】
-- 玩家位置: ({px}, {py})
-  * X坐标：水平位置，数值越大越靠右
-  * Y坐标：垂直位置，数值越大越靠下（屏幕坐标系）
-  
-- 目标平台位置: 左边界={plat_left}, 顶部={plat_top}, 右边界={plat_right}
-  * 左边界(L)：平台的最左侧X坐标
-  * 顶部(T)：平台的最上方Y坐标（着陆目标高度）
-  * 右边界(R)：平台的最右侧X坐标
-  * 平台宽度：{plat_right - plat_left}像素
-  * 平台中心X坐标：{(plat_left + plat_right) / 2}
-
-【物理运动参数】
-- 横向速度倍率 vx_multiplier = {vx_mul}
-  * 含义：跳跃力度转换为水平速度的系数
-  * 计算：水平初始速度 = 跳跃力度 × {vx_mul}
-  * 影响：数值越大，相同力度下水平飞行距离越远
-  
-- 纵向速度倍率 vy_multiplier = {vy_mul}
-  * 含义：跳跃力度转换为垂直速度的系数
-  * 计算：垂直初始速度 = 跳跃力度 × {vy_mul}
-  * 特点：负值表示向上运动（与屏幕坐标系相反）
-  * 影响：绝对值越大，相同力度下跳跃高度越高
-  
-- 重力加速度 gravity = {gravity}
-  * 含义：每个时间步长内，垂直速度的增量
-  * 作用：使玩家在空中时持续向下加速
-  * 影响：数值越大，抛物线弧度越陡峭
-
-【距离分析】
-- 水平距离：{(plat_left + plat_right) / 2 - px:.1f}像素（正值=需向右跳，负值=需向左跳）
-- 垂直距离：{plat_top - py:.1f}像素（正值=需向下跳，负值=需向上跳）
-- 直线距离：{math.sqrt(((plat_left + plat_right) / 2 - px)**2 + (plat_top - py)**2):.1f}像素
-
-【物理运动方程】
-每个时间步长内：
-1. 水平位置更新：x = x + vx（匀速运动）
-2. 垂直位置更新：y = y + vy
-3. 垂直速度更新：vy = vy + gravity（重力加速）
-
-【成功条件】
-玩家必须在垂直下降过程中，在Y坐标接近平台顶部({plat_top})时，
-X坐标落在平台范围内[{plat_left}, {plat_right}]。
-
-请根据抛物线运动轨迹计算最佳跳跃力度（0-100整数）。
-
-只需要输出推荐的跳跃力度数字，不需要其他解释。"""
+        candidates = self.candidate_count if candidates is None else candidates
+        if candidates > 0:
+            recommended_power = self.select_verified_candidate(
+                player_pos, target_platform, physics_params, candidates
+            )
+        else:
+            template = compile_prompt(self.prompt_variant, physics_params)
+            prompt = template.render(player_pos, target_platform)
+            recommended_power, _ = self.query_model(
+                prompt, scenario=(player_pos, target_platform, physics_params)
+            )
+
+        if recommended_power is not None:
+            if self.index is not None:
+                self.learn(player_pos, target_platform, physics_params, recommended_power)
+            return recommended_power, "ai"
 
+        # 如果AI返回无效结果或请求失败，使用物理计算备用
+        power = self.fallback_recommendation(player_pos, target_platform, physics_params)
+        return power, "fallback"
+
+    def learn(self, player_pos, target_platform, physics_params, power):
+        """模型给出的力度能成功着陆时加入最近邻索引，定期写回索引文件"""
+        success, _, _ = simulate_jump(
+            power, player_pos, target_platform, config_for(physics_params)
+        )
+        if not success:
+            return
+        self.index.add(player_pos, target_platform, physics_params, power)
+        with self._index_lock:
+            self.index_added += 1
+            due = self.index_added % INDEX_SAVE_EVERY == 0
+        if self.index_path and due:
+            self.index.save(self.index_path)
+
+    def _generation_config(self, **kwargs):
+        """生成参数；替身模型不需要导入Gemini SDK"""
+        if self.fake_model is not None:
+            return SimpleNamespace(**kwargs)
+        return get_genai().types.GenerationConfig(**kwargs)
+
+    def _generate(self, prompt, variant, generation_config, scenario=None):
+        """调用模型并记录token数与延迟，失败时返回 None"""
+        # 替身模型根据场景信息作答
+        extra = {}
+        if getattr(self.model, "accepts_scenario", False):
+            extra["scenario"] = scenario
+        start = time.perf_counter()
         try:
             # 使用更简单的错误处理，不使用signal（Windows兼容）
             response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.1, max_output_tokens=50
-                ),
+                prompt, generation_config=generation_config, **extra
             )
-
             ai_response = response.text.strip()
+        except Exception as e:
+            self.prompt_stats.record(
+                variant,
+                estimate_tokens(prompt),
+                time.perf_counter() - start,
+                ok=False,
+            )
+            print(f"AI推荐失败: {e}")
+            return None
+
+        self.prompt_stats.record(
+            variant, estimate_tokens(prompt), time.perf_counter() - start
+        )
+        print(f"AI响应: {ai_response}")
+        return ai_response
 
-            # 提取数字
-            import re
-            print(f"AI响应: {ai_response}")
-            power_match = re.search(r"\d+", ai_response)
-            if power_match:
-                recommended_power = int(power_match.group())
-                if 0 <= recommended_power <= 100:
-                    return recommended_power
+    def query_model(self, prompt, variant=None, scenario=None):
+        """
+        向模型发送prompt，返回 (推荐力度, 原始响应)
+        响应无效或请求失败时推荐力度为 None
+        """
+        ai_response = self._generate(
+            prompt,
+            variant or self.prompt_variant,
+            self._generation_config(temperature=0.1, max_output_tokens=50),
+            scenario,
+        )
+        if ai_response is None:
+            return None, None
+
+        # 提取数字（保留小数：整数力度经常落不到平台上）
+        power_match = re.search(r"\d+(?:\.\d+)?", ai_response)
+        if power_match:
+            recommended_power = float(power_match.group())
+            if 0 <= recommended_power <= 100:
+                return round_power(recommended_power), ai_response
+        return None, ai_response
+
+    def query_candidates(self, prompt, variant=None, scenario=None):
+        """
+        以JSON格式请求多个候选力度，返回 (候选力度列表, 原始响应)
+        """
+        ai_response = self._generate(
+            prompt,
+            variant or self.prompt_variant,
+            self._generation_config(
+                temperature=0.1,
+                max_output_tokens=100,
+                response_mime_type="application/json",
+            ),
+            scenario,
+        )
+        if ai_response is None:
+            return [], None
+        return parse_candidates(ai_response), ai_response
 
-            # 如果AI返回无效结果，使用物理计算备用
-            return self.calculate_physics_recommendation(
-                player_pos, target_platform, physics_params
-            )
+    def select_verified_candidate(
+        self, player_pos, target_platform, physics_params, candidates
+    ):
+        """
+        一次请求获取多个候选力度，用物理模拟逐个验证，
+        返回能成功着陆且最接近平台中心的候选；都不能着陆时返回 None
+        """
+        template = compile_prompt(self.prompt_variant, physics_params, candidates)
+        prompt = template.render(player_pos, target_platform)
+        powers, _ = self.query_candidates(
+            prompt, scenario=(player_pos, target_platform, physics_params)
+        )
 
-        except Exception as e:
-            print(f"AI推荐失败: {e}")
-            # 使用物理计算作为备用
-            return self.calculate_physics_recommendation(
-                player_pos, target_platform, physics_params
+        config = config_for(physics_params)
+        best_power = None
+        best_error = None
+        for power in powers:
+            success, final_pos, _ = simulate_jump(
+                power, player_pos, target_platform, config
             )
+            if not success:
+                continue
+            error = abs(landing_error(final_pos, target_platform))
+            if best_error is None or error < best_error:
+                best_power, best_error = power, error
+
+        print(f"[候选验证] 候选={powers}，选中={best_power}")
+        return best_power
+
+
+def round_power(power):
+    """保留 CANDIDATE_DIGITS 位小数，整数值的力度返回 int"""
+    power = round(float(power), CANDIDATE_DIGITS)
+    return int(power) if power.is_integer() else power
+
+
+def parse_candidates(text):
+    """
+    解析模型返回的候选力度，兼容 {"candidates": [...]}、纯数组
+    以及带代码块或多余文字的输出，返回限制在 0-100 之间、
+    保留 CANDIDATE_DIGITS 位小数并去重后的力度列表
+    """
+    cleaned = text.strip().strip("`")
+    if cleaned.startswith("json"):
+        cleaned = cleaned[4:]
+
+    values = None
+    try:
+        parsed = json.loads(cleaned)
+        if isinstance(parsed, dict):
+            parsed = parsed.get("candidates", [])
+        if isinstance(parsed, list):
+            values = parsed
+    except ValueError:
+        pass
+
+    if values is None:
+        # JSON不合法时退化为提取所有数字
+        values = re.findall(r"-?\d+(?:\.\d+)?", text)
+
+    powers = []
+    for value in values:
+        if isinstance(value, bool):
+            continue
+        try:
+            power = float(value)
+        except (TypeError, ValueError):
+            continue
+        if not math.isfinite(power):
+            continue
+        power = round_power(min(100.0, max(0.0, power)))
+        if power not in powers:
+            powers.append(power)
+    return powers
 
 
 # 全局AI Agent实例
@@ -200,17 +492,28 @@ def get_recommendation():
         player_pos = data["player_pos"]  # [px, py]
         target_platform = data["target_platform"]  # [left, top, right]
         physics_params = data["physics_params"]  # [vx_mul, vy_mul, gravity]
+        candidates = data.get("candidates")  # 可选：多候选验证模式的候选数
+        if candidates is not None and (
+            not isinstance(candidates, int)
+            or isinstance(candidates, bool)
+            or not 0 <= candidates <= MAX_CANDIDATES
+        ):
+            return jsonify(
+                {"error": f"candidates 必须是 0-{MAX_CANDIDATES} 之间的整数"}
+            ), 400
 
-        # 获取AI推荐
-        recommended_power = ai_agent.get_ai_recommendation(
-            player_pos, target_platform, physics_params
+        # 获取AI推荐（跳跃结束后凭推荐ID回报落点）
+        recommended_power, source, recommendation_id = ai_agent.recommend_with_id(
+            player_pos, target_platform, physics_params, candidates
         )
 
         return jsonify(
             {
                 "status": "success",
                 "recommended_power": recommended_power,
-                "using_ai": bool(ai_agent.api_key),
+                "using_ai": ai_agent.ai_available,
+                "source": source,
+                "recommendation_id": recommendation_id,
             }
         )
 
@@ -218,17 +521,107 @@ def get_recommendation():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/report_outcome", methods=["POST"])
+def report_outcome():
+    """回报推荐的落点，用于在线修正之后的推荐"""
+    try:
+        data = request.json
+
+        required_fields = ["recommendation_id", "landing_x", "success"]
+        for field in required_fields:
+            if field not in data:
+                return jsonify({"error": f"缺少必需参数: {field}"}), 400
+
+        power = data.get("power")  # 可选：实际使用的力度
+        try:
+            correction = ai_agent.report_outcome(
+                data["recommendation_id"],
+                float(data["landing_x"]),
+                bool(data["success"]),
+                None if power is None else float(power),
+            )
+        except KeyError:
+            return jsonify({"error": "未知或已过期的推荐ID"}), 404
+
+        return jsonify({"status": "success", "correction": correction})
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/correction_stats", methods=["GET"])
+def correction_stats():
+    """力度修正表的规模和回报统计"""
+    return jsonify(
+        {
+            "status": "success",
+            "pending": ai_agent.pending_count(),
+            **ai_agent.corrections.stats(),
+        }
+    )
+
+
+@app.route("/api/set_prompt_variant", methods=["POST"])
+def set_prompt_variant():
+    """切换prompt变体"""
+    try:
+        data = request.json
+        ai_agent.set_prompt_variant(data.get("variant"))
+        return jsonify({"status": "success", "variant": ai_agent.prompt_variant})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/prompt_stats", methods=["GET"])
+def prompt_stats():
+    """各prompt变体的token数和延迟统计"""
+    return jsonify(
+        {
+            "status": "success",
+            "current_variant": ai_agent.prompt_variant,
+            "variants": list(PROMPT_VARIANTS),
+            "stats": ai_agent.prompt_stats.snapshot(),
+        }
+    )
+
+
+@app.route("/api/index_stats", methods=["GET"])
+def index_stats():
+    """最近邻索引的规模和命中率"""
+    if ai_agent.index is None:
+        return jsonify({"status": "disabled"})
+    return jsonify(
+        {
+            "status": "success",
+            "index_path": ai_agent.index_path,
+            "added": ai_agent.index_added,
+            **ai_agent.index.stats(),
+        }
+    )
+
+
 @app.route("/api/health", methods=["GET"])
 def health_check():
     """健康检查端点"""
-    return jsonify({"status": "healthy", "ai_enabled": bool(ai_agent.api_key)})
+    return jsonify(
+        {
+            "status": "healthy",
+            "ai_enabled": ai_agent.ai_available,
+            "physics_only": ai_agent.physics_only,
+            "fake_model": ai_agent.fake_model is not None,
+            "index": ai_agent.index is not None,
+        }
+    )
 
 
 @app.route("/", methods=["GET"])
 def index():
     """根路径，提供使用说明和服务状态"""
     ai_status = "未启用"
-    if ai_agent.api_key:
+    if ai_agent.ai_available:
         ai_status = "已启用"
 
     return f"""
@@ -308,7 +701,7 @@ def index():
             }}
             .ai-status {{
                 font-weight: bold;
-                color: {'#4CAF50' if ai_agent.api_key else '#FF9800'};
+                color: {'#4CAF50' if ai_agent.ai_available else '#FF9800'};
             }}
         </style>
     </head>
@@ -340,6 +733,11 @@ def index():
                 <ul>
                     <li><strong>POST</strong> /api/set_api_key - 设置Gemini API Key</li>
                     <li><strong>POST</strong> /api/get_recommendation - 获取跳跃推荐</li>
+                    <li><strong>POST</strong> /api/report_outcome - 回报落点（在线修正推荐）</li>
+                    <li><strong>POST</strong> /api/set_prompt_variant - 切换prompt变体</li>
+                    <li><strong>GET</strong> /api/prompt_stats - prompt统计</li>
+                    <li><strong>GET</strong> /api/index_stats - 最近邻索引统计</li>
+                    <li><strong>GET</strong> /api/correction_stats - 力度修正统计</li>
                     <li><strong>GET</strong> /api/health - 健康检查</li>
                 </ul>
             </div>
@@ -361,11 +759,108 @@ def favicon():
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="跳一跳 AI Agent 服务器")
+    parser.add_argument(
+        "--physics-only",
+        action="store_true",
+        help="纯物理计算模式，不加载Gemini SDK，启动更快",
+    )
+    parser.add_argument(
+        "--fake-model",
+        action="store_true",
+        help="使用本地Gemini替身（fake_gemini.py），用于离线负载测试",
+    )
+    parser.add_argument(
+        "--fake-latency",
+        default="lognormal",
+        choices=["fixed", "uniform", "lognormal"],
+        help="替身模型的延迟分布",
+    )
+    parser.add_argument(
+        "--fake-latency-ms", type=float, default=300.0, help="替身模型的延迟中位数（毫秒）"
+    )
+    parser.add_argument(
+        "--fake-latency-spread",
+        type=float,
+        default=0.5,
+        help="uniform为±毫秒，lognormal为对数标准差",
+    )
+    parser.add_argument(
+        "--fake-error-rate", type=float, default=0.0, help="替身模型的错误率"
+    )
+    parser.add_argument(
+        "--fake-formats",
+        default="plain=1",
+        help="响应格式权重，例如 plain=0.8,verbose=0.1,malformed=0.1",
+    )
+    parser.add_argument(
+        "--fake-noise", type=float, default=0.0, help="在求解器力度上叠加的噪声标准差"
+    )
+    parser.add_argument("--fake-seed", type=int, help="替身模型的随机种子")
+    parser.add_argument(
+        "--index",
+        nargs="?",
+        const="jump_index.json",
+        help="启用最近邻索引（jump_index.py 生成，默认 jump_index.json；不存在时从空索引开始）",
+    )
+    parser.add_argument(
+        "--index-radius", type=float, help="索引命中半径（像素，默认沿用索引文件中的值）"
+    )
+    parser.add_argument(
+        "--fallback-policy",
+        default="heuristic",
+        choices=sorted(
+            name for name, strategy in strategies.STRATEGIES.items() if not strategy.uses_model
+        ),
+        help="未启用AI或AI失败时的推荐策略（strategies.py），默认为物理计算推荐",
+    )
+    args = parser.parse_args()
+    ai_agent.physics_only = args.physics_only
+    ai_agent.fallback_policy = args.fallback_policy
+    if args.index:
+        from jump_index import DEFAULT_RADIUS, JumpIndex
+
+        if os.path.exists(args.index):
+            ai_agent.index = JumpIndex.load(args.index, args.index_radius)
+        else:
+            ai_agent.index = JumpIndex(args.index_radius or DEFAULT_RADIUS)
+        ai_agent.index_path = args.index
+    if args.fake_model:
+        from fake_gemini import FakeGeminiModel, parse_formats
+
+        ai_agent.fake_model = ai_agent.model = FakeGeminiModel(
+            latency_dist=args.fake_latency,
+            latency_ms=args.fake_latency_ms,
+            latency_spread=args.fake_latency_spread,
+            error_rate=args.fake_error_rate,
+            formats=parse_formats(args.fake_formats),
+            noise=args.fake_noise,
+            seed=args.fake_seed,
+        )
+
     print("🚀 跳一跳 AI Agent 服务器启动中...")
+    if ai_agent.physics_only:
+        print("⚙️  纯物理计算模式（不加载Gemini SDK）")
+    elif ai_agent.fake_model is not None:
+        print("🧪 使用本地Gemini替身模型")
+    if ai_agent.fallback_policy != "heuristic":
+        print(f"🛟 备用推荐策略: {ai_agent.fallback_policy}")
+    if ai_agent.index is not None:
+        print(
+            f"📇 最近邻索引: {ai_agent.index_path}（{ai_agent.index.size} 条，"
+            f"命中半径 {ai_agent.index.radius} 像素）"
+        )
     print("📡 服务器地址: http://localhost:5000")
     print("🤖 API端点:")
     print("   POST /api/set_api_key - 设置Gemini API Key")
     print("   POST /api/get_recommendation - 获取跳跃推荐")
+    print("   POST /api/report_outcome - 回报落点（在线修正推荐）")
+    print("   POST /api/set_prompt_variant - 切换prompt变体")
+    print("   GET  /api/prompt_stats - prompt统计")
+    print("   GET  /api/index_stats - 最近邻索引统计")
+    print("   GET  /api/correction_stats - 力度修正统计")
     print("   GET  /api/health - 健康检查")
     print("=" * 50)
     print("💡 提示：")
@@ -4,14 +4,24 @@
 """
 
 import json
-import matplotlib.pyplot as plt
-import numpy as np
 from datetime import datetime
 import statistics
 
-# 设置中文字体
-plt.rcParams["font.sans-serif"] = ["SimHei", "Microsoft YaHei"]
-plt.rcParams["axes.unicode_minus"] = False
+# matplotlib 导入和字体设置耗时较长，只在第一次画图时进行
+_plt = None
+
+
+def get_pyplot():
+    """延迟导入 matplotlib.pyplot 并设置中文字体"""
+    global _plt
+    if _plt is None:
+        import matplotlib.pyplot as plt
+
+        # 设置中文字体
+        plt.rcParams["font.sans-serif"] = ["SimHei", "Microsoft YaHei"]
+        plt.rcParams["axes.unicode_minus"] = False
+        _plt = plt
+    return _plt
 
 
 class ResultAnalyzer:
@@ -39,6 +49,7 @@ class ResultAnalyzer:
         if not self.data:
             return
 
+        plt = get_pyplot()
         scores = [r["score"] for r in self.data["results"]]
 
         plt.figure(figsize=(12, 8))
@@ -93,6 +104,8 @@ class ResultAnalyzer:
         if not self.data:
             return
 
+        plt = get_pyplot()
+
         # 提取跳跃数据
         all_jumps = []
         for game in self.data["results"]:
@@ -190,11 +203,106 @@ class ResultAnalyzer:
         plt.show()
         print("📊 跳跃分析图表已保存: jump_analysis.png")
 
+    def margin_entries(self):
+        """每次跳跃的落点余量记录（batch_ai_test 开启 MARGIN_ANALYSIS 时才有）"""
+        return [
+            jump["margin"]
+            for game in self.data["results"]
+            for jump in game["jumps"]
+            if "margin" in jump
+        ]
+
+    def margin_stats(self):
+        """落点余量统计，日志中没有余量记录时返回 None"""
+        import numpy as np
+
+        margins = self.margin_entries()
+        if not margins:
+            return None
+        widths = [m["window_width"] for m in margins]
+        positions = [m["position"] for m in margins if m["position"] is not None]
+        edges = [m["edge_margin"] for m in margins if m["edge_margin"] is not None]
+        errors = [m["landing_error"] for m in margins]
+        return {
+            "jumps": len(margins),
+            "no_window_rate": sum(1 for w in widths if w == 0) / len(widths),
+            "mean_window_width": statistics.mean(widths),
+            # 旧日志没有 window_gaps，按无间断处理
+            "gapped_window_rate": sum(1 for m in margins if m.get("window_gaps", 0) > 0)
+            / len(margins),
+            "median_position": statistics.median(positions) if positions else None,
+            "inside_window_rate": (
+                sum(1 for e in edges if e >= 0) / len(edges) if edges else None
+            ),
+            "median_edge_margin": statistics.median(edges) if edges else None,
+            "landing_error_mean": statistics.mean(errors),
+            "landing_error_std": statistics.stdev(errors) if len(errors) > 1 else 0,
+            "landing_error_abs_p95": float(np.percentile(np.abs(errors), 95)),
+        }
+
+    def generate_margin_chart(self):
+        """生成落点余量分布图（获胜力度区间宽度、所选力度的位置、到区间边界的距离、落点偏差）"""
+        if not self.data:
+            return
+        margins = self.margin_entries()
+        if not margins:
+            return
+
+        plt = get_pyplot()
+        widths = [m["window_width"] for m in margins]
+        positions = [m["position"] for m in margins if m["position"] is not None]
+        edges = [m["edge_margin"] for m in margins if m["edge_margin"] is not None]
+        errors = [m["landing_error"] for m in margins]
+
+        plt.figure(figsize=(12, 8))
+
+        # 子图1: 获胜力度区间宽度，越宽说明这一跳越容易
+        plt.subplot(2, 2, 1)
+        plt.hist(widths, bins=30, alpha=0.7, color="skyblue", edgecolor="black")
+        plt.title("获胜力度区间宽度分布")
+        plt.xlabel("区间宽度（力度）")
+        plt.ylabel("次数")
+        plt.grid(True, alpha=0.3)
+
+        # 子图2: 所选力度在区间中的位置，集中在0.5附近说明推荐稳健，贴近0或1说明是侥幸
+        plt.subplot(2, 2, 2)
+        plt.hist(positions, bins=30, alpha=0.7, color="lightgreen", edgecolor="black")
+        plt.axvline(0, color="red", linestyle="--")
+        plt.axvline(1, color="red", linestyle="--")
+        plt.title("所选力度在获胜区间中的位置")
+        plt.xlabel("相对位置（0-1 为区间内）")
+        plt.ylabel("次数")
+        plt.grid(True, alpha=0.3)
+
+        # 子图3: 到最近边界的距离，即推荐还能承受多大的力度误差
+        plt.subplot(2, 2, 3)
+        plt.hist(edges, bins=30, alpha=0.7, color="orange", edgecolor="black")
+        plt.axvline(0, color="red", linestyle="--")
+        plt.title("到获胜区间边界的距离")
+        plt.xlabel("力度（负值为区间外）")
+        plt.ylabel("次数")
+        plt.grid(True, alpha=0.3)
+
+        # 子图4: 落点偏差
+        plt.subplot(2, 2, 4)
+        plt.hist(errors, bins=30, alpha=0.7, color="lightcoral", edgecolor="black")
+        plt.title("落点偏差分布")
+        plt.xlabel("与平台中心的水平距离（像素，正值偏右）")
+        plt.ylabel("次数")
+        plt.grid(True, alpha=0.3)
+
+        plt.tight_layout()
+        plt.savefig("margin_analysis.png", dpi=300, bbox_inches="tight")
+        plt.show()
+        print("📊 落点余量图表已保存: margin_analysis.png")
+
     def generate_performance_report(self):
         """生成性能报告"""
         if not self.data:
             return
 
+        import numpy as np
+
         results = self.data["results"]
 
         # 基础统计
@@ -230,6 +338,9 @@ class ResultAnalyzer:
                 "worst_success_rate": min(success_rates),
             },
         }
+        margin = self.margin_stats()
+        if margin is not None:
+            report["margin_stats"] = margin
 
         # 保存报告
         with open("performance_report.json", "w", encoding="utf-8") as f:
@@ -271,6 +382,21 @@ class ResultAnalyzer:
                 f"  最差成功率: {report['success_stats']['worst_success_rate']:.2%}\n"
             )
 
+            if margin is not None:
+                f.write("\n📐 落点余量统计:\n")
+                f.write(f"  无解跳跃比例: {margin['no_window_rate']:.2%}\n")
+                f.write(f"  平均获胜区间宽度: {margin['mean_window_width']:.3f}\n")
+                f.write(f"  获胜力度有间断的比例: {margin['gapped_window_rate']:.2%}\n")
+                if margin["median_position"] is not None:
+                    f.write(f"  区间内位置中位数: {margin['median_position']:.3f}\n")
+                    f.write(f"  落在区间内的比例: {margin['inside_window_rate']:.2%}\n")
+                    f.write(f"  到区间边界的距离中位数: {margin['median_edge_margin']:.3f}\n")
+                f.write(
+                    f"  落点偏差: {margin['landing_error_mean']:+.1f}±"
+                    f"{margin['landing_error_std']:.1f} 像素，"
+                    f"95%分位 {margin['landing_error_abs_p95']:.1f} 像素\n"
+                )
+
         print("📋 性能报告已生成:")
         print("   - performance_report.json (详细数据)")
         print("   - performance_report.txt (文本报告)")
@@ -293,21 +419,23 @@ class ResultAnalyzer:
         # 生成各种分析
         self.generate_score_distribution_chart()
         self.generate_jump_analysis_chart()
+        self.generate_margin_chart()
         report = self.generate_performance_report()
 
         print("\n🎉 分析完成!")
         print("📊 生成的文件:")
         print("   - score_analysis.png (得分分析图)")
         print("   - jump_analysis.png (跳跃分析图)")
+        if "margin_stats" in report:
+            print("   - margin_analysis.png (落点余量图)")
         print("   - performance_report.json (性能数据)")
         print("   - performance_report.txt (性能报告)")
 
 
 if __name__ == "__main__":
-    try:
-        import matplotlib.pyplot as plt
-        import numpy as np
-    except ImportError:
+    from importlib.util import find_spec
+
+    if find_spec("matplotlib") is None or find_spec("numpy") is None:
         print("❌ 需要安装额外依赖:")
         print("   pip install matplotlib numpy")
         exit(1)
@@ -8,52 +8,116 @@ GEMINI_API_KEY = "your_api_key_here"  # 在这里设置您的Gemini API Key
 AI_AGENT_URL = "http://localhost:5000"  # AI Agent服务地址
 TOTAL_GAMES = 50  # 总游戏次数
 USE_AI_MODE = True  # True=使用AI推荐, False=仅使用物理计算
+AI_CANDIDATES = 0  # >0 时每次请求让AI给出多个候选力度，由服务端物理验证后选择
+REPORT_OUTCOMES = True  # True=使用AI服务时每跳之后回报落点（/api/report_outcome），服务端据此在线修正推荐
 OUTPUT_FILE = "ai_game_results.txt"  # 结果输出文件
 DETAILED_LOG = "ai_detailed_log.json"  # 详细日志文件
+SCENARIO_SEED = None  # 设置整数种子后每场游戏的平台序列可复现，None=使用全局随机数
+SCENARIO_CORPUS = None  # 预生成的场景语料文件（scenarios.py 生成），优先于 SCENARIO_SEED
+PROFILE_PHASES = False  # True=统计每场游戏中各阶段（推荐/模拟/平台生成/相机/记录）的耗时
+PROFILE_CPROFILE = False  # True=同时用cProfile做函数级剖析（需先开启PROFILE_PHASES）
+PROFILE_OUTPUT = "profile"  # 剖析结果文件名前缀
+MEMORY_PROFILE = False  # True=用tracemalloc统计每场游戏/每次跳跃的内存增长和主要分配位置（会明显变慢）
+MEMORY_LIMIT_MB = 2048  # 预计内存超过该值（MB）时发出警告
+MAX_JUMPS = 100  # 每场游戏的跳跃次数上限（防止无限循环）
+RECOMMEND_POLICY = "default"  # "default"=AI/物理推荐（由USE_AI_MODE决定），或 strategies.py 中注册的策略名，如 "solver"=模拟枚举求最优力度（最强策略）
+POLICY_OPTIONS = {}  # 传给注册策略的选项，如 {"resolution": 2.0}（solver 的力度间隔用 SOLVER_STEP / SOLVER_MAX_POWER）
+SOLVER_STEP = 0.1  # solver/table策略枚举力度的间隔（整数力度经常无解，需要小数力度；默认同 strategies.SOLVER_STEP）
+SOLVER_MAX_POWER = 10  # solver/table策略的最大力度（力度10的水平距离已超过2000像素；默认同 strategies.SOLVER_MAX_POWER）
+MARGIN_ANALYSIS = False  # True=每次跳跃用一次向量化模拟求出全部能着陆的力度，记录获胜区间宽度、所选力度的位置和落点偏差
+MARGIN_STEP = 0.01  # 落点余量分析的力度间隔（整数力度几乎都落不到平台上，需要小数力度；1=只看整数力度）
+PHYSICS_JIT = False  # True=安装了numba时使用JIT编译的物理内核（结果相同，但每次运行要先编译或读取缓存），未安装时自动使用纯Python
+VECTOR_ENGINE = False  # True=物理计算模式下用向量化引擎（vector_engine.py）同时推进所有游戏
+ENDURANCE_MODE = False  # True=耐力模式：只进行一场不限跳跃次数的游戏，逐跳写入JSONL文件
+ENDURANCE_MAX_JUMPS = None  # 耐力模式的跳跃上限，None=不限（Ctrl+C 结束并保存统计）
+ENDURANCE_REPORT_EVERY = 100000  # 耐力模式每隔多少次跳跃打印一次进度
+CHECKPOINT_FILE = "batch_checkpoint.json"  # 检查点文件（逐场游戏模式），中断后用 --resume 继续
+CHECKPOINT_EVERY = 1  # 每完成多少场游戏写一次检查点（中断时最多重玩这么多场）
+ADAPTIVE_SAMPLING = False  # True=顺序检验：置信区间足够窄时提前停止，TOTAL_GAMES 作为最大预算
+ADAPTIVE_METRIC = "score"  # 按哪个指标的均值判断："score"（得分）或 "success_rate"（成功率）
+ADAPTIVE_CI_WIDTH = 20  # 目标置信区间总宽度（与指标同单位，成功率用小数，如 0.05）
+ADAPTIVE_CONFIDENCE = 0.95  # 置信水平
+ADAPTIVE_MIN_GAMES = 30  # 至少进行多少场才开始判断（正态近似需要足够的样本）
+QUEUE_FILE = "batch_queue.sqlite"  # 分布式模式的共享任务队列（多台机器时放在共享存储上）
+QUEUE_CHUNK = 25  # 每个任务包含的游戏场数
+QUEUE_LEASE_SECONDS = 120  # 租约时长（秒），工作进程每完成一场游戏续租一次
+QUEUE_MAX_ATTEMPTS = 3  # 区间中有游戏失败时放回队列重试，同一区间失败这么多次后工作进程报错退出
 
 import requests
 import json
 import time
 import random
 import math
+import os
+import socket
+import subprocess
+import sys
 from datetime import datetime
 import statistics
 
+import argparse
+from collections import deque
+from contextlib import nullcontext
 
-class GameSimulator:
-    def __init__(self, api_key=None, ai_agent_url=AI_AGENT_URL):
-        # 游戏物理参数
-        self.GRAVITY = 0.5
-        self.VX_MULTIPLIER = 2.0
-        self.VY_MULTIPLIER = -3.0
-        self.PLAYER_SIZE = 30
-        self.PLATFORM_HEIGHT = 20
-        self.PLATFORM_WIDTH = 100
-        self.CANVAS_WIDTH = 800
-        self.CANVAS_HEIGHT = 600
-
-        # AI Agent配置
+from checkpoint import BatchCheckpoint, CheckpointMismatch
+from jump_log import JumpLog, JumpStream, json_default
+import jump_physics
+import physics_jit
+import strategies
+from jump_physics import DEFAULT_CONFIG
+from profiling import MemorySampler, PhaseProfiler
+from scenarios import PlatformStream, ScenarioCorpus
+from vector_engine import landing_margin
+from work_queue import WorkQueue
+
+# 模拟器中保留的平台数（当前平台、目标平台以及少量历史平台）
+PLATFORM_WINDOW = 4
+
+
+def _no_phase(name):
+    return nullcontext()
+
+
+class AIServiceClient:
+    """AI Agent服务连接，第一次需要时才探测服务并设置API Key"""
+
+    def __init__(self, ai_agent_url=AI_AGENT_URL, api_key=None):
         self.ai_agent_url = ai_agent_url
         self.api_key = api_key
-        self.ai_enabled = False
-
-        # 尝试连接AI Agent服务并设置API Key
-        if self.check_ai_service():
-            if api_key and api_key != "your_api_key_here":
-                self.ai_enabled = self.set_api_key(api_key)
-                if self.ai_enabled:
-                    print("✅ AI模式已启用")
-                else:
-                    print("⚠️  API Key设置失败，使用物理计算模式")
-            else:
-                print("🔧 未设置API Key，使用物理计算模式")
-        else:
+        self._ai_enabled = None
+        self._session = None
+
+    @property
+    def session(self):
+        """复用HTTP连接"""
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    @property
+    def ai_enabled(self):
+        if self._ai_enabled is None:
+            self._ai_enabled = self.connect()
+        return self._ai_enabled
+
+    def connect(self):
+        """尝试连接AI Agent服务并设置API Key，返回AI模式是否可用"""
+        if not self.check_ai_service():
             print("❌ 无法连接AI Agent服务，使用物理计算模式")
+            return False
+        if not self.api_key or self.api_key == "your_api_key_here":
+            print("🔧 未设置API Key，使用物理计算模式")
+            return False
+        if self.set_api_key(self.api_key):
+            print("✅ AI模式已启用")
+            return True
+        print("⚠️  API Key设置失败，使用物理计算模式")
+        return False
 
     def check_ai_service(self):
         """检查AI Agent服务是否可用"""
         try:
-            response = requests.get(f"{self.ai_agent_url}/api/health", timeout=5)
+            response = self.session.get(f"{self.ai_agent_url}/api/health", timeout=5)
             return response.status_code == 200
         except Exception:
             return False
@@ -61,7 +125,7 @@ class GameSimulator:
     def set_api_key(self, api_key):
         """设置API Key"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.ai_agent_url}/api/set_api_key",
                 json={"api_key": api_key},
                 timeout=10,
@@ -70,39 +134,76 @@ class GameSimulator:
         except Exception:
             return False
 
-    def calculate_physics_recommendation(self, player_pos, target_platform):
-        """基于物理计算的推荐算法"""
-        px, py = player_pos
-        plat_left, plat_top, plat_right = target_platform
 
-        # 目标平台中心
-        target_x = (plat_left + plat_right) / 2
-        target_y = plat_top
-
-        # 计算距离
-        dx = target_x - px
-        dy = target_y - py
-
-        # 基础力度估算
-        distance = math.sqrt(dx * dx + dy * dy)
-        base_power = min(100, max(0, distance / 3))
+class GameSimulator:
+    def __init__(
+        self,
+        api_key=None,
+        ai_agent_url=AI_AGENT_URL,
+        config=DEFAULT_CONFIG,
+        seed=None,
+        corpus=None,
+        profiler=None,
+        policy="default",
+        policy_options=None,
+    ):
+        # 游戏物理参数（不可变配置，创建模拟器不会触发任何网络请求）
+        self.config = config
+        self.GRAVITY = config.gravity
+        self.VX_MULTIPLIER = config.vx_multiplier
+        self.VY_MULTIPLIER = config.vy_multiplier
+        self.PLAYER_SIZE = config.player_size
+        self.PLATFORM_HEIGHT = config.platform_height
+        self.PLATFORM_WIDTH = config.platform_width
+        self.CANVAS_WIDTH = config.canvas_width
+        self.CANVAS_HEIGHT = config.canvas_height
+
+        # AI Agent连接（第一次需要AI推荐时才探测服务）
+        self.service = AIServiceClient(ai_agent_url, api_key)
+
+        # 场景来源：语料 > 种子 > 全局随机数
+        self.seed = seed
+        self.corpus = corpus
+
+        # 可选的分阶段耗时统计（profiling.PhaseProfiler）
+        self.profiler = profiler
+
+        # 物理计算推荐的系数：启动时从启发式系数配置中读取，没有对应物理参数的条目时使用默认系数
+        self.heuristic = jump_physics.heuristic_for(
+            config, jump_physics.load_heuristic_profile()
+        )
 
-        # 根据高度差调整
-        if dy < 0:  # 需要向上跳
-            height_adjustment = abs(dy) / 2
-            base_power += height_adjustment
-        else:  # 向下跳
-            base_power -= dy / 4
+        # 推荐策略："default"（AI服务或物理计算推荐）或 strategies.py 中注册的策略名
+        self.policy = policy
+        if policy == "default":
+            self.strategy = self.get_ai_recommendation
+        else:
+            options = dict(policy_options or {})
+            # 所有使用求解器的策略用同样的力度间隔和最大力度，积分榜上才可比
+            if policy in strategies.SOLVER_POLICIES:
+                options.setdefault("step", SOLVER_STEP)
+                options.setdefault("max_power", SOLVER_MAX_POWER)
+                options.setdefault("jit", PHYSICS_JIT)
+            if policy == "solver":
+                options.setdefault("fallback", self.get_ai_recommendation)
+            self.strategy = strategies.make_strategy(policy, config, **options)
+
+        # 最近一次AI服务推荐的ID，跳跃结束后凭它回报落点
+        self.last_recommendation_id = None
+
+    @property
+    def ai_enabled(self):
+        """当前是否实际使用AI推荐"""
+        return USE_AI_MODE and self.service.ai_enabled
 
-        return max(0, min(100, int(base_power)))
+    def calculate_physics_recommendation(self, player_pos, target_platform):
+        """基于物理计算的推荐算法（系数来自启发式系数配置）"""
+        return jump_physics.heuristic_power(player_pos, target_platform, self.heuristic)
 
     def get_ai_recommendation(self, player_pos, target_platform):
         """获取AI推荐的跳跃力度"""
-        if not self.ai_enabled and USE_AI_MODE:
-            # 如果要求使用AI但AI不可用，尝试使用物理计算
-            return self.calculate_physics_recommendation(player_pos, target_platform)
-        elif not USE_AI_MODE:
-            # 如果明确要求使用物理计算模式
+        if not self.ai_enabled:
+            # 明确要求物理计算模式，或要求AI但AI不可用
             return self.calculate_physics_recommendation(player_pos, target_platform)
 
         # 使用AI Agent服务获取推荐
@@ -116,15 +217,18 @@ class GameSimulator:
                     self.GRAVITY,
                 ],
             }
+            if AI_CANDIDATES > 0:
+                request_data["candidates"] = AI_CANDIDATES
 
-            response = requests.post(
-                f"{self.ai_agent_url}/api/get_recommendation",
+            response = self.service.session.post(
+                f"{self.service.ai_agent_url}/api/get_recommendation",
                 json=request_data,
                 timeout=15,
             )
 
             if response.status_code == 200:
                 data = response.json()
+                self.last_recommendation_id = data.get("recommendation_id")
                 return data.get("recommended_power", 50)
             else:
                 print(f"AI推荐请求失败: {response.status_code}")
@@ -137,189 +241,317 @@ class GameSimulator:
             # 使用物理计算作为备用
             return self.calculate_physics_recommendation(player_pos, target_platform)
 
+    def recommend(self, player_pos, target_platform):
+        """按推荐策略给出力度；策略无法作答（如索引未命中）时退回默认推荐"""
+        self.last_recommendation_id = None
+        power = self.strategy(player_pos, target_platform)
+        if power is None:
+            return self.get_ai_recommendation(player_pos, target_platform)
+        return power
+
+    def report_outcome(self, power, player_pos, target_platform, success):
+        """向AI服务回报最近一次推荐的落点（下落到平台顶面高度时的水平位置）"""
+        landing_x = jump_physics.landing_x(power, player_pos, target_platform, self.config)
+        try:
+            self.service.session.post(
+                f"{self.service.ai_agent_url}/api/report_outcome",
+                json={
+                    "recommendation_id": self.last_recommendation_id,
+                    "landing_x": landing_x,
+                    "success": success,
+                },
+                timeout=5,
+            )
+        except Exception as e:
+            print(f"回报落点失败: {e}")
+        self.last_recommendation_id = None
+
     def simulate_jump(self, power, player_pos, target_platform):
         """模拟跳跃过程，返回是否成功着陆"""
-        px, py = player_pos
-        plat_left, plat_top, plat_right = target_platform
-
-        # 初始速度
-        vx = power * self.VX_MULTIPLIER
-        vy = power * self.VY_MULTIPLIER
-
-        # 模拟物理运动
-        x, y = px, py
-        max_steps = 200  # 防止无限循环
-
-        for step in range(max_steps):
-            # 更新位置
-            x += vx
-            y += vy
-
-            # 应用重力
-            vy += self.GRAVITY
-
-            # 检查是否掉出屏幕
-            if y > self.CANVAS_HEIGHT + 50:
-                return False, (x, y), step
-
-            # 检查碰撞（仅在下落过程中）
-            if vy > 0:
-                player_left = x - self.PLAYER_SIZE / 2
-                player_right = x + self.PLAYER_SIZE / 2
-                player_bottom = y + self.PLAYER_SIZE / 2
-
-                # 检查矩形重叠
-                if (
-                    player_right >= plat_left
-                    and player_left <= plat_right
-                    and player_bottom >= plat_top
-                    and player_bottom <= plat_top + self.PLATFORM_HEIGHT
-                ):
-
-                    # 精细判定
-                    vertical_distance = abs(player_bottom - plat_top)
-                    horizontal_in_bounds = x >= plat_left and x <= plat_right
-
-                    if vertical_distance <= 10 and horizontal_in_bounds:
-                        return True, (x, plat_top - self.PLAYER_SIZE / 2), step
-
-        return False, (x, y), max_steps
-
-    def generate_platform(self, last_platform):
-        """生成下一个平台"""
-        min_distance = 80
-        max_distance = 200
-        distance = min_distance + random.random() * (max_distance - min_distance)
+        backend = physics_jit if PHYSICS_JIT else jump_physics
+        return backend.simulate_jump(power, player_pos, target_platform, self.config)
+
+    def generate_platform(self, last_platform, scenario=None):
+        """生成下一个平台，scenario 为 PlatformStream 时从中读取可复现的平台序列"""
+        if scenario is not None:
+            distance, y = scenario.next_platform()
+        else:
+            min_distance = 80
+            max_distance = 200
+            distance = min_distance + random.random() * (max_distance - min_distance)
+            y = 280 + random.random() * 80  # 随机高度
 
         return {
             "x": last_platform["x"] + distance,
-            "y": 280 + random.random() * 80,  # 随机高度
+            "y": y,
             "width": self.PLATFORM_WIDTH,
             "height": self.PLATFORM_HEIGHT,
         }
 
-    def play_single_game(self, game_id):
-        """进行单次游戏"""
-        # 初始化游戏状态
+    def scenario_for(self, game_id):
+        """获取某场游戏的平台序列，未设置语料和种子时返回 None"""
+        if self.corpus is not None:
+            return self.corpus.stream(game_id)
+        if self.seed is not None:
+            return PlatformStream(self.seed, game_id)
+        return None
+
+    def play_single_game(self, game_id, scenario=None, max_jumps=MAX_JUMPS, jumps=None):
+        """
+        进行单次游戏，scenario 可指定平台序列（默认由语料或种子决定）。
+        max_jumps 为 None 时不限跳跃次数；jumps 为跳跃记录容器，默认 JumpLog，
+        耐力模式传入 JumpStream 以流式写盘。
+        """
+        # 未开启剖析时使用空上下文，几乎没有额外开销
+        phase = self.profiler.phase if self.profiler is not None else _no_phase
+
+        if scenario is None:
+            scenario = self.scenario_for(game_id)
+
+        # 初始化游戏状态（玩家和平台使用世界坐标，camera_x 为相机偏移）
         player = {"x": 100, "y": 300}
-        platforms = [
+        camera_x = 0
+        # 只保留最近的几个平台：最后一个总是目标平台
+        platforms = deque(maxlen=PLATFORM_WINDOW)
+        platforms.append(
             {
                 "x": 50,
                 "y": 320,
                 "width": self.PLATFORM_WIDTH,
                 "height": self.PLATFORM_HEIGHT,
             }
-        ]
+        )
 
         # 添加第一个目标平台
-        platforms.append(self.generate_platform(platforms[0]))
+        with phase("generate_platform"):
+            platforms.append(self.generate_platform(platforms[0], scenario))
 
-        current_platform_index = 0
         score = 0
-        jumps = []
+        if jumps is None:
+            jumps = JumpLog()
 
-        max_jumps = 100  # 防止无限循环
+        jump_count = 0
+        while max_jumps is None or jump_count < max_jumps:
+            jump_count += 1
+            target_platform = platforms[-1]
 
-        for jump_count in range(max_jumps):
-            target_platform = platforms[current_platform_index + 1]
-
-            # 获取AI推荐
-            player_pos = (player["x"], player["y"])
+            # 获取AI推荐（推荐和模拟都使用屏幕坐标）
+            player_pos = (player["x"] - camera_x, player["y"])
             target_pos = (
-                target_platform["x"],
+                target_platform["x"] - camera_x,
                 target_platform["y"],
-                target_platform["x"] + target_platform["width"],
+                target_platform["x"] + target_platform["width"] - camera_x,
             )
 
-            recommended_power = self.get_ai_recommendation(player_pos, target_pos)
+            with phase("recommend"):
+                recommended_power = self.recommend(player_pos, target_pos)
 
             # 模拟跳跃
-            success, final_pos, steps = self.simulate_jump(
-                recommended_power, player_pos, target_pos
-            )
+            with phase("simulate_jump"):
+                success, final_pos, steps = self.simulate_jump(
+                    recommended_power, player_pos, target_pos
+                )
 
-            jump_data = {
-                "jump_number": jump_count + 1,
-                "player_pos": player_pos,
-                "target_platform": target_pos,
-                "recommended_power": recommended_power,
-                "success": success,
-                "final_pos": final_pos,
-                "steps": steps,
-            }
-            jumps.append(jump_data)
+            if REPORT_OUTCOMES and self.last_recommendation_id:
+                with phase("report_outcome"):
+                    self.report_outcome(recommended_power, player_pos, target_pos, success)
+
+            margin = None
+            if MARGIN_ANALYSIS:
+                with phase("margin"):
+                    margin = landing_margin(
+                        recommended_power,
+                        player_pos,
+                        target_pos,
+                        self.config,
+                        MARGIN_STEP,
+                        SOLVER_MAX_POWER,
+                    )
+
+            with phase("bookkeeping"):
+                jumps.append(
+                    player_pos,
+                    target_pos,
+                    recommended_power,
+                    success,
+                    final_pos,
+                    steps,
+                    margin,
+                )
 
             if success:
                 # 成功着陆
-                player["x"], player["y"] = final_pos
-                current_platform_index += 1
+                player["x"] = final_pos[0] + camera_x
+                player["y"] = final_pos[1]
                 score += 10
 
                 # 生成新平台
-                platforms.append(self.generate_platform(platforms[-1]))
-
-                # 相机滚动效果
-                if player["x"] > self.CANVAS_WIDTH / 2:
-                    offset = player["x"] - self.CANVAS_WIDTH / 2
-                    player["x"] = self.CANVAS_WIDTH / 2
-                    for platform in platforms:
-                        platform["x"] -= offset
+                with phase("generate_platform"):
+                    platforms.append(self.generate_platform(platforms[-1], scenario))
+
+                # 相机滚动效果：只移动相机，O(1)
+                with phase("camera"):
+                    if final_pos[0] > self.CANVAS_WIDTH / 2:
+                        camera_x = player["x"] - self.CANVAS_WIDTH / 2
             else:
                 # 跳跃失败，游戏结束
                 break
 
-        return {
-            "game_id": game_id,
-            "score": score,
-            "jumps_count": len(jumps),
-            "success_rate": (
-                sum(1 for jump in jumps if jump["success"]) / len(jumps) if jumps else 0
-            ),
-            "jumps": jumps,
-            "ai_mode": self.ai_enabled,
-        }
+        with phase("bookkeeping"):
+            return {
+                "game_id": game_id,
+                "score": score,
+                "jumps_count": len(jumps),
+                "success_rate": jumps.success_count / len(jumps) if jumps else 0,
+                "jumps": jumps,
+                "ai_mode": self.ai_enabled,
+            }
+
+
+class SequentialEstimate:
+    """在线计算均值和置信区间（Welford算法），用于自适应采样的提前停止"""
 
+    def __init__(self, confidence=ADAPTIVE_CONFIDENCE):
+        self.z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
 
-def run_batch_games():
-    """运行批量游戏测试"""
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def half_width(self):
+        """置信区间半宽（正态近似），样本不足两个时为无穷大"""
+        if self.count < 2:
+            return math.inf
+        return self.z * math.sqrt(self._m2 / (self.count - 1) / self.count)
+
+    @property
+    def interval(self):
+        return self.mean - self.half_width, self.mean + self.half_width
+
+
+def run_batch_games(resume=None):
+    """运行批量游戏测试；resume 为检查点文件路径时跳过其中已完成的游戏继续运行"""
     print("🎮 跳一跳游戏 - AI批量测试开始")
     print("=" * 50)
     print(f"📊 测试配置:")
     print(f"   总游戏数: {TOTAL_GAMES}")
     print(f"   AI模式: {'启用' if USE_AI_MODE else '仅物理计算'}")
     print(f"   AI服务地址: {AI_AGENT_URL}")
+    if RECOMMEND_POLICY != "default":
+        print(f"   推荐策略: {RECOMMEND_POLICY}")
+    if SCENARIO_CORPUS:
+        print(f"   场景语料: {SCENARIO_CORPUS}")
+    elif SCENARIO_SEED is not None:
+        print(f"   场景种子: {SCENARIO_SEED}")
+    if PROFILE_PHASES:
+        print(f"   阶段剖析: 开启{'（含cProfile）' if PROFILE_CPROFILE else ''}")
+    if MEMORY_PROFILE:
+        print(f"   内存统计: 开启（上限 {MEMORY_LIMIT_MB} MB）")
+    if MARGIN_ANALYSIS:
+        print(f"   落点余量分析: 开启（力度间隔 {MARGIN_STEP}）")
+    if ADAPTIVE_SAMPLING:
+        print(
+            f"   自适应采样: {ADAPTIVE_METRIC} 的 {ADAPTIVE_CONFIDENCE:.0%} 置信区间宽度 ≤ "
+            f"{ADAPTIVE_CI_WIDTH} 时停止（至少 {ADAPTIVE_MIN_GAMES} 场）"
+        )
     print("=" * 50)
 
+    if ADAPTIVE_METRIC not in ("score", "success_rate"):
+        raise ValueError(f"未知的自适应采样指标: {ADAPTIVE_METRIC}")
+    corpus = ScenarioCorpus.load(SCENARIO_CORPUS) if SCENARIO_CORPUS else None
+    # 向量化引擎不记录落点余量，开启分析时逐场进行
+    if (
+        VECTOR_ENGINE
+        and not USE_AI_MODE
+        and RECOMMEND_POLICY in ("default", "solver")
+        and not MARGIN_ANALYSIS
+    ):
+        return run_vector_games(corpus)
+
     # 初始化游戏模拟器
-    simulator = GameSimulator(GEMINI_API_KEY)
+    profiler = PhaseProfiler(PROFILE_CPROFILE) if PROFILE_PHASES else None
+    simulator = GameSimulator(
+        GEMINI_API_KEY,
+        seed=SCENARIO_SEED,
+        corpus=corpus,
+        profiler=profiler,
+        policy=RECOMMEND_POLICY,
+        policy_options=POLICY_OPTIONS,
+    )
 
     # 存储所有游戏结果
+    # 与分布式运行检查同样的配置，另外记录AI模式实际是否可用
+    settings = {**_run_settings(), "ai_mode": simulator.ai_enabled}
     all_results = []
-    successful_games = 0
+    if resume:
+        checkpoint, all_results = BatchCheckpoint.resume(resume, settings)
+        if checkpoint.random_state is not None:
+            random.setstate(checkpoint.random_state)
+        print(f"♻️  从检查点继续: {resume}（已完成 {len(all_results)} 场）")
+    else:
+        checkpoint = BatchCheckpoint(CHECKPOINT_FILE, settings)
+    checkpoint.open(fresh=not resume)
+    completed = set(checkpoint.completed)
+    successful_games = checkpoint.stats["successful_games"]
+    total_jumps = checkpoint.stats["total_jumps"]
+    estimate = SequentialEstimate(ADAPTIVE_CONFIDENCE)
+    for result in all_results:
+        estimate.add(result[ADAPTIVE_METRIC])
+    stopped_early = False
+
+    memory = MemorySampler(TOTAL_GAMES, MEMORY_LIMIT_MB) if MEMORY_PROFILE else None
+    if memory is not None:
+        memory.start()
 
     start_time = time.time()
+    if profiler is not None:
+        profiler.start()
 
     for game_num in range(1, TOTAL_GAMES + 1):
+        if game_num in completed:
+            continue
         print(f"🎯 进行第 {game_num}/{TOTAL_GAMES} 场游戏...")
 
         try:
             result = simulator.play_single_game(game_num)
             all_results.append(result)
+            total_jumps += result["jumps_count"]
 
             if result["success_rate"] > 0:
                 successful_games += 1
 
+            checkpoint.record(result)
+            if len(checkpoint.completed) % CHECKPOINT_EVERY == 0:
+                checkpoint.save(time.time() - start_time)
+
             print(
                 f"   得分: {result['score']}, 跳跃次数: {result['jumps_count']}, "
                 f"成功率: {result['success_rate']:.2%}, AI模式: {result['ai_mode']}"
             )
 
+            estimate.add(result[ADAPTIVE_METRIC])
+            if (
+                ADAPTIVE_SAMPLING
+                and estimate.count >= ADAPTIVE_MIN_GAMES
+                and 2 * estimate.half_width <= ADAPTIVE_CI_WIDTH
+            ):
+                stopped_early = True
+                break
+
             # 每10轮显示总体进度
             if game_num % 10 == 0:
                 current_success_rate = successful_games / game_num * 100
                 print(
                     f"📈 进度: {game_num}/{TOTAL_GAMES} | 累计成功率: {current_success_rate:.1f}%"
                 )
+                if memory is not None:
+                    memory.sample(len(all_results), total_jumps)
 
             # 短暂延迟，避免API调用过于频繁
             if simulator.ai_enabled:
@@ -330,12 +562,352 @@ def run_batch_games():
             continue
 
     end_time = time.time()
-
-    # 分析结果
-    analyze_results(all_results, end_time - start_time)
+    if profiler is not None:
+        profiler.stop()
+    checkpoint.save(end_time - start_time)
+    checkpoint.close()
+
+    # 分析结果（耗时包含之前中断的运行）
+    analyze_results(all_results, checkpoint.elapsed + end_time - start_time)
+    sampling = None
+    if ADAPTIVE_SAMPLING:
+        low, high = estimate.interval
+        sampling = {
+            "metric": ADAPTIVE_METRIC,
+            "confidence": ADAPTIVE_CONFIDENCE,
+            "target_width": ADAPTIVE_CI_WIDTH,
+            "games_needed": estimate.count,
+            "max_games": TOTAL_GAMES,
+            "stopped_early": stopped_early,
+            "mean": estimate.mean,
+            "interval": [low, high],
+        }
+        print_sampling(sampling)
+    if profiler is not None:
+        profiler.print_summary()
+        print("\n💾 剖析结果已保存:")
+        for path in profiler.save(PROFILE_OUTPUT):
+            print(f"   {path}")
 
     # 保存结果
-    save_results(all_results)
+    saved = save_results(all_results, simulator.config, sampling)
+    if memory is not None:
+        # 最后一次采样包含所有结果，停止前的峰值也覆盖了保存阶段
+        memory.sample(len(all_results), total_jumps)
+        memory.stop()
+        memory.print_summary()
+    if stopped_early or len(all_results) == TOTAL_GAMES:
+        # 全部完成后检查点不再需要；有失败的游戏时保留，--resume 会重试这些游戏
+        checkpoint.remove()
+    return saved
+
+
+def print_sampling(sampling):
+    """打印自适应采样的结论"""
+    low, high = sampling["interval"]
+    name = "平均得分" if sampling["metric"] == "score" else "平均成功率"
+    print(f"\n🧮 自适应采样:")
+    print(
+        f"   {name}: {sampling['mean']:.3f}，{sampling['confidence']:.0%} 置信区间 "
+        f"[{low:.3f}, {high:.3f}]（宽度 {high - low:.3f}，目标 {sampling['target_width']}）"
+    )
+    if sampling["stopped_early"]:
+        print(
+            f"   达到目标精度，实际需要 {sampling['games_needed']} 场"
+            f"（预算 {sampling['max_games']} 场）"
+        )
+    else:
+        print(f"   用完 {sampling['max_games']} 场预算仍未达到目标精度")
+
+
+def run_vector_games(corpus=None):
+    """物理计算模式下用向量化引擎一次推进所有游戏，结果格式与逐场模拟相同"""
+    from vector_engine import VectorGameEngine
+
+    if RECOMMEND_POLICY == "solver":
+        engine = VectorGameEngine(
+            policy="solver",
+            max_jumps=MAX_JUMPS,
+            step=SOLVER_STEP,
+            max_power=SOLVER_MAX_POWER,
+            jit=PHYSICS_JIT,
+        )
+    else:
+        engine = VectorGameEngine(policy="physics", max_jumps=MAX_JUMPS)
+
+    print(f"⚡ 使用向量化引擎同时推进 {TOTAL_GAMES} 场游戏...")
+    start_time = time.time()
+    results = engine.run(
+        TOTAL_GAMES, seed=SCENARIO_SEED, corpus=corpus, record_jumps=True
+    ).to_results()
+    end_time = time.time()
+
+    analyze_results(results, end_time - start_time)
+    return save_results(results, engine.config)
+
+
+def run_endurance_game():
+    """
+    耐力模式：进行一场不限跳跃次数的游戏。
+    每次跳跃写入JSONL文件，内存中只保留累计统计，可以运行数百万次跳跃；
+    Ctrl+C 会结束游戏并照常保存统计。
+    """
+    print("🏃 跳一跳游戏 - 耐力模式")
+    print("=" * 50)
+    print(f"   跳跃上限: {ENDURANCE_MAX_JUMPS or '不限'}")
+    print(f"   推荐策略: {RECOMMEND_POLICY}")
+    print(f"   AI模式: {'启用' if USE_AI_MODE else '仅物理计算'}")
+    print("=" * 50)
+
+    corpus = ScenarioCorpus.load(SCENARIO_CORPUS) if SCENARIO_CORPUS else None
+    simulator = GameSimulator(
+        GEMINI_API_KEY,
+        seed=SCENARIO_SEED,
+        corpus=corpus,
+        policy=RECOMMEND_POLICY,
+        policy_options=POLICY_OPTIONS,
+    )
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    jumps_file = f"endurance_jumps_{timestamp}.jsonl"
+    summary_file = f"endurance_summary_{timestamp}.json"
+
+    start_time = time.time()
+    interrupted = False
+    with open(jumps_file, "w", encoding="utf-8") as f:
+        stream = JumpStream(f, report_every=ENDURANCE_REPORT_EVERY)
+        try:
+            simulator.play_single_game(1, max_jumps=ENDURANCE_MAX_JUMPS, jumps=stream)
+        except KeyboardInterrupt:
+            interrupted = True
+            print("\n⏹️ 耐力测试被中断，保存已完成的跳跃")
+    elapsed = time.time() - start_time
+
+    stats = stream.summary()
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "score": stats["successes"] * 10,
+        "elapsed_s": elapsed,
+        "jumps_per_second": stats["jumps"] / elapsed if elapsed else 0,
+        "interrupted": interrupted,
+        "max_jumps": ENDURANCE_MAX_JUMPS,
+        "policy": RECOMMEND_POLICY,
+        "ai_mode": simulator.ai_enabled,
+        "scenario_seed": SCENARIO_SEED,
+        "scenario_corpus": SCENARIO_CORPUS,
+        "jumps_file": jumps_file,
+        "stats": stats,
+        "config": simulator.config.to_dict(),
+    }
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    print("\n📊 耐力测试结果")
+    print("=" * 50)
+    print(f"   得分: {summary['score']}，跳跃次数: {stats['jumps']}")
+    print(f"   耗时: {elapsed:.1f} 秒（{summary['jumps_per_second']:.0f} 次/秒）")
+    print(f"   平均力度: {stats['mean_power']:.1f}，平均步数: {stats['mean_steps']:.1f}")
+    print(
+        f"   落点偏差: 平均 {stats['landing_error_mean']:+.3f}，"
+        f"标准差 {stats['landing_error_std']:.3f}，最大 {stats['landing_error_max']:.3f}"
+    )
+    print(f"\n💾 结果已保存:")
+    print(f"   逐跳记录: {jumps_file}")
+    print(f"   统计摘要: {summary_file}")
+    return jumps_file, summary_file
+
+
+def _run_settings():
+    """分布式运行时所有工作进程必须一致的配置，检查点恢复时也按这些配置校验"""
+    return {
+        "total_games": TOTAL_GAMES,
+        "use_ai_mode": USE_AI_MODE,
+        "policy": RECOMMEND_POLICY,
+        "policy_options": POLICY_OPTIONS,
+        "solver_step": SOLVER_STEP,
+        "solver_max_power": SOLVER_MAX_POWER,
+        "seed": SCENARIO_SEED,
+        "corpus": SCENARIO_CORPUS,
+        "max_jumps": MAX_JUMPS,
+        "ai_candidates": AI_CANDIDATES,
+        "margin_analysis": MARGIN_ANALYSIS,
+        "margin_step": MARGIN_STEP,
+        "physics_jit": PHYSICS_JIT,
+        "report_outcomes": REPORT_OUTCOMES,
+    }
+
+
+def _apply_run_settings(settings):
+    """工作进程使用任务队列中的配置，而不是本机文件顶部的配置"""
+    global TOTAL_GAMES, USE_AI_MODE, RECOMMEND_POLICY, POLICY_OPTIONS, SOLVER_STEP
+    global SOLVER_MAX_POWER, SCENARIO_SEED, SCENARIO_CORPUS, MAX_JUMPS
+    global AI_CANDIDATES, MARGIN_ANALYSIS, MARGIN_STEP, PHYSICS_JIT, REPORT_OUTCOMES
+    TOTAL_GAMES = settings["total_games"]
+    USE_AI_MODE = settings["use_ai_mode"]
+    RECOMMEND_POLICY = settings["policy"]
+    POLICY_OPTIONS = settings.get("policy_options", {})
+    SOLVER_STEP = settings["solver_step"]
+    SOLVER_MAX_POWER = settings["solver_max_power"]
+    SCENARIO_SEED = settings["seed"]
+    SCENARIO_CORPUS = settings["corpus"]
+    MAX_JUMPS = settings["max_jumps"]
+    AI_CANDIDATES = settings["ai_candidates"]
+    MARGIN_ANALYSIS = settings["margin_analysis"]
+    MARGIN_STEP = settings["margin_step"]
+    PHYSICS_JIT = settings["physics_jit"]
+    REPORT_OUTCOMES = settings["report_outcomes"]
+
+
+def run_worker(queue_path=QUEUE_FILE, worker_id=None):
+    """
+    工作进程：从任务队列租用游戏区间并逐场进行，结果追加到自己的分片文件。
+    队列中没有待处理任务、其他进程的租约也都结束后退出。返回 (分片文件, 完成的场数)
+    """
+    queue = WorkQueue(queue_path)
+    _apply_run_settings(queue.settings)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    corpus = ScenarioCorpus.load(SCENARIO_CORPUS) if SCENARIO_CORPUS else None
+    simulator = GameSimulator(
+        GEMINI_API_KEY,
+        seed=SCENARIO_SEED,
+        corpus=corpus,
+        policy=RECOMMEND_POLICY,
+        policy_options=POLICY_OPTIONS,
+    )
+    os.makedirs(queue.shard_dir, exist_ok=True)
+    shard_path = os.path.join(queue.shard_dir, f"{worker_id}.jsonl")
+    print(f"🛠️  工作进程 {worker_id} 启动，任务队列: {queue_path}")
+
+    games = 0
+    with open(shard_path, "a", encoding="utf-8") as shard:
+        while True:
+            task = queue.lease(worker_id, QUEUE_LEASE_SECONDS)
+            if task is None:
+                if queue.progress()["leased"] == 0:
+                    break
+                # 其余任务被其他进程租用，等待它们完成或租约过期
+                time.sleep(1)
+                continue
+
+            task_id, first_game, last_game = task
+            print(f"📦 {worker_id} 租用第 {first_game}-{last_game} 场")
+            try:
+                for game_id in range(first_game, last_game + 1):
+                    try:
+                        result = simulator.play_single_game(game_id, max_jumps=MAX_JUMPS)
+                    except Exception as e:
+                        # 这一场没有写进分片，区间不能标记完成：放回队列重试（已写入的游戏合并时去重）
+                        queue.release(task_id, worker_id)
+                        attempts = queue.attempts(task_id)
+                        print(
+                            f"   ❌ 游戏 {game_id} 失败: {e}，第 {first_game}-{last_game} 场放回队列"
+                            f"（已尝试 {attempts} 次）"
+                        )
+                        if attempts >= QUEUE_MAX_ATTEMPTS:
+                            raise RuntimeError(
+                                f"第 {first_game}-{last_game} 场已失败 {attempts} 次，工作进程退出"
+                            ) from e
+                        break
+                    shard.write(
+                        json.dumps(result, ensure_ascii=False, default=json_default) + "\n"
+                    )
+                    shard.flush()
+                    games += 1
+                    if not queue.renew(task_id, worker_id, QUEUE_LEASE_SECONDS):
+                        print(f"⚠️  第 {first_game}-{last_game} 场的租约已过期并被接手，放弃该区间")
+                        break
+                    if simulator.ai_enabled:
+                        time.sleep(0.2)
+                else:
+                    queue.complete(task_id, worker_id)
+            except BaseException:
+                queue.release(task_id, worker_id)
+                raise
+
+    queue.close()
+    print(f"✅ 工作进程 {worker_id} 完成 {games} 场游戏，分片: {shard_path}")
+    return shard_path, games
+
+
+def run_coordinator(queue_path=QUEUE_FILE, workers=0):
+    """
+    协调进程：按当前配置创建任务队列（已存在时继续该队列），可选地在本机启动 workers 个工作进程，
+    等待所有任务完成后合并分片生成报告。其他机器上运行 --worker 指向同一个队列文件即可加入。
+    """
+    settings = _run_settings()
+    if os.path.exists(queue_path):
+        queue = WorkQueue(queue_path)
+        if queue.settings != settings:
+            raise ValueError(f"任务队列 {queue_path} 的配置与当前配置不一致，请换一个队列文件")
+        print(f"♻️  继续已有的任务队列: {queue_path}")
+    else:
+        queue = WorkQueue.create(queue_path, TOTAL_GAMES, QUEUE_CHUNK, settings)
+        print(f"📋 已创建任务队列: {queue_path}（每个任务 {QUEUE_CHUNK} 场）")
+
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--worker",
+                queue_path,
+                "--worker-id",
+                f"local-{i}",
+            ]
+        )
+        for i in range(1, workers + 1)
+    ]
+    if processes:
+        print(f"🚀 已在本机启动 {workers} 个工作进程")
+    else:
+        print(f"💡 在各台机器上运行 'python batch_ai_test.py --worker {queue_path}' 开始处理")
+
+    try:
+        reported = None
+        while not queue.finished():
+            progress = queue.progress()
+            if progress != reported:
+                print(
+                    f"📈 进度: 完成 {progress['done']}/{queue.total_games()} 场，"
+                    f"进行中 {progress['leased']} 场"
+                )
+                reported = progress
+            if processes and all(p.poll() is not None for p in processes):
+                # 本机工作进程都退出了但任务未完成（例如全部崩溃）
+                print("❌ 所有本机工作进程已退出，但仍有未完成的任务")
+                break
+            time.sleep(2)
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        queue.close()
+
+    return merge_shards(queue_path)
+
+
+def merge_shards(queue_path=QUEUE_FILE):
+    """合并任务队列的所有分片，生成与普通批量测试相同的报告"""
+    queue = WorkQueue(queue_path)
+    _apply_run_settings(queue.settings)
+    results, missing = queue.load_results()
+    elapsed = queue.elapsed()
+
+    print("\n🔗 合并分片结果:")
+    for worker, games in queue.workers().items():
+        print(f"   {worker}: {games} 场")
+    queue.close()
+    if missing:
+        print(f"⚠️  缺少 {len(missing)} 场游戏的结果（例如第 {missing[0]} 场），报告只包含已完成的游戏")
+    if not results:
+        raise ValueError(f"任务队列 {queue_path} 的分片中没有任何结果")
+
+    analyze_results(results, elapsed)
+    return save_results(results)
 
 
 def analyze_results(results, total_time):
@@ -391,8 +963,8 @@ def analyze_results(results, total_time):
         print(f"   {range_name}: {count} 场 ({percentage:.1f}%)")
 
 
-def save_results(results):
-    """保存结果到文件"""
+def save_results(results, config=DEFAULT_CONFIG, sampling=None):
+    """保存结果到文件；sampling 为自适应采样的结论（可选）"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     # 动态生成文件名
@@ -426,6 +998,17 @@ def save_results(results):
         f.write(f"  最高得分: {max(scores)}\n")
         f.write(f"  最低得分: {min(scores)}\n")
         f.write(f"  平均成功率: {statistics.mean(success_rates):.2%}\n\n")
+        if sampling is not None:
+            low, high = sampling["interval"]
+            f.write(f"自适应采样:\n")
+            f.write(
+                f"  指标: {sampling['metric']}，{sampling['confidence']:.0%} 置信区间 "
+                f"[{low:.3f}, {high:.3f}]，目标宽度 {sampling['target_width']}\n"
+            )
+            f.write(
+                f"  实际游戏数: {sampling['games_needed']}/{sampling['max_games']}"
+                f"{'（提前停止）' if sampling['stopped_early'] else ''}\n\n"
+            )
 
         # 详细游戏记录
         f.write(f"详细游戏记录:\n")
@@ -446,22 +1029,18 @@ def save_results(results):
             "use_ai_mode": USE_AI_MODE,
             "ai_agent_url": AI_AGENT_URL,
             "api_key_set": GEMINI_API_KEY != "your_api_key_here",
+            "scenario_seed": SCENARIO_SEED,
+            "scenario_corpus": SCENARIO_CORPUS,
+            "adaptive_sampling": sampling,
+            "margin_step": MARGIN_STEP if MARGIN_ANALYSIS else None,
         },
-        "config": {
-            "gravity": GameSimulator(None).GRAVITY,
-            "vx_multiplier": GameSimulator(None).VX_MULTIPLIER,
-            "vy_multiplier": GameSimulator(None).VY_MULTIPLIER,
-            "player_size": GameSimulator(None).PLAYER_SIZE,
-            "platform_height": GameSimulator(None).PLATFORM_HEIGHT,
-            "platform_width": GameSimulator(None).PLATFORM_WIDTH,
-            "canvas_width": GameSimulator(None).CANVAS_WIDTH,
-            "canvas_height": GameSimulator(None).CANVAS_HEIGHT,
-        },
+        "config": config.to_dict(),
         "results": results,
     }
 
     with open(detailed_log, "w", encoding="utf-8") as f:
-        json.dump(detailed_data, f, indent=2, ensure_ascii=False)
+        # 跳跃记录在这里才展开为字典
+        json.dump(detailed_data, f, indent=2, ensure_ascii=False, default=json_default)
 
     print(f"\n💾 结果已保存:")
     print(f"   简要结果: {output_file}")
@@ -471,6 +1050,52 @@ def save_results(results):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="跳一跳AI批量测试")
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const=CHECKPOINT_FILE,
+        help=f"从检查点继续上次中断的测试（默认 {CHECKPOINT_FILE}）",
+    )
+    parser.add_argument(
+        "--coordinator",
+        nargs="?",
+        const=QUEUE_FILE,
+        help=f"分布式模式：创建/继续任务队列（默认 {QUEUE_FILE}），等待完成后合并报告",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="与 --coordinator 一起使用：在本机启动的工作进程数",
+    )
+    parser.add_argument(
+        "--worker",
+        nargs="?",
+        const=QUEUE_FILE,
+        help=f"分布式模式：作为工作进程处理任务队列（默认 {QUEUE_FILE}）",
+    )
+    parser.add_argument("--worker-id", help="工作进程名称（默认 主机名-进程号），同时是分片文件名")
+    parser.add_argument(
+        "--merge",
+        nargs="?",
+        const=QUEUE_FILE,
+        help="只合并任务队列已有的分片并生成报告",
+    )
+    args = parser.parse_args()
+
+    queue_path = args.worker or args.merge
+    if queue_path and not os.path.exists(queue_path):
+        print(f"❌ 找不到任务队列: {queue_path}")
+        print("💡 提示: 先运行 'python batch_ai_test.py --coordinator' 创建任务队列")
+        raise SystemExit(1)
+    if args.worker:
+        run_worker(args.worker, args.worker_id)
+        raise SystemExit(0)
+    if args.merge:
+        merge_shards(args.merge)
+        raise SystemExit(0)
+
     print("=" * 60)
     print("🎮 跳一跳AI批量测试系统")
     print("=" * 60)
@@ -500,9 +1125,20 @@ if __name__ == "__main__":
 
     print("\n" + "=" * 60)
 
+    if ENDURANCE_MODE:
+        run_endurance_game()
+        raise SystemExit(0)
+
+    if args.resume and not os.path.exists(args.resume):
+        print(f"❌ 找不到检查点文件: {args.resume}")
+        raise SystemExit(1)
+
     try:
         # 运行批量测试
-        output_file, detailed_log = run_batch_games()
+        if args.coordinator:
+            output_file, detailed_log = run_coordinator(args.coordinator, args.workers)
+        else:
+            output_file, detailed_log = run_batch_games(args.resume)
 
         print("\n🎉 批量测试完成!")
         print(f"\n📁 输出文件:")
@@ -515,6 +1151,12 @@ if __name__ == "__main__":
 
     except KeyboardInterrupt:
         print("\n⏹️ 测试被用户中断")
+        checkpoint_file = args.resume or CHECKPOINT_FILE
+        if os.path.exists(checkpoint_file):
+            print(f"💡 进度已保存到 {checkpoint_file}，运行 'python batch_ai_test.py --resume' 继续")
+    except CheckpointMismatch as e:
+        print(f"\n❌ {e}")
+        print("💡 提示: 恢复配置后再 --resume，或不带 --resume 重新开始")
     except Exception as e:
         print(f"\n❌ 测试过程中出现错误: {e}")
         import traceback
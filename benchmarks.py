@@ -0,0 +1,411 @@
+"""
+跳一跳游戏 - 性能基准测试
+覆盖模拟器、两个推荐算法、prompt构建以及结果分析器，
+结果保存为JSON，并与保存的基准线比较，自动标记性能回退。
+
+用法:
+    python benchmarks.py                      # 运行并与 bench_baseline.json 比较
+    python benchmarks.py --save-baseline      # 运行并保存为新的基准线
+    python benchmarks.py --sizes 1000,100000  # 指定分析器的合成日志规模（跳跃数）
+    python benchmarks.py --quick              # 只运行 QUICK_BENCHMARKS（test_benchmarks.py 使用的子集）
+
+bench_baseline.json 是在参考机器上记录的基准线（meta 中记录了机器信息），
+没有基准线时比较失败并返回非零退出码。
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from jump_physics import HeuristicCoefficients
+
+RESULTS_FILE = "bench_results.json"
+BASELINE_FILE = "bench_baseline.json"
+DEFAULT_SIZES = "1000,100000,1000000"
+REGRESSION_THRESHOLD = 0.20  # 比基准线慢20%以上视为回退
+# 单次只需几秒的子集，测试套件每次都与基准线比较
+QUICK_BENCHMARKS = (
+    "simulator.simulate_jump",
+    "simulator.generate_platform_seeded",
+    "vector_engine.run.10000",
+)
+
+# 典型的跳跃场景：玩家站在平台上，目标平台在右侧
+PLAYER_POS = (100, 305)
+TARGET_PLATFORM = (240.0, 300.0, 340.0)
+PHYSICS_PARAMS = (2.0, -3.0, 0.5)
+# calibrate_heuristic.py 对默认物理参数的标定结果：平均每场约6跳
+# （默认系数第一跳就落空，计时的只是一跳的游戏）
+CALIBRATED_HEURISTIC = HeuristicCoefficients(62.181858, 9934.862497, 88.896014, 0.1)
+
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=5):
+    """注册基准测试：被装饰的函数完成准备工作后返回待计时的无参函数"""
+
+    def decorator(func):
+        BENCHMARKS.append((name, func, repeat))
+        return func
+
+    return decorator
+
+
+@contextlib.contextmanager
+def quiet():
+    """屏蔽被测代码中的打印输出"""
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            yield
+
+
+@contextlib.contextmanager
+def physics_mode():
+    """基准测试只使用物理计算模式（避免网络请求），结束后恢复 batch_ai_test.USE_AI_MODE"""
+    import batch_ai_test
+
+    use_ai_mode, batch_ai_test.USE_AI_MODE = batch_ai_test.USE_AI_MODE, False
+    try:
+        yield
+    finally:
+        batch_ai_test.USE_AI_MODE = use_ai_mode
+
+
+def make_simulator(policy="default"):
+    import batch_ai_test
+
+    return batch_ai_test.GameSimulator(None, seed=42, policy=policy)
+
+
+@benchmark("simulator.simulate_jump")
+def bench_simulate_jump():
+    simulator = make_simulator()
+    return lambda: simulator.simulate_jump(3, PLAYER_POS, TARGET_PLATFORM)
+
+
+@benchmark("simulator.generate_platform")
+def bench_generate_platform():
+    simulator = make_simulator()
+    last_platform = {"x": 50, "y": 320}
+    return lambda: simulator.generate_platform(last_platform)
+
+
+@benchmark("simulator.generate_platform_seeded")
+def bench_generate_platform_seeded():
+    simulator = make_simulator()
+    scenario = simulator.scenario_for(1)
+    last_platform = {"x": 50, "y": 320}
+    return lambda: simulator.generate_platform(last_platform, scenario)
+
+
+@benchmark("simulator.play_single_game")
+def bench_play_single_game():
+    # 求解器（SOLVER_STEP 0.1）几乎每一跳都成功，整场游戏跑满 MAX_JUMPS 跳
+    simulator = make_simulator("solver")
+    return lambda: simulator.play_single_game(1)
+
+
+@benchmark("vector_engine.run.10000", repeat=3)
+def bench_vector_engine():
+    from vector_engine import VectorGameEngine
+
+    engine = VectorGameEngine(coefficients=CALIBRATED_HEURISTIC)
+    return lambda: engine.run(10000, seed=42)
+
+
+@benchmark("simulator.calculate_physics_recommendation")
+def bench_simulator_recommendation():
+    simulator = make_simulator()
+    return lambda: simulator.calculate_physics_recommendation(
+        PLAYER_POS, TARGET_PLATFORM
+    )
+
+
+@benchmark("agent.calculate_physics_recommendation")
+def bench_agent_recommendation():
+    from ai_agent import JumpAIAgent
+
+    agent = JumpAIAgent()
+
+    def run():
+        with quiet():
+            agent.calculate_physics_recommendation(
+                PLAYER_POS, TARGET_PLATFORM, PHYSICS_PARAMS
+            )
+
+    return run
+
+
+def _register_prompt_benchmarks():
+    from prompt_templates import PROMPT_VARIANTS, compile_prompt
+
+    for variant in PROMPT_VARIANTS:
+
+        def setup(variant=variant):
+            return lambda: compile_prompt(variant, PHYSICS_PARAMS).render(
+                PLAYER_POS, TARGET_PLATFORM
+            )
+
+        benchmark(f"agent.prompt.{variant}")(setup)
+
+
+_register_prompt_benchmarks()
+
+
+def make_synthetic_log(total_jumps, jumps_per_game=20, seed=0):
+    """生成与 save_results 格式相同的合成详细日志"""
+    rng = random.Random(seed)
+    results = []
+    game_id = 0
+    remaining = total_jumps
+    while remaining > 0:
+        game_id += 1
+        count = min(jumps_per_game, remaining)
+        remaining -= count
+        jumps = []
+        for i in range(count):
+            success = i < count - 1
+            jumps.append(
+                {
+                    "jump_number": i + 1,
+                    "player_pos": [400.0, 305.0],
+                    "target_platform": [
+                        400.0 + rng.uniform(80, 200),
+                        rng.uniform(280, 360),
+                        500.0,
+                    ],
+                    "recommended_power": rng.randint(0, 100),
+                    "success": success,
+                    "final_pos": [480.0, 300.0],
+                    "steps": rng.randint(5, 60),
+                }
+            )
+        successes = count - 1
+        results.append(
+            {
+                "game_id": game_id,
+                "score": successes * 10,
+                "jumps_count": count,
+                "success_rate": successes / count,
+                "jumps": jumps,
+                "ai_mode": False,
+            }
+        )
+    timestamp = datetime.now().isoformat()
+    return {
+        "timestamp": timestamp,
+        "summary": {"timestamp": timestamp, "total_games": len(results)},
+        "results": results,
+    }
+
+
+def register_analyzer_benchmarks(sizes):
+    for size in sizes:
+
+        def setup_report(size=size):
+            from analyze_results import ResultAnalyzer
+
+            analyzer = ResultAnalyzer()
+            analyzer.data = make_synthetic_log(size)
+            workdir = tempfile.mkdtemp(prefix="bench_")
+
+            def run():
+                # 报告文件写入临时目录
+                cwd = os.getcwd()
+                os.chdir(workdir)
+                try:
+                    with quiet():
+                        analyzer.generate_performance_report()
+                finally:
+                    os.chdir(cwd)
+
+            return run
+
+        def setup_viewer(size=size):
+            from simple_viewer import SimpleResultViewer
+
+            viewer = SimpleResultViewer()
+            viewer.data = make_synthetic_log(size)
+
+            def run():
+                with quiet():
+                    viewer.analyze_scores()
+                    viewer.analyze_jumps()
+                    viewer.analyze_ai_performance()
+
+            return run
+
+        benchmark(f"analyzer.performance_report.{size}", repeat=3)(setup_report)
+        benchmark(f"viewer.statistics.{size}", repeat=3)(setup_viewer)
+
+
+def time_callable(func, repeat):
+    """
+    自动确定循环次数，使单轮耗时约0.2秒，返回每次调用的耗时（秒）列表。
+    与 timeit 一样计时期间关闭垃圾回收，耗时不受进程中其他对象数量的影响
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _time_loops(func, repeat)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _time_loops(func, repeat):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= 0.2 or number >= 1_000_000:
+            break
+        number *= 10
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return timings, number
+
+
+def run_benchmarks(name_filter=None, names=None):
+    """运行名称包含 name_filter（并且在 names 中，如果给出）的基准测试"""
+    results = {}
+    for name, setup, repeat in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        if names is not None and name not in names:
+            continue
+        with physics_mode():
+            func = setup()
+            timings, number = time_callable(func, repeat)
+        results[name] = {
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "loops": number,
+            "repeat": repeat,
+        }
+        print(f"  {name:<50} {format_time(results[name]['median_s']):>12}")
+    return results
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def machine_info():
+    """结果文件 meta 中记录的机器信息，用于判断基准线是否来自同一台机器"""
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def same_machine(meta):
+    return all(meta.get(key) == value for key, value in machine_info().items())
+
+
+def compare_with_baseline(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """与基准线比较，返回回退项列表 [(名称, 基准耗时, 当前耗时, 变化比例)]"""
+    regressions = []
+    print(f"\n📊 与基准线比较 (阈值 +{threshold:.0%}):")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"  {name:<50} {'(新增)':>12}")
+            continue
+        # 以最快一轮比较，受系统噪声影响最小
+        before = baseline[name]["min_s"]
+        change = current["min_s"] / before - 1
+        flag = ""
+        if change > threshold:
+            flag = " ⚠️  回退"
+            regressions.append((name, before, current["min_s"], change))
+        elif change < -threshold:
+            flag = " 🚀 提升"
+        print(f"  {name:<50} {change:>+11.1%}{flag}")
+    return regressions
+
+
+def check_baseline(results, path=BASELINE_FILE, threshold=REGRESSION_THRESHOLD):
+    """与基准线文件比较，返回退出码：0 没有回退，1 有回退，2 没有基准线"""
+    if not os.path.exists(path):
+        print(f"❌ 没有基准线文件 {path}，在参考机器上使用 --save-baseline 创建")
+        return 2
+
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if not same_machine(baseline.get("meta", {})):
+        print("⚠️  基准线来自另一台机器，比较结果只供参考")
+    regressions = compare_with_baseline(results, baseline["results"], threshold)
+    if regressions:
+        print(f"\n❌ 发现 {len(regressions)} 项性能回退")
+        return 1
+    print("\n✅ 没有发现性能回退")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跳一跳性能基准测试")
+    parser.add_argument(
+        "--sizes", default=DEFAULT_SIZES, help="分析器合成日志的跳跃数，逗号分隔"
+    )
+    parser.add_argument("--filter", help="只运行名称包含该字符串的基准测试")
+    parser.add_argument(
+        "--quick", action="store_true", help="只运行 QUICK_BENCHMARKS（不含分析器）"
+    )
+    parser.add_argument("--output", default=RESULTS_FILE, help="结果输出文件")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="基准线文件")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="把本次结果保存为基准线"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=REGRESSION_THRESHOLD, help="回退判定阈值"
+    )
+    args = parser.parse_args()
+
+    if not args.quick:
+        sizes = [int(s) for s in args.sizes.split(",") if s]
+        register_analyzer_benchmarks(sizes)
+
+    print("⏱️  跳一跳性能基准测试")
+    print("=" * 66)
+    results = run_benchmarks(args.filter, QUICK_BENCHMARKS if args.quick else None)
+
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(), **machine_info()},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 结果已保存: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 基准线已更新: {args.baseline}")
+        return 0
+
+    return check_baseline(results, args.baseline, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+跳一跳游戏 - 物理计算推荐的系数自动标定
+对给定的物理参数，用向量化引擎在固定的种子场景（或场景语料）上批量模拟，
+搜索使跳跃成功率最高的 distance_divisor / up_divisor / down_divisor，
+结果写入启发式系数配置（jump_physics.HEURISTIC_PROFILE），
+GameSimulator、JumpAIAgent 和向量化引擎启动时都会读取。
+
+搜索分两步：先在对数网格上粗搜，再从最优点出发在对数空间做模式搜索（逐维放大/缩小，
+倍率不断开平方）。整数力度的精度不够（默认物理参数下一个力度单位就是十几像素），
+因此默认按 0.1 的间隔取力度。
+
+用法:
+    python calibrate_heuristic.py                              # 默认物理参数
+    python calibrate_heuristic.py --physics 1.5 -2.5 0.4 --games 5000
+    python calibrate_heuristic.py --power-step 1 --dry-run     # 只看整数力度能达到的效果
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from jump_physics import (
+    DEFAULT_CONFIG,
+    DEFAULT_HEURISTIC,
+    HEURISTIC_PROFILE,
+    HeuristicCoefficients,
+    config_for,
+    heuristic_for,
+    load_heuristic_profile,
+    save_heuristic_profile,
+)
+from scenarios import ScenarioCorpus
+from vector_engine import MAX_JUMPS, VectorGameEngine
+
+# 粗搜网格（三个除数各自的候选值，对数均匀）
+COARSE_GRID = np.geomspace(1, 1000, 10)
+COARSE_STARTS = 3  # 从粗搜的前几名出发做模式搜索
+# 模式搜索的初始/最小倍率
+START_FACTOR = 2.0
+MIN_FACTOR = 1.01
+
+
+def evaluate(coefficients, config, games, seed=None, corpus=None, max_jumps=MAX_JUMPS):
+    """用给定系数跑 games 场游戏，返回 (跳跃成功率, 平均得分)"""
+    engine = VectorGameEngine(
+        config, policy="physics", max_jumps=max_jumps, coefficients=coefficients
+    )
+    first_game_id = corpus.first_game_id if corpus is not None else 1
+    results = engine.run(games, seed=seed, corpus=corpus, first_game_id=first_game_id)
+    return (
+        results.success_count.sum() / results.jumps_count.sum(),
+        float(results.scores.mean()),
+    )
+
+
+def calibrate(config, games, seed=None, corpus=None, power_step=0.1, verbose=True):
+    """
+    搜索成功率最高的系数（成功率相同时取平均得分高的），
+    返回 (系数, (成功率, 平均得分), 评估次数)
+    """
+    cache = {}
+
+    def score(divisors):
+        key = tuple(round(float(d), 6) for d in divisors)
+        if key not in cache:
+            cache[key] = evaluate(
+                HeuristicCoefficients(*key, power_step), config, games, seed, corpus
+            )
+        return cache[key]
+
+    # 粗搜结果往往有几个相近的峰，从前几名分别出发做模式搜索
+    starts = sorted(itertools.product(COARSE_GRID, repeat=3), key=score)[-COARSE_STARTS:]
+    best, best_score = None, None
+    for start in reversed(starts):
+        if verbose:
+            print(f"   粗搜: {_format(start)}，成功率 {score(start)[0]:.2%}")
+        point, point_score = _pattern_search(start, score)
+        if verbose:
+            print(f"   模式搜索: {_format(point)}，成功率 {point_score[0]:.2%}")
+        if best_score is None or point_score > best_score:
+            best, best_score = point, point_score
+
+    key = tuple(round(float(d), 6) for d in best)
+    return HeuristicCoefficients(*key, power_step), best_score, len(cache)
+
+
+def _pattern_search(point, score):
+    """在对数空间逐维放大/缩小，找不到更好的点时把倍率开平方，直到倍率小于 MIN_FACTOR"""
+    point, point_score = tuple(point), score(point)
+    factor = START_FACTOR
+    while factor >= MIN_FACTOR:
+        improved = False
+        for axis, direction in itertools.product(range(3), (1, -1)):
+            candidate = list(point)
+            candidate[axis] *= factor**direction
+            candidate_score = score(candidate)
+            if candidate_score > point_score:
+                point, point_score, improved = tuple(candidate), candidate_score, True
+        if not improved:
+            factor = factor**0.5
+    return point, point_score
+
+
+def _format(divisors):
+    return "distance/{:.3g}，|dy|/{:.3g}，dy/{:.3g}".format(*divisors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="标定物理计算推荐的系数")
+    parser.add_argument(
+        "--physics",
+        type=float,
+        nargs=3,
+        metavar=("VX_MUL", "VY_MUL", "GRAVITY"),
+        default=DEFAULT_CONFIG.physics_params,
+        help="物理参数（默认与游戏相同）",
+    )
+    parser.add_argument("--games", type=int, default=2000, help="每次评估的游戏场数")
+    parser.add_argument("--seed", type=int, default=42, help="场景种子")
+    parser.add_argument("--corpus", help="场景语料文件（.npz），指定时代替 --seed")
+    parser.add_argument(
+        "--power-step", type=float, default=0.1, help="推荐力度的取整间隔（1 = 整数力度）"
+    )
+    parser.add_argument("--profile", default=HEURISTIC_PROFILE, help="系数配置文件")
+    parser.add_argument("--dry-run", action="store_true", help="只输出结果，不写配置文件")
+    args = parser.parse_args()
+
+    config = config_for(args.physics)
+    power_step = int(args.power_step) if args.power_step.is_integer() else args.power_step
+    seed, corpus, games = args.seed, None, args.games
+    if args.corpus:
+        corpus = ScenarioCorpus.load(args.corpus)
+        seed, games = None, min(games, len(corpus))
+
+    print("🎯 物理计算推荐系数标定")
+    print("=" * 50)
+    print(f"   物理参数: {config.physics_params}，每次评估 {games} 场游戏")
+    print(f"   场景: {args.corpus or f'种子 {seed}'}，力度间隔: {power_step}")
+
+    current = heuristic_for(config, load_heuristic_profile(args.profile))
+    baseline = evaluate(DEFAULT_HEURISTIC, config, games, seed, corpus)
+    start = time.perf_counter()
+    coefficients, fitted, evaluations = calibrate(config, games, seed, corpus, power_step)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📊 标定结果（{evaluations} 次评估，{elapsed:.1f} 秒）")
+    print(f"   默认系数: 成功率 {baseline[0]:.2%}，平均得分 {baseline[1]:.1f}")
+    if current != DEFAULT_HEURISTIC:
+        previous = evaluate(current, config, games, seed, corpus)
+        print(f"   当前配置: 成功率 {previous[0]:.2%}，平均得分 {previous[1]:.1f}")
+    print(f"   标定系数: 成功率 {fitted[0]:.2%}，平均得分 {fitted[1]:.1f}")
+    print(f"   {coefficients}")
+    if seed is not None:
+        # 换一组种子检查是否过拟合了标定用的场景
+        holdout = evaluate(coefficients, config, games, seed + 1)
+        print(f"   验证场景（种子 {seed + 1}）: 成功率 {holdout[0]:.2%}，平均得分 {holdout[1]:.1f}")
+
+    if args.dry_run:
+        print("\n💡 --dry-run: 未写入配置文件")
+        return 0
+    save_heuristic_profile(
+        config,
+        coefficients,
+        args.profile,
+        success_rate=round(float(fitted[0]), 6),
+        average_score=round(fitted[1], 3),
+        games=games,
+        seed=seed,
+        corpus=args.corpus,
+        calibrated_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    print(f"\n💾 系数已写入: {args.profile}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
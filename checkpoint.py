@@ -0,0 +1,137 @@
+"""
+跳一跳游戏 - 批量测试的检查点
+每完成一场游戏就把结果追加到 JSONL 文件，并定期原子地重写检查点文件
+（已完成的游戏编号、随机数状态、累计统计、运行配置）。
+中断或崩溃后用 --resume 从检查点继续，最多损失一场正在进行的游戏。
+"""
+
+import json
+import os
+import random
+from datetime import datetime
+
+from jump_log import json_default
+
+
+def _write_atomic(path, data):
+    """先写临时文件再替换，避免崩溃时留下半个检查点"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CheckpointMismatch(Exception):
+    """检查点的运行配置与当前配置不一致"""
+
+
+class BatchCheckpoint:
+    """
+    settings: 描述本次运行的配置字典（种子、语料、AI模式、推荐策略等），
+    恢复时必须与检查点中保存的一致，否则前后结果不可比。
+    """
+
+    def __init__(self, path, settings):
+        self.path = path
+        self.results_path = os.path.splitext(path)[0] + "_results.jsonl"
+        self.settings = settings
+        self.completed = []
+        self.stats = {"successful_games": 0, "total_jumps": 0, "total_score": 0}
+        self.elapsed = 0.0
+        self.random_state = None
+        self.created = datetime.now().isoformat()
+        self._results_file = None
+
+    @classmethod
+    def resume(cls, path, settings):
+        """读取检查点并校验配置，返回 (检查点, 已完成游戏的结果列表)"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        checkpoint = cls(path, settings)
+        different = {
+            key: (data["settings"].get(key), value)
+            for key, value in settings.items()
+            if key != "total_games" and data["settings"].get(key) != value
+        }
+        if different:
+            details = ", ".join(f"{k}: {old} → {new}" for k, (old, new) in different.items())
+            raise CheckpointMismatch(f"检查点的运行配置与当前配置不一致（{details}）")
+
+        checkpoint.completed = data["completed"]
+        checkpoint.stats = data["stats"]
+        checkpoint.elapsed = data["elapsed_s"]
+        checkpoint.created = data["created"]
+        if data["random_state"] is not None:
+            version, state, gauss_next = data["random_state"]
+            checkpoint.random_state = (version, tuple(state), gauss_next)
+        return checkpoint, checkpoint.load_results()
+
+    def load_results(self):
+        """
+        读取已完成游戏的结果。检查点之后才写入的结果（以及崩溃时写了一半的行）会被忽略，
+        这些游戏会重新进行。
+        """
+        completed = set(self.completed)
+        by_id = {}
+        if os.path.exists(self.results_path):
+            with open(self.results_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if result["game_id"] in completed:
+                        by_id[result["game_id"]] = result
+        missing = completed - by_id.keys()
+        if missing:
+            raise ValueError(f"检查点结果文件缺少 {len(missing)} 场游戏的结果")
+        return [by_id[game_id] for game_id in self.completed]
+
+    def open(self, fresh):
+        self._results_file = open(
+            self.results_path, "w" if fresh else "a", encoding="utf-8"
+        )
+
+    def record(self, result):
+        """追加一场已完成游戏的结果"""
+        self._results_file.write(
+            json.dumps(result, ensure_ascii=False, default=json_default) + "\n"
+        )
+        self.completed.append(result["game_id"])
+        self.stats["total_jumps"] += result["jumps_count"]
+        self.stats["total_score"] += result["score"]
+        if result["success_rate"] > 0:
+            self.stats["successful_games"] += 1
+
+    def save(self, elapsed):
+        """把结果文件刷到磁盘后写入检查点；elapsed 为本次运行已用的秒数"""
+        self._results_file.flush()
+        os.fsync(self._results_file.fileno())
+        _write_atomic(
+            self.path,
+            {
+                "created": self.created,
+                "updated": datetime.now().isoformat(),
+                "settings": self.settings,
+                "completed": self.completed,
+                "stats": self.stats,
+                "elapsed_s": self.elapsed + elapsed,
+                "random_state": random.getstate(),
+                "results_file": self.results_path,
+            },
+        )
+
+    def close(self):
+        if self._results_file is not None:
+            self._results_file.close()
+            self._results_file = None
+
+    def remove(self):
+        """运行完成、结果已保存后删除检查点文件"""
+        self.close()
+        for path in (self.path, self.results_path):
+            if os.path.exists(path):
+                os.remove(path)
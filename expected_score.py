@@ -0,0 +1,408 @@
+"""
+跳一跳游戏 - 用马尔可夫链精确计算策略的期望得分
+平台间距和高度来自已知的均匀分布（scenarios.py），玩家成功落地后的局面只由两个量决定：
+落点在平台上的偏移 u 和玩家高度 y（= 平台顶部 - 玩家半径）。把 (u, y) 分箱作为状态，
+逐跳推进状态分布即可得到生存曲线和期望得分，不需要模拟任何一场完整的游戏。
+
+转移概率在相对几何量 (间隔 g = 平台左边缘 - 玩家x, 高度差 dy = 平台顶部 - 玩家y) 的网格单元上解析积分：
+力度固定时，能着陆的 (g, dy) 是一组与坐标轴平行的矩形（第 s 步下落时 dy 在碰撞判定的窗口内、
+落点在平台上），单元内成功的面积和落点偏移的分布都可以精确算出。策略的力度在网格角点上批量计算一次，
+四个角点力度相同、且该力度在单元内全部成功或全部失败的单元直接积分；其余单元（获胜区间的边界附近）
+再按角点力度的着陆矩形边界切分，在每一小块的中心重新询问策略后积分。
+因此比网格还窄的失败区域也不会被漏掉，确定性策略（如 solver）的结果与蒙特卡洛在统计误差内一致。
+
+策略需要只依赖玩家与平台的相对位置（水平、竖直平移都不改变推荐），物理计算推荐和 solver 都满足。
+
+用法:
+    python expected_score.py                                        # 物理计算策略
+    python expected_score.py --policy solver --solver-step 0.1 --solver-max-power 10 --jit
+    python expected_score.py --policy solver --solver-step 1 --compare 20000   # 与蒙特卡洛对比
+"""
+
+import argparse
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from jump_physics import DEFAULT_CONFIG, MAX_STEPS
+from scenarios import HEIGHT_RANGE, MAX_DISTANCE, MIN_DISTANCE, MIN_HEIGHT
+from strategies import SOLVER_MAX_POWER, SOLVER_STEP
+from vector_engine import (
+    MAX_JUMPS,
+    START_PLATFORM_X,
+    START_PLAYER,
+    VECTOR_POLICIES,
+    VectorGameEngine,
+)
+
+SCORE_PER_JUMP = 10  # 与 GameSimulator.play_single_game 一致
+
+# 默认网格：落点偏移分箱与平台间距单元共用的间隔（像素），平台高度的分箱数
+SPACING = 2.5
+HEIGHT_BINS = 32
+CHUNK = 1024  # 每次解析积分的矩形数，限制 (矩形, 步, 偏移分箱) 数组的内存
+MAX_DEPTH = 12  # 获胜区间边界附近的单元最多切分的层数
+RESOLUTION = 1e-6  # 切块的最小边长（像素），远大于轨迹累加的浮点误差
+
+ExpectedScore = namedtuple(
+    "ExpectedScore",
+    [
+        "score",  # 期望得分
+        "expected_jumps",  # 期望跳跃次数
+        "survival",  # survival[t] = 至少成功 t 次的概率，t = 0..max_jumps
+        "state_success",  # 形状为 (偏移分箱数, 高度分箱数) 的逐状态成功概率
+        "offsets",  # 状态网格的落点偏移（分箱中点）
+        "heights",  # 状态网格的玩家高度（分箱中点）
+    ],
+)
+
+
+def scalar_policy(recommend):
+    """
+    把逐个调用的推荐函数 recommend((px, py), (left, top, right)) -> 力度
+    （如 GameSimulator.calculate_physics_recommendation 或查表策略）包装成向量化策略
+    """
+
+    def policy(player_x, player_y, plat_left, plat_top, plat_right, config=DEFAULT_CONFIG):
+        return np.array(
+            [
+                recommend((px, py), (left, top, right))
+                for px, py, left, top, right in zip(
+                    player_x.tolist(),
+                    player_y.tolist(),
+                    plat_left.tolist(),
+                    plat_top.tolist(),
+                    plat_right.tolist(),
+                )
+            ],
+            dtype=np.float64,
+        )
+
+    return policy
+
+
+@lru_cache(maxsize=4096)
+def _landing_windows(power, config):
+    """
+    力度为 power 的轨迹中下落阶段的每一步，返回 (x位移, dy下界, dy上界, 上一步x位移, 上一步dy上界)。
+    与 jump_physics.simulate_jump 的判定一致：第 s 步 dy 在 [下界, 上界] 内、且 g <= x位移 <= g + 平台宽度
+    时着陆。没有上一个下落步时对应的值为 -inf。平台都在掉出屏幕的高度之上，不需要检查掉落
+    """
+    half = config.player_size / 2
+    # 玩家底部在平台顶部之下 [0, 10] 像素内（且不超过平台厚度）
+    tolerance = min(10, config.platform_height)
+    vx = power * config.vx_multiplier
+    vy = power * config.vy_multiplier
+    x = y = 0.0
+    xs, bottoms = [], []
+    for _ in range(MAX_STEPS):
+        x += vx
+        y += vy
+        vy += config.gravity
+        if y > config.canvas_height + 50:
+            break
+        if vy > 0:
+            xs.append(x)
+            bottoms.append(y + half)
+    xs, high = np.array(xs), np.array(bottoms)
+    previous_x = np.concatenate([[-np.inf], xs[:-1]])
+    previous_high = np.concatenate([[-np.inf], high[:-1]])
+    return xs, high - tolerance, high, previous_x, previous_high
+
+
+def _landing_masses(powers, g_lo, g_hi, dy_lo, dy_hi, config, bins):
+    """
+    力度分别固定为 powers 时，矩形 [g_lo, g_hi] × [dy_lo, dy_hi] 内成功着陆的面积按落点偏移分箱，
+    返回形状为 (矩形数, 分箱数) 的数组，bins 为偏移分箱的边界。
+    第 s 步的着陆区域是 dy 在第 s 步窗口内、g 在 [x_s - 平台宽度, x_s] 内的矩形，落点偏移为 x_s - g；
+    其中 dy 也在第 s-1 步窗口内、g <= x_{s-1} 的部分已在第 s-1 步着陆，需要扣除
+    （更早的步能着陆的部分都包含在其中）
+    """
+    width = config.platform_width
+    bin_lo, bin_width = bins[:-1], np.diff(bins)
+    masses = np.zeros((powers.size, bin_lo.size))
+
+    def cover(u):
+        """偏移区间 [0, u] 与每个分箱重叠的长度"""
+        return np.clip(u[..., None] - bin_lo, 0, bin_width)
+
+    for power in np.unique(powers):
+        rows = np.flatnonzero(powers == power)
+        xs, low, high, previous_x, previous_high = _landing_windows(float(power), config)
+        # 只保留可能与这些矩形相交的步
+        keep = (
+            (high >= dy_lo[rows].min())
+            & (low <= dy_hi[rows].max())
+            & (xs >= g_lo[rows].min())
+            & (xs - width <= g_hi[rows].max())
+        )
+        xs, low, high = xs[keep], low[keep], high[keep]
+        previous_x, previous_high = previous_x[keep], previous_high[keep]
+        for start in range(0, rows.size, CHUNK):
+            chunk = rows[start : start + CHUNK]
+            gl, gh, dl, dh = (a[chunk, None] for a in (g_lo, g_hi, dy_lo, dy_hi))
+            # 本步能着陆的 dy 长度，以及其中上一步也能着陆的部分
+            dy_all = np.clip(np.minimum(high, dh) - np.maximum(low, dl), 0, None)
+            dy_previous = np.clip(np.minimum(previous_high, dh) - np.maximum(low, dl), 0, None)
+            # 本步能着陆的 g 区间 [first, last]，其中 g <= overlap 的部分上一步也能着陆
+            first = np.maximum(xs - width, gl)
+            last = np.maximum(np.minimum(xs, gh), first)
+            overlap = np.clip(np.minimum(previous_x, gh), first, last)
+            far = cover(xs - first)
+            masses[chunk] = np.einsum("ns,nsb->nb", dy_all, far - cover(xs - last))
+            masses[chunk] -= np.einsum("ns,nsb->nb", dy_previous, far - cover(xs - overlap))
+    return masses
+
+
+def _cuts(values, low, high):
+    """区间 [low, high] 的切分点（含两端），相距不到 RESOLUTION 的切分点合并"""
+    cuts = [low]
+    for value in sorted(values):
+        if cuts[-1] + RESOLUTION < value < high - RESOLUTION:
+            cuts.append(value)
+    cuts.append(high)
+    return np.array(cuts)
+
+
+def _cell_outcomes(policy, config, g_edges, dy_edges, player_y, bins):
+    """
+    网格 g_edges × dy_edges 每个单元内（g、dy 均匀分布）成功着陆并落在各偏移分箱的概率，
+    返回形状为 (g单元数, dy单元数, 分箱数) 的数组。策略在玩家高度 player_y 处询问。
+
+    矩形四个角点的力度都在整个矩形内成功（或都失败）时直接积分；否则按角点力度的着陆矩形边界
+    （没有边界穿过时取中线）切块，询问各块角点的力度后继续，最多切 MAX_DEPTH 层，
+    到达上限的块取四个角点力度积分结果的平均
+    """
+    px = config.canvas_width / 2
+    width = config.platform_width
+
+    def ask(g, dy):
+        x = np.full(g.shape, px)
+        y = np.full(g.shape, np.float64(player_y))
+        return np.asarray(policy(x, y, x + g, y + dy, x + g + width, config), dtype=np.float64)
+
+    shape = (g_edges.size - 1, dy_edges.size - 1)
+    masses = np.zeros((shape[0] * shape[1], bins.size - 1))
+    g_lo, dy_lo = (a.ravel() for a in np.meshgrid(g_edges[:-1], dy_edges[:-1], indexing="ij"))
+    g_hi, dy_hi = (a.ravel() for a in np.meshgrid(g_edges[1:], dy_edges[1:], indexing="ij"))
+    area = (g_hi - g_lo) * (dy_hi - dy_lo)
+    cell = np.arange(masses.shape[0])
+
+    for depth in range(MAX_DEPTH + 1):
+        # 角点顺序：(g_lo, dy_lo), (g_hi, dy_lo), (g_lo, dy_hi), (g_hi, dy_hi)。
+        # 切块的边正好是着陆判定的边界，角点向内收半个 RESOLUTION，避免询问到边界上的浮点舍入
+        inset = RESOLUTION / 2
+        corner_g = np.stack([g_lo + inset, g_hi - inset] * 2, axis=1)
+        corner_dy = np.stack([dy_lo + inset] * 2 + [dy_hi - inset] * 2, axis=1)
+        corners = ask(corner_g.ravel(), corner_dy.ravel()).reshape(-1, 4)
+
+        # 每个矩形的不同角点力度各积分一次，重复的角点只计权重
+        corner_masses = np.zeros((cell.size, bins.size - 1))
+        full = np.ones(cell.size, dtype=bool)
+        empty = np.ones(cell.size, dtype=bool)
+        for c in range(4):
+            rows = np.flatnonzero(~(corners[:, :c] == corners[:, c : c + 1]).any(axis=1))
+            weight = (corners[rows] == corners[rows, c : c + 1]).sum(axis=1)
+            piece = _landing_masses(
+                corners[rows, c], g_lo[rows], g_hi[rows], dy_lo[rows], dy_hi[rows], config, bins
+            )
+            corner_masses[rows] += piece * (weight[:, None] / 4)
+            fraction = piece.sum(axis=1) / ((g_hi - g_lo) * (dy_hi - dy_lo))[rows]
+            full[rows] &= fraction > 1 - 1e-9
+            empty[rows] &= fraction < 1e-9
+
+        settled = full | empty if depth < MAX_DEPTH else np.ones(cell.size, dtype=bool)
+        np.add.at(masses, cell[settled], corner_masses[settled])
+
+        pieces = []
+        for r in np.flatnonzero(~settled):
+            g_cuts, dy_cuts = [], []
+            for power in np.unique(corners[r]):
+                xs, low, high, _, _ = _landing_windows(float(power), config)
+                steps = (high >= dy_lo[r]) & (low <= dy_hi[r])
+                g_cuts.extend(xs[steps] - width)
+                g_cuts.extend(xs[steps])
+                dy_cuts.extend(low[steps])
+                dy_cuts.extend(high[steps])
+            g_cuts = _cuts(g_cuts, g_lo[r], g_hi[r])
+            dy_cuts = _cuts(dy_cuts, dy_lo[r], dy_hi[r])
+            if g_cuts.size == 2 and dy_cuts.size == 2:
+                g_cuts = _cuts([(g_lo[r] + g_hi[r]) / 2], g_lo[r], g_hi[r])
+                dy_cuts = _cuts([(dy_lo[r] + dy_hi[r]) / 2], dy_lo[r], dy_hi[r])
+            i, j = np.meshgrid(np.arange(g_cuts.size - 1), np.arange(dy_cuts.size - 1))
+            i, j = i.ravel(), j.ravel()
+            pieces.append(
+                (np.full(i.size, cell[r]), g_cuts[i], g_cuts[i + 1], dy_cuts[j], dy_cuts[j + 1])
+            )
+        if not pieces:
+            break
+        cell, g_lo, g_hi, dy_lo, dy_hi = (np.concatenate(column) for column in zip(*pieces))
+
+    return (masses / area[:, None]).reshape(shape + (bins.size - 1,))
+
+
+def _grid_size(length, spacing, name):
+    count = length / spacing
+    if abs(count - round(count)) > 1e-9:
+        raise ValueError(f"{name}（{length}）必须是网格间隔 {spacing} 的整数倍")
+    return int(round(count))
+
+
+def expected_score(
+    policy="physics",
+    config=DEFAULT_CONFIG,
+    max_jumps=MAX_JUMPS,
+    spacing=SPACING,
+    height_bins=HEIGHT_BINS,
+    **policy_options,
+):
+    """
+    计算策略的期望得分和生存曲线。
+
+    policy: VECTOR_POLICIES 中的名字（policy_options 传给策略工厂），
+    或签名与 vector_engine 策略相同的向量化函数（逐个调用的推荐函数用 scalar_policy 包装）。
+    spacing: 落点偏移分箱和平台间距单元的共同间隔（像素）；
+    height_bins: 平台高度的分箱数。网格只影响状态的离散化，每跳的成功概率按单元解析积分。
+    """
+    if isinstance(policy, str):
+        if policy not in VECTOR_POLICIES:
+            raise ValueError(f"未知的向量化策略: {policy}")
+        policy = VECTOR_POLICIES[policy](**policy_options)
+
+    half = config.player_size / 2
+    offset_bins = _grid_size(config.platform_width, spacing, "平台宽度")
+    distance_cells = _grid_size(MAX_DISTANCE - MIN_DISTANCE, spacing, "平台间距范围")
+    bins = np.arange(offset_bins + 1) * spacing
+    offsets = (bins[:-1] + bins[1:]) / 2
+    top_edges = MIN_HEIGHT + np.arange(height_bins + 1) * (HEIGHT_RANGE / height_bins)
+    tops = (top_edges[:-1] + top_edges[1:]) / 2
+    heights = tops - half
+
+    # 状态 (i, j)：落点偏移在第 i 个分箱的中点、玩家站在第 j 个高度分箱中点的平台上。
+    # 间距 d 与偏移 u 用同一个间隔，所以 g = d - u 的单元 m 对应所有满足
+    # 0 <= m - (offset_bins - 1) + i < distance_cells 的状态；目标平台在第 k 个高度分箱时
+    # dy 单元为 k - j + height_bins - 1，相同的 (g, dy) 单元只积分一次
+    g_edges = (
+        MIN_DISTANCE - offsets[-1] + np.arange(distance_cells + offset_bins) * spacing
+    )
+    dy_edges = (np.arange(2 * height_bins) - height_bins + 0.5) * (
+        HEIGHT_RANGE / height_bins
+    ) + half
+    outcomes = _cell_outcomes(policy, config, g_edges, dy_edges, heights.mean(), bins)
+
+    # 对每个偏移分箱 i 把它的间距窗口内的单元累加：window[i, dy单元, 落点分箱]
+    cumulative = np.concatenate([np.zeros((1,) + outcomes.shape[1:]), np.cumsum(outcomes, axis=0)])
+    low = offset_bins - 1 - np.arange(offset_bins)
+    window = cumulative[low + distance_cells] - cumulative[low]
+    # 转移矩阵 transition[(i, j), (落点分箱, k)]
+    j, k = np.arange(height_bins)[:, None], np.arange(height_bins)[None, :]
+    transition = window[:, k - j + height_bins - 1, :].transpose(0, 1, 3, 2)
+    transition = transition.reshape(offset_bins * height_bins, offset_bins * height_bins)
+    transition /= distance_cells * height_bins
+
+    # 开局状态不在网格上，第一跳单独积分
+    start_offset = START_PLAYER[0] - START_PLATFORM_X
+    start = _cell_outcomes(
+        policy,
+        config,
+        MIN_DISTANCE - start_offset + np.arange(distance_cells + 1) * spacing,
+        top_edges - START_PLAYER[1],
+        START_PLAYER[1],
+        bins,
+    )
+    distribution = start.sum(axis=0).T.ravel() / (distance_cells * height_bins)
+
+    survival = np.empty(max_jumps + 1)
+    survival[0] = 1.0
+    for t in range(1, max_jumps + 1):
+        if t > 1:
+            distribution = distribution @ transition
+        survival[t] = distribution.sum()
+
+    return ExpectedScore(
+        score=SCORE_PER_JUMP * survival[1:].sum(),
+        expected_jumps=survival[:-1].sum(),
+        survival=survival,
+        state_success=transition.sum(axis=1).reshape(offset_bins, height_bins),
+        offsets=offsets,
+        heights=heights,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="用马尔可夫链计算策略的期望得分")
+    parser.add_argument("--policy", choices=sorted(VECTOR_POLICIES), default="physics")
+    parser.add_argument(
+        "--solver-step", type=float, default=SOLVER_STEP, help="solver策略的力度间隔"
+    )
+    parser.add_argument(
+        "--solver-max-power",
+        type=float,
+        default=SOLVER_MAX_POWER,
+        help="solver策略的最大力度",
+    )
+    parser.add_argument(
+        "--jit", action="store_true", help="solver策略使用JIT物理内核（需要安装numba）"
+    )
+    parser.add_argument("--max-jumps", type=int, default=MAX_JUMPS, help="每场游戏的跳跃上限")
+    parser.add_argument(
+        "--spacing", type=float, default=SPACING, help="落点偏移分箱和平台间距单元的间隔（像素）"
+    )
+    parser.add_argument(
+        "--height-bins", type=int, default=HEIGHT_BINS, help="平台高度的分箱数"
+    )
+    parser.add_argument(
+        "--compare", type=int, default=0, help="同时用向量化引擎模拟这么多场游戏作对比"
+    )
+    args = parser.parse_args()
+
+    options = {}
+    if args.policy == "solver":
+        step = args.solver_step
+        options = {
+            "step": int(step) if step.is_integer() else step,
+            "max_power": args.solver_max_power,
+            "jit": args.jit,
+        }
+
+    start = time.perf_counter()
+    result = expected_score(
+        args.policy,
+        max_jumps=args.max_jumps,
+        spacing=args.spacing,
+        height_bins=args.height_bins,
+        **options,
+    )
+    elapsed = time.perf_counter() - start
+
+    print("🧮 期望得分（马尔可夫链）")
+    print("=" * 50)
+    print(f"   策略: {args.policy}，跳跃上限: {args.max_jumps}")
+    offset_bins, num_heights = result.state_success.shape
+    print(
+        f"   网格: 间隔 {args.spacing} 像素，{offset_bins}×{num_heights} 个状态"
+    )
+    print(f"   耗时: {elapsed * 1000:.0f} 毫秒")
+    print(f"   期望得分: {result.score:.2f}，期望跳跃次数: {result.expected_jumps:.2f}")
+    print(f"   第一跳成功率: {result.survival[1]:.2%}")
+    print(f"   逐状态成功概率: 平均 {result.state_success.mean():.2%}，最低 {result.state_success.min():.2%}")
+    marks = [t for t in (1, 2, 5, 10, 20, 50, 100) if t <= args.max_jumps]
+    print("   生存曲线: " + "，".join(f"{t}跳 {result.survival[t]:.2%}" for t in marks))
+
+    if args.compare:
+        engine = VectorGameEngine(policy=args.policy, max_jumps=args.max_jumps, **options)
+        start = time.perf_counter()
+        results = engine.run(args.compare)
+        elapsed = time.perf_counter() - start
+        scores = results.scores
+        stderr = scores.std(ddof=1) / np.sqrt(len(scores)) if len(scores) > 1 else 0.0
+        print(f"\n🎲 蒙特卡洛对比（{args.compare} 场，{elapsed:.2f} 秒）")
+        print(f"   平均得分: {scores.mean():.2f} ± {1.96 * stderr:.2f}（95%）")
+        print(f"   与期望得分之差: {scores.mean() - result.score:+.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+"""
+跳一跳游戏 - 本地Gemini替身
+接口与 genai.GenerativeModel.generate_content 兼容，用物理求解器的小数力度加噪声作答，
+可配置延迟分布、错误率和响应格式（包括不合法的格式），用于离线的负载和延迟测试。
+"""
+
+import json
+import random
+import threading
+import time
+
+from jump_physics import config_for, heuristic_power, solve_power
+from strategies import SOLVER_MAX_POWER, SOLVER_STEP
+
+# 作答保留的小数位数（与 ai_agent.CANDIDATE_DIGITS 相同）
+ANSWER_DIGITS = 2
+
+# 可选的响应格式
+RESPONSE_FORMATS = {
+    "plain": lambda power: str(power),
+    "verbose": lambda power: f"根据抛物线计算，推荐的跳跃力度为 {power}。",
+    "json": lambda power: json.dumps({"power": power}),
+    "malformed": lambda power: "力度大约是中等偏大",
+    "out_of_range": lambda power: str(power + 150),
+    "empty": lambda power: "",
+}
+
+
+class FakeModelError(Exception):
+    """模拟的API调用失败"""
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def parse_formats(spec):
+    """解析 "plain=0.8,malformed=0.2" 形式的格式权重"""
+    weights = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in RESPONSE_FORMATS:
+            raise ValueError(f"未知的响应格式: {name}")
+        weights[name] = float(weight) if weight else 1.0
+    return weights
+
+
+class FakeGeminiModel:
+    """
+    本地替身模型
+
+    latency_dist: "fixed" | "uniform" | "lognormal"
+        fixed     - 固定 latency_ms
+        uniform   - [latency_ms - spread, latency_ms + spread] 毫秒内均匀分布
+        lognormal - 中位数 latency_ms，对数标准差 spread
+    error_rate: 抛出 FakeModelError 的概率
+    formats: {格式名: 权重}，见 RESPONSE_FORMATS
+    noise: 在求解器力度上叠加的高斯噪声标准差
+    """
+
+    # 告诉 JumpAIAgent 可以把场景信息一起传进来
+    accepts_scenario = True
+
+    def __init__(
+        self,
+        latency_dist="lognormal",
+        latency_ms=300.0,
+        latency_spread=0.5,
+        error_rate=0.0,
+        formats=None,
+        noise=0.0,
+        seed=None,
+    ):
+        if latency_dist not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"未知的延迟分布: {latency_dist}")
+        self.latency_dist = latency_dist
+        self.latency_ms = latency_ms
+        self.latency_spread = latency_spread
+        self.error_rate = error_rate
+        self.formats = formats or {"plain": 1.0}
+        self.noise = noise
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_latency(self):
+        """按配置的分布抽取一次延迟（秒）"""
+        with self._lock:
+            if self.latency_dist == "fixed":
+                ms = self.latency_ms
+            elif self.latency_dist == "uniform":
+                ms = self._rng.uniform(
+                    self.latency_ms - self.latency_spread,
+                    self.latency_ms + self.latency_spread,
+                )
+            else:
+                ms = self.latency_ms * self._rng.lognormvariate(0, self.latency_spread)
+        return max(ms, 0.0) / 1000
+
+    def answer_power(self, scenario):
+        """
+        求解器（SOLVER_STEP 间隔的小数力度）加噪声，保留 ANSWER_DIGITS 位小数；
+        求解器无解时用物理估算，没有场景时随机给出一个常见范围内的力度
+        """
+        power = None
+        if scenario is not None:
+            player_pos, target_platform, physics_params = scenario
+            power = solve_power(
+                player_pos,
+                target_platform,
+                config_for(physics_params),
+                step=SOLVER_STEP,
+                max_power=SOLVER_MAX_POWER,
+            )
+            if power is None:
+                power = heuristic_power(player_pos, target_platform)
+        with self._lock:
+            if power is None:
+                power = self._rng.uniform(1, 5)
+            if self.noise:
+                power += self._rng.gauss(0, self.noise)
+        return round(max(0, min(100, power)), ANSWER_DIGITS)
+
+    def generate_content(self, prompt, generation_config=None, scenario=None):
+        time.sleep(self.sample_latency())
+
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+            names = list(self.formats)
+            fmt = self._rng.choices(names, weights=[self.formats[n] for n in names])[0]
+        if failed:
+            raise FakeModelError("模拟的API错误: 503 Service Unavailable")
+
+        power = self.answer_power(scenario)
+        mime_type = getattr(generation_config, "response_mime_type", None)
+        if mime_type == "application/json" and fmt != "malformed":
+            # 多候选模式：以求解器力度为中心给出几个候选
+            candidates = [
+                round(power + offset, ANSWER_DIGITS) for offset in (0, SOLVER_STEP, -SOLVER_STEP)
+            ]
+            return FakeResponse(
+                json.dumps({"candidates": [p for p in candidates if 0 <= p <= 100]})
+            )
+        return FakeResponse(RESPONSE_FORMATS[fmt](power))
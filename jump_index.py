@@ -0,0 +1,205 @@
+"""
+跳一跳游戏 - 历史跳跃的最近邻推荐索引
+从 batch_ai_test 的详细日志（ai_detailed_log_*.json）中取出成功的跳跃，
+按相对几何量 (平台中心与玩家的水平距离 dx, 高度差 dy, 平台宽度) 存入网格分桶，
+不同物理参数各自一组。查询时在相邻的桶中找最近的成功跳跃，
+距离不超过 radius 像素就直接返回它的力度，否则视为未命中（由调用方请求模型）。
+纯Python实现，服务端可以直接导入。
+
+用法:
+    python jump_index.py build ai_detailed_log_*.json            # 生成/覆盖 jump_index.json
+    python jump_index.py build ai_detailed_log_new.json --append  # 追加到已有索引
+    python jump_index.py stats
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import threading
+
+from jump_physics import config_for, physics_key, relative_geometry
+
+INDEX_FILE = "jump_index.json"
+DEFAULT_RADIUS = 2.0  # 命中所需的最大几何距离（像素）
+
+
+class JumpIndex:
+    """
+    成功跳跃的网格分桶索引：{物理参数: {桶坐标: [(dx, dy, 宽度, 力度), ...]}}，
+    桶的边长等于 radius，因此最近邻一定在查询点所在桶及其相邻的26个桶中。
+    服务端在多个线程中同时查询、加入和保存，索引和命中统计都由锁保护。
+    """
+
+    def __init__(self, radius=DEFAULT_RADIUS):
+        self.radius = radius
+        self.groups = {}
+        self.size = 0
+        # 查询统计
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 保存时写同一个临时文件，同一时间只允许一个线程保存
+        self._save_lock = threading.Lock()
+
+    def _cell(self, point):
+        return tuple(math.floor(value / self.radius) for value in point)
+
+    def add(self, player_pos, target_platform, physics_params, power):
+        """加入一次成功的跳跃"""
+        point = relative_geometry(player_pos, target_platform)
+        key = physics_key(config_for(physics_params))
+        with self._lock:
+            group = self.groups.setdefault(key, {})
+            group.setdefault(self._cell(point), []).append((*point, power))
+            self.size += 1
+
+    def nearest(self, player_pos, target_platform, physics_params):
+        """返回 (最近的成功跳跃的力度, 几何距离)；同一物理参数下没有任何跳跃时返回 (None, inf)"""
+        with self._lock:
+            return self._nearest(player_pos, target_platform, physics_params)
+
+    def _nearest(self, player_pos, target_platform, physics_params):
+        group = self.groups.get(physics_key(config_for(physics_params)))
+        if not group:
+            return None, math.inf
+        point = relative_geometry(player_pos, target_platform)
+        cx, cy, cw = self._cell(point)
+        best_power, best_distance = None, math.inf
+        for i in (-1, 0, 1):
+            for j in (-1, 0, 1):
+                for k in (-1, 0, 1):
+                    for *other, power in group.get((cx + i, cy + j, cw + k), ()):
+                        distance = math.dist(point, other)
+                        if distance < best_distance:
+                            best_power, best_distance = power, distance
+        return best_power, best_distance
+
+    def lookup(self, player_pos, target_platform, physics_params):
+        """距离不超过 radius 的最近邻力度，未命中时返回 None"""
+        with self._lock:
+            power, distance = self._nearest(player_pos, target_platform, physics_params)
+            if distance <= self.radius:
+                self.hits += 1
+                return power
+            self.misses += 1
+            return None
+
+    def add_log(self, log_file):
+        """读入一个详细日志中的成功跳跃，返回加入的条数"""
+        with open(log_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        config = data.get("config", {})
+        physics_params = (
+            config.get("vx_multiplier", 2.0),
+            config.get("vy_multiplier", -3.0),
+            config.get("gravity", 0.5),
+        )
+        added = 0
+        for game in data["results"]:
+            for jump in game["jumps"]:
+                if jump["success"]:
+                    self.add(
+                        jump["player_pos"],
+                        jump["target_platform"],
+                        physics_params,
+                        jump["recommended_power"],
+                    )
+                    added += 1
+        return added
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self.size,
+                "physics_groups": len(self.groups),
+                "radius": self.radius,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def save(self, path=INDEX_FILE):
+        """
+        写入JSON（先写临时文件再替换，服务运行中保存也不会留下损坏的文件）。
+        在锁内复制一份快照，序列化和写文件时不阻塞查询和加入
+        """
+        with self._lock:
+            data = {
+                "radius": self.radius,
+                "groups": [
+                    {
+                        "physics_params": list(key),
+                        "points": [entry for cell in group.values() for entry in cell],
+                    }
+                    for key, group in self.groups.items()
+                ],
+            }
+        with self._save_lock:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE, radius=None):
+        """读取索引；radius 不为 None 时按新的半径重新分桶"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data["radius"] if radius is None else radius)
+        for entry in data["groups"]:
+            key = physics_key(config_for(entry["physics_params"]))
+            group = index.groups.setdefault(key, {})
+            for point in entry["points"]:
+                group.setdefault(index._cell(point[:3]), []).append(tuple(point))
+                index.size += 1
+        return index
+
+
+def expand_paths(patterns):
+    """展开通配符（Windows 的命令行不会替我们展开）"""
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史跳跃的最近邻推荐索引")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="从详细日志构建索引")
+    build.add_argument("logs", nargs="+", help="详细日志（支持通配符）")
+    build.add_argument("-o", "--output", default=INDEX_FILE, help="索引文件")
+    build.add_argument("--radius", type=float, default=DEFAULT_RADIUS, help="命中半径（像素）")
+    build.add_argument("--append", action="store_true", help="追加到已有的索引文件")
+    stats = sub.add_parser("stats", help="查看索引规模")
+    stats.add_argument("index", nargs="?", default=INDEX_FILE)
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        index = JumpIndex.load(args.index)
+        print(f"📇 {args.index}: {index.size} 条成功跳跃，{len(index.groups)} 组物理参数")
+        for key, group in index.groups.items():
+            print(f"   {key}: {sum(len(cell) for cell in group.values())} 条，{len(group)} 个桶")
+        return 0
+
+    if args.append and os.path.exists(args.output):
+        index = JumpIndex.load(args.output, args.radius)
+    else:
+        index = JumpIndex(args.radius)
+    print("📇 构建最近邻推荐索引")
+    print("=" * 50)
+    for path in expand_paths(args.logs):
+        if not os.path.exists(path):
+            print(f"❌ 找不到日志: {path}")
+            return 1
+        print(f"   {path}: {index.add_log(path)} 条成功跳跃")
+    index.save(args.output)
+    print(f"💾 索引已写入: {args.output}（共 {index.size} 条，命中半径 {index.radius} 像素）")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,244 @@
+"""
+跳一跳游戏 - 紧凑的跳跃记录
+每场游戏的跳跃记录按列存放在 array 中（每次跳跃约70字节），
+只在写出详细日志时才转换为原有的JSON格式（每次跳跃一个字典）。
+耐力模式使用 JumpStream：逐跳写入JSONL文件，内存中只保留累计统计。
+开启落点余量分析时，每次跳跃另有一项 "margin"（见 margin_entry）。
+"""
+
+import json
+import math
+import time
+from array import array
+
+from jump_physics import landing_error
+
+
+class JumpLog:
+    """
+    单场游戏的跳跃记录（列式存储）。
+    支持 len()、下标和迭代，取出的每一项都是与原日志格式相同的字典。
+    """
+
+    __slots__ = (
+        "player_x",
+        "player_y",
+        "target_left",
+        "target_y",
+        "target_right",
+        "power",
+        "success",
+        "final_x",
+        "final_y",
+        "steps",
+        "window_low",
+        "window_high",
+        "window_width",
+        "margin_error",
+        "window_gaps",
+        "success_count",
+    )
+
+    def __init__(self):
+        self.player_x = array("d")
+        self.player_y = array("d")
+        self.target_left = array("d")
+        self.target_y = array("d")
+        self.target_right = array("d")
+        self.power = array("d")
+        self.success = array("b")
+        self.final_x = array("d")
+        self.final_y = array("d")
+        self.steps = array("i")
+        # 落点余量（vector_engine.landing_margin），未开启分析时为空
+        self.window_low = array("d")
+        self.window_high = array("d")
+        self.window_width = array("d")
+        self.margin_error = array("d")
+        self.window_gaps = array("i")
+        self.success_count = 0
+
+    @classmethod
+    def from_columns(cls, **columns):
+        """
+        由等长的列构建，列名同 __slots__，取值为支持缓冲区协议的数组
+        （如 numpy 数组：success 为 int8、steps 和 window_gaps 为 int32，其余为 float64）
+        """
+        log = cls()
+        for name, values in columns.items():
+            getattr(log, name).frombytes(memoryview(values).cast("B"))
+        log.success_count = sum(log.success)
+        return log
+
+    def append(
+        self, player_pos, target_platform, power, success, final_pos, steps, margin=None
+    ):
+        if margin is not None:
+            low, high, width, error, gaps = margin
+            self.window_low.append(low)
+            self.window_high.append(high)
+            self.window_width.append(width)
+            self.margin_error.append(error)
+            self.window_gaps.append(gaps)
+        self.player_x.append(player_pos[0])
+        self.player_y.append(player_pos[1])
+        self.target_left.append(target_platform[0])
+        self.target_y.append(target_platform[1])
+        self.target_right.append(target_platform[2])
+        self.power.append(power)
+        self.success.append(success)
+        self.final_x.append(final_pos[0])
+        self.final_y.append(final_pos[1])
+        self.steps.append(steps)
+        self.success_count += success
+
+    def __len__(self):
+        return len(self.power)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("跳跃记录下标越界")
+        power = self.power[i]
+        entry = {
+            "jump_number": i + 1,
+            "player_pos": (self.player_x[i], self.player_y[i]),
+            "target_platform": (
+                self.target_left[i],
+                self.target_y[i],
+                self.target_right[i],
+            ),
+            # 推荐力度通常是整数，保持原日志中的整数格式
+            "recommended_power": int(power) if power.is_integer() else power,
+            "success": bool(self.success[i]),
+            "final_pos": (self.final_x[i], self.final_y[i]),
+            "steps": self.steps[i],
+        }
+        if i < len(self.window_width):
+            entry["margin"] = margin_entry(
+                power,
+                (
+                    self.window_low[i],
+                    self.window_high[i],
+                    self.window_width[i],
+                    self.margin_error[i],
+                    self.window_gaps[i],
+                ),
+            )
+        return entry
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_list(self):
+        return list(self)
+
+
+class JumpStream:
+    """
+    与 JumpLog 接口相同的流式跳跃记录：每次跳跃写一行JSON，内存占用与跳跃次数无关。
+    累计统计包括成功次数、平均力度/步数，以及成功着陆时落点偏差的均值、标准差和最大值
+    （用于观察长时间运行中的数值漂移）。
+    """
+
+    def __init__(self, file, report_every=None):
+        self.file = file
+        self.report_every = report_every
+        self.count = 0
+        self.success_count = 0
+        self.power_sum = 0.0
+        self.steps_sum = 0
+        # 落点偏差的在线均值/方差（Welford算法）
+        self.error_mean = 0.0
+        self.error_m2 = 0.0
+        self.error_max = 0.0
+        self.started = time.perf_counter()
+
+    def append(
+        self, player_pos, target_platform, power, success, final_pos, steps, margin=None
+    ):
+        self.count += 1
+        entry = {
+            "jump_number": self.count,
+            "player_pos": player_pos,
+            "target_platform": target_platform,
+            "recommended_power": power,
+            "success": success,
+            "final_pos": final_pos,
+            "steps": steps,
+        }
+        if margin is not None:
+            entry["margin"] = margin_entry(power, margin)
+        self.file.write(json.dumps(entry) + "\n")
+        self.power_sum += power
+        self.steps_sum += steps
+        if success:
+            self.success_count += 1
+            error = landing_error(final_pos, target_platform)
+            delta = error - self.error_mean
+            self.error_mean += delta / self.success_count
+            self.error_m2 += delta * (error - self.error_mean)
+            self.error_max = max(self.error_max, abs(error))
+
+        if self.report_every and self.count % self.report_every == 0:
+            rate = self.count / (time.perf_counter() - self.started)
+            print(
+                f"   📈 已跳跃 {self.count} 次 | 成功 {self.success_count} | "
+                f"{rate:.0f} 次/秒 | 落点偏差 {self.error_mean:+.2f}±{self.error_std():.2f}"
+            )
+
+    def __len__(self):
+        return self.count
+
+    def error_std(self):
+        if self.success_count < 2:
+            return 0.0
+        return math.sqrt(self.error_m2 / (self.success_count - 1))
+
+    def summary(self):
+        return {
+            "jumps": self.count,
+            "successes": self.success_count,
+            "mean_power": self.power_sum / self.count if self.count else 0,
+            "mean_steps": self.steps_sum / self.count if self.count else 0,
+            "landing_error_mean": self.error_mean,
+            "landing_error_std": self.error_std(),
+            "landing_error_max": self.error_max,
+        }
+
+
+def margin_entry(power, margin):
+    """
+    落点余量的日志格式。margin 为 vector_engine.landing_margin 的结果 (下界, 上界, 宽度, 落点偏差, 间断数)：
+    window 为所选力度所在（或最近）的获胜力度连续段，position 为所选力度在该段中的相对位置（0-1 之间表示在段内），
+    edge_margin 为所选力度到最近边界的距离（力度单位，负值表示在段外），
+    window_gaps 为获胜力度之间的间断数（0 表示获胜力度连成一段），
+    landing_error 为落点与平台中心的水平偏差（像素）。没有获胜力度时区间相关的值为 None
+    """
+    low, high, width, error, gaps = margin
+    if math.isnan(low):
+        return {
+            "window": None,
+            "window_width": 0.0,
+            "window_gaps": 0,
+            "position": None,
+            "edge_margin": None,
+            "landing_error": error,
+        }
+    return {
+        "window": [low, high],
+        "window_width": width,
+        "window_gaps": gaps,
+        "position": (power - low) / (high - low),
+        "edge_margin": min(power - low, high - power),
+        "landing_error": error,
+    }
+
+
+def json_default(obj):
+    """json.dump 的 default 钩子：逐场把 JumpLog 展开为字典列表，避免一次性复制全部结果"""
+    if isinstance(obj, JumpLog):
+        return obj.to_list()
+    raise TypeError(f"无法序列化 {type(obj).__name__} 对象")
@@ -0,0 +1,270 @@
+"""
+跳一跳游戏 - 物理内核
+不可变的物理/几何配置、跳跃模拟、基于模拟的最优力度求解器，
+以及服务端和批量测试共用的物理计算推荐（启发式）及其系数配置。
+纯Python实现，不依赖第三方库，可被服务端和离线工具直接导入。
+"""
+
+import json
+import math
+import os
+from collections import namedtuple
+from decimal import Decimal
+from functools import lru_cache
+
+MAX_STEPS = 200
+MIN_POWER = 0
+MAX_POWER = 100
+HEURISTIC_PROFILE = "heuristic_profile.json"  # 启发式系数配置（calibrate_heuristic.py 生成）
+
+
+class PhysicsConfig(
+    namedtuple(
+        "PhysicsConfig",
+        [
+            "gravity",
+            "vx_multiplier",
+            "vy_multiplier",
+            "player_size",
+            "platform_height",
+            "platform_width",
+            "canvas_width",
+            "canvas_height",
+        ],
+    )
+):
+    """游戏物理与几何参数（不可变，创建无开销，可安全地在进程间传递）"""
+
+    __slots__ = ()
+
+    @property
+    def physics_params(self):
+        """AI Agent接口使用的 (vx_mul, vy_mul, gravity) 三元组"""
+        return (self.vx_multiplier, self.vy_multiplier, self.gravity)
+
+    def to_dict(self):
+        return dict(self._asdict())
+
+
+DEFAULT_CONFIG = PhysicsConfig(
+    gravity=0.5,
+    vx_multiplier=2.0,
+    vy_multiplier=-3.0,
+    player_size=30,
+    platform_height=20,
+    platform_width=100,
+    canvas_width=800,
+    canvas_height=600,
+)
+
+
+@lru_cache(maxsize=64)
+def _config_for(physics_params):
+    vx_mul, vy_mul, gravity = physics_params
+    return DEFAULT_CONFIG._replace(
+        vx_multiplier=vx_mul, vy_multiplier=vy_mul, gravity=gravity
+    )
+
+
+def config_for(physics_params):
+    """由 (vx_mul, vy_mul, gravity) 得到配置，几何参数沿用默认值"""
+    return _config_for(tuple(physics_params))
+
+
+def simulate_jump(power, player_pos, target_platform, config=DEFAULT_CONFIG):
+    """模拟跳跃过程，返回 (是否成功, 最终位置, 步数)"""
+    px, py = player_pos
+    plat_left, plat_top, plat_right = target_platform
+    gravity = config.gravity
+    player_size = config.player_size
+    platform_height = config.platform_height
+    fall_limit = config.canvas_height + 50
+
+    # 初始速度
+    vx = power * config.vx_multiplier
+    vy = power * config.vy_multiplier
+
+    x, y = px, py
+    for step in range(MAX_STEPS):
+        x += vx
+        y += vy
+        vy += gravity
+
+        # 掉出屏幕
+        if y > fall_limit:
+            return False, (x, y), step
+
+        # 仅在下落过程中检查碰撞
+        if vy > 0:
+            player_left = x - player_size / 2
+            player_right = x + player_size / 2
+            player_bottom = y + player_size / 2
+
+            if (
+                player_right >= plat_left
+                and player_left <= plat_right
+                and player_bottom >= plat_top
+                and player_bottom <= plat_top + platform_height
+            ):
+                vertical_distance = abs(player_bottom - plat_top)
+                horizontal_in_bounds = x >= plat_left and x <= plat_right
+
+                if vertical_distance <= 10 and horizontal_in_bounds:
+                    return True, (x, plat_top - player_size / 2), step
+
+    return False, (x, y), MAX_STEPS
+
+
+def landing_x(power, player_pos, target_platform, config=DEFAULT_CONFIG):
+    """
+    下落过程中玩家底部到达平台顶面高度时的水平位置（成功着陆时即落点），
+    到不了这个高度时返回掉出屏幕时的位置
+    """
+    px, py = player_pos
+    plat_top = target_platform[1]
+    fall_limit = config.canvas_height + 50
+    vx = power * config.vx_multiplier
+    vy = power * config.vy_multiplier
+    x, y = px, py
+    for _ in range(MAX_STEPS):
+        x += vx
+        y += vy
+        vy += config.gravity
+        if y > fall_limit or (vy > 0 and y + config.player_size / 2 >= plat_top):
+            return x
+    return x
+
+
+def landing_error(final_pos, target_platform):
+    """落点与平台中心的水平偏差（像素，正值表示偏右）"""
+    plat_left, _, plat_right = target_platform
+    return final_pos[0] - (plat_left + plat_right) / 2
+
+
+def relative_geometry(player_pos, target_platform):
+    """与水平位置无关的几何量 (平台中心与玩家的水平距离 dx, 高度差 dy, 平台宽度)"""
+    px, py = player_pos
+    plat_left, plat_top, plat_right = target_platform
+    return ((plat_left + plat_right) / 2 - px, plat_top - py, plat_right - plat_left)
+
+
+def solve_power(
+    player_pos, target_platform, config=DEFAULT_CONFIG, step=1, max_power=MAX_POWER
+):
+    """
+    以 step 为间隔枚举 [MIN_POWER, max_power] 内的力度（默认所有整数力度），
+    返回落点最接近平台中心的成功力度。没有任何力度能成功着陆时返回 None。
+    """
+    best_power = None
+    best_error = None
+    count = int(round((max_power - MIN_POWER) / step))
+    for i in range(count + 1):
+        power = MIN_POWER + i * step
+        success, final_pos, _ = simulate_jump(
+            power, player_pos, target_platform, config
+        )
+        if not success:
+            continue
+        error = abs(landing_error(final_pos, target_platform))
+        if best_error is None or error < best_error:
+            best_power, best_error = power, error
+    return best_power
+
+
+class HeuristicCoefficients(
+    namedtuple(
+        "HeuristicCoefficients",
+        ["distance_divisor", "up_divisor", "down_divisor", "power_step"],
+    )
+):
+    """
+    物理计算推荐的系数：力度 = 距离 / distance_divisor，向上跳加 |dy| / up_divisor，
+    向下跳减 dy / down_divisor，最后按 power_step 向下取整（1 = 整数力度）
+    """
+
+    __slots__ = ()
+
+    def to_dict(self):
+        return dict(self._asdict())
+
+
+DEFAULT_HEURISTIC = HeuristicCoefficients(3, 2, 4, 1)
+
+
+def heuristic_power(player_pos, target_platform, coefficients=DEFAULT_HEURISTIC):
+    """基于物理计算的推荐力度（不做模拟，几乎没有开销）"""
+    px, py = player_pos
+    plat_left, plat_top, plat_right = target_platform
+
+    # 目标平台中心
+    dx = (plat_left + plat_right) / 2 - px
+    dy = plat_top - py
+
+    # 基础力度估算
+    distance = math.sqrt(dx * dx + dy * dy)
+    base_power = min(MAX_POWER, max(MIN_POWER, distance / coefficients.distance_divisor))
+
+    # 根据高度差调整
+    if dy < 0:  # 需要向上跳
+        base_power += abs(dy) / coefficients.up_divisor
+    else:  # 向下跳
+        base_power -= dy / coefficients.down_divisor
+
+    base_power = max(MIN_POWER, min(MAX_POWER, base_power))
+    if coefficients.power_step == 1:
+        return int(base_power)
+    step = coefficients.power_step
+    # 按间隔的小数位数取整，避免 2.7000000000000002 之类的值进入日志、prompt和索引
+    return round(math.floor(base_power / step) * step, step_digits(step))
+
+
+def step_digits(step):
+    """力度间隔的小数位数，如 0.1 为 1、0.25 为 2、1 为 0"""
+    return max(0, -Decimal(repr(float(step))).normalize().as_tuple().exponent)
+
+
+def physics_key(config):
+    """按物理参数分组时使用的键（消除浮点表示误差）"""
+    return tuple(round(value, 9) for value in config.physics_params)
+
+
+def load_heuristic_profile(path=HEURISTIC_PROFILE):
+    """读取启发式系数配置，返回 {物理参数: 系数}；文件不存在时返回空字典（使用默认系数）"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        physics_key(config_for(entry["physics_params"])): HeuristicCoefficients(
+            **entry["coefficients"]
+        )
+        for entry in data["profiles"]
+    }
+
+
+def heuristic_for(config, profile):
+    """某组物理参数应使用的系数，配置中没有时使用默认系数"""
+    return profile.get(physics_key(config), DEFAULT_HEURISTIC)
+
+
+def save_heuristic_profile(config, coefficients, path=HEURISTIC_PROFILE, **metadata):
+    """写入（或替换）一组物理参数的系数，其他物理参数的条目保持不变"""
+    entries = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)["profiles"]
+    key = physics_key(config)
+    entries = [
+        entry
+        for entry in entries
+        if physics_key(config_for(entry["physics_params"])) != key
+    ]
+    entries.append(
+        {
+            "physics_params": list(config.physics_params),
+            "coefficients": coefficients.to_dict(),
+            **metadata,
+        }
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"profiles": entries}, f, indent=2, ensure_ascii=False)
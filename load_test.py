@@ -0,0 +1,254 @@
+"""
+跳一跳游戏 - AI Agent负载测试
+回放历史日志或合成的跳跃场景，向 /api/get_recommendation 施加负载，
+统计吞吐量、延迟分位数、错误率和兜底（fallback）率，并保存报告以便不同版本间对比。
+
+用法:
+    # 闭环：16个并发客户端，共2000个请求
+    python load_test.py --concurrency 16 --requests 2000
+    # 开环：按50请求/秒的泊松到达持续30秒
+    python load_test.py --rate 50 --duration 30
+    # 回放历史日志中的场景，并与上一次报告对比
+    python load_test.py --log ai_detailed_log_xxx.json --compare load_report_old.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from jump_physics import DEFAULT_CONFIG
+from prompt_templates import load_recorded_scenarios
+from scenarios import PlatformStream
+
+AI_AGENT_URL = "http://localhost:5000"
+REPORT_FILE = "load_report.json"
+
+_local = threading.local()
+
+
+def synthetic_scenarios(count, seed=42, config=DEFAULT_CONFIG):
+    """用可复现的平台序列合成 (玩家位置, 目标平台, 物理参数) 场景"""
+    rng = random.Random(seed)
+    scenarios = []
+    game_id = 0
+    while len(scenarios) < count:
+        game_id += 1
+        stream = PlatformStream(seed, game_id)
+        # 玩家站在当前平台上的随机位置（相机已居中）
+        current_y = 320
+        for _ in range(min(20, count - len(scenarios))):
+            px = config.canvas_width / 2
+            player_pos = (px, current_y - config.player_size / 2)
+            distance, height = stream.next_platform()
+            left = px - rng.uniform(0, config.platform_width) + distance
+            target = (round(left, 1), round(height, 1), round(left + config.platform_width, 1))
+            scenarios.append((player_pos, target, config.physics_params))
+            current_y = height
+    return scenarios
+
+
+def _session():
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def send_request(url, scenario, timeout):
+    """发送一次推荐请求，返回 (是否成功, 来源, 延迟秒数)"""
+    player_pos, target_platform, physics_params = scenario
+    payload = {
+        "player_pos": list(player_pos),
+        "target_platform": list(target_platform),
+        "physics_params": list(physics_params),
+    }
+    start = time.perf_counter()
+    try:
+        response = _session().post(
+            f"{url}/api/get_recommendation", json=payload, timeout=timeout
+        )
+        ok = response.status_code == 200
+        source = response.json().get("source", "unknown") if ok else None
+    except Exception:
+        ok, source = False, None
+    return ok, source, time.perf_counter() - start
+
+
+def run_closed_loop(url, scenarios, concurrency, total_requests, timeout):
+    """闭环：固定数量的客户端，每个收到响应后立即发送下一个请求"""
+    samples = []
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def client():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            sample = send_request(url, scenarios[i % len(scenarios)], timeout)
+            with lock:
+                samples.append(sample)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start
+
+
+def run_open_loop(url, scenarios, rate, duration, timeout, max_workers=256, seed=0):
+    """
+    开环：按泊松过程到达，与服务端响应速度无关。
+    延迟从计划发送时刻算起，服务端排队造成的等待也会被计入。
+    """
+    rng = random.Random(seed)
+    samples = []
+    lock = threading.Lock()
+
+    def fire(scenario, scheduled):
+        ok, source, _ = send_request(url, scenario, timeout)
+        with lock:
+            samples.append((ok, source, time.perf_counter() - scheduled))
+
+    start = time.perf_counter()
+    next_time = start
+    i = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while next_time - start < duration:
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, scenarios[i % len(scenarios)], next_time)
+            i += 1
+            next_time += rng.expovariate(rate)
+    return samples, time.perf_counter() - start
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed, mode, params):
+    latencies = sorted(s[2] * 1000 for s in samples if s[0])
+    total = len(samples)
+    errors = sum(1 for s in samples if not s[0])
+    sources = {}
+    for ok, source, _ in samples:
+        if ok:
+            sources[source] = sources.get(source, 0) + 1
+    succeeded = total - errors
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "mode": mode,
+        "params": params,
+        "requests": total,
+        "duration_s": elapsed,
+        "throughput_rps": succeeded / elapsed if elapsed else 0,
+        "error_rate": errors / total if total else 0,
+        "fallback_rate": sources.get("fallback", 0) / succeeded if succeeded else 0,
+        "sources": sources,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) if latencies else 0,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0,
+        },
+    }
+
+
+def print_report(report):
+    lat = report["latency_ms"]
+    print("\n📊 负载测试结果")
+    print("=" * 50)
+    print(f"模式: {report['mode']}  参数: {report['params']}")
+    print(f"请求数: {report['requests']}，耗时: {report['duration_s']:.1f} 秒")
+    print(f"吞吐量: {report['throughput_rps']:.1f} 请求/秒")
+    print(f"错误率: {report['error_rate']:.2%}")
+    print(f"兜底率: {report['fallback_rate']:.2%}  来源分布: {report['sources']}")
+    print(
+        f"延迟(ms): 平均 {lat['mean']:.1f} | p50 {lat['p50']:.1f} | p90 {lat['p90']:.1f}"
+        f" | p95 {lat['p95']:.1f} | p99 {lat['p99']:.1f} | 最大 {lat['max']:.1f}"
+    )
+
+
+def compare_reports(old, new):
+    """打印两份报告的关键指标对比"""
+    print("\n🔍 与历史报告对比")
+    print("=" * 50)
+    rows = [
+        ("吞吐量(请求/秒)", old["throughput_rps"], new["throughput_rps"]),
+        ("错误率", old["error_rate"], new["error_rate"]),
+        ("兜底率", old["fallback_rate"], new["fallback_rate"]),
+    ]
+    for key in ("p50", "p90", "p99"):
+        rows.append((f"{key}延迟(ms)", old["latency_ms"][key], new["latency_ms"][key]))
+    for name, before, after in rows:
+        change = f"{after / before - 1:+.1%}" if before else "-"
+        print(f"  {name:<16} {before:>10.3f} → {after:>10.3f}  ({change})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Agent负载测试")
+    parser.add_argument("--url", default=AI_AGENT_URL, help="AI Agent服务地址")
+    parser.add_argument("--log", help="回放该详细日志中的场景（默认使用合成场景）")
+    parser.add_argument("--scenarios", type=int, default=1000, help="合成场景数")
+    parser.add_argument("--concurrency", type=int, default=8, help="闭环并发数")
+    parser.add_argument("--requests", type=int, default=500, help="闭环请求总数")
+    parser.add_argument("--rate", type=float, help="开环到达率（请求/秒），设置后使用开环模式")
+    parser.add_argument("--duration", type=float, default=30, help="开环持续时间（秒）")
+    parser.add_argument("--timeout", type=float, default=15, help="单个请求超时（秒）")
+    parser.add_argument("--output", default=REPORT_FILE, help="报告输出文件")
+    parser.add_argument("--compare", help="与之对比的历史报告")
+    args = parser.parse_args()
+
+    if args.log:
+        scenarios = load_recorded_scenarios(args.log)
+    else:
+        scenarios = synthetic_scenarios(args.scenarios)
+    if not scenarios:
+        print("❌ 没有可用的场景")
+        return 1
+    print(f"📋 场景数: {len(scenarios)}，目标: {args.url}")
+
+    if args.rate:
+        params = {"rate": args.rate, "duration": args.duration}
+        samples, elapsed = run_open_loop(
+            args.url, scenarios, args.rate, args.duration, args.timeout
+        )
+        mode = "open"
+    else:
+        params = {"concurrency": args.concurrency, "requests": args.requests}
+        samples, elapsed = run_closed_loop(
+            args.url, scenarios, args.concurrency, args.requests, args.timeout
+        )
+        mode = "closed"
+
+    report = summarize(samples, elapsed, mode, params)
+    print_report(report)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 报告已保存: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare_reports(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+跳一跳游戏 - 物理内核的可选JIT后端
+接口与 jump_physics.simulate_jump / solve_power 相同。安装了 numba 时第一次调用会编译
+physics_kernels 中的内核（结果缓存到磁盘），否则静默退回纯Python实现。
+设置环境变量 JUMP_PHYSICS_JIT=0 可强制使用纯Python实现。
+"""
+
+import os
+
+from jump_physics import DEFAULT_CONFIG, MAX_POWER, MIN_POWER
+from jump_physics import simulate_jump as python_simulate_jump
+from jump_physics import solve_power as python_solve_power
+
+_kernels = None
+_loaded = False
+
+
+def get_kernels():
+    """第一次调用时加载（并编译）JIT内核，不可用时返回 None"""
+    global _kernels, _loaded
+    if not _loaded:
+        _loaded = True
+        if os.environ.get("JUMP_PHYSICS_JIT", "1") != "0":
+            try:
+                import physics_kernels
+
+                _kernels = physics_kernels
+            except ImportError:
+                _kernels = None
+    return _kernels
+
+
+def available():
+    return get_kernels() is not None
+
+
+def _physics_args(config):
+    return (
+        float(config.gravity),
+        float(config.vx_multiplier),
+        float(config.vy_multiplier),
+        float(config.player_size),
+        float(config.platform_height),
+        float(config.canvas_height + 50),
+    )
+
+
+def simulate_jump(power, player_pos, target_platform, config=DEFAULT_CONFIG):
+    """模拟跳跃过程，返回 (是否成功, 最终位置, 步数)"""
+    kernels = get_kernels()
+    if kernels is None:
+        return python_simulate_jump(power, player_pos, target_platform, config)
+    px, py = player_pos
+    plat_left, plat_top, plat_right = target_platform
+    success, x, y, step = kernels.simulate(
+        float(power),
+        float(px),
+        float(py),
+        float(plat_left),
+        float(plat_top),
+        float(plat_right),
+        *_physics_args(config),
+    )
+    return success, (x, y), step
+
+
+def solve_power(
+    player_pos, target_platform, config=DEFAULT_CONFIG, step=1, max_power=MAX_POWER
+):
+    """与 jump_physics.solve_power 相同：返回落点最接近平台中心的成功力度，无解时返回 None"""
+    kernels = get_kernels()
+    if kernels is None:
+        return python_solve_power(player_pos, target_platform, config, step, max_power)
+    px, py = player_pos
+    plat_left, plat_top, plat_right = target_platform
+    count = int(round((max_power - MIN_POWER) / step))
+    index = kernels.solve(
+        float(px),
+        float(py),
+        float(plat_left),
+        float(plat_top),
+        float(plat_right),
+        float(step),
+        count,
+        *_physics_args(config),
+    )
+    # 在Python中重新计算力度，保持与参考实现相同的类型（整数间隔时为int）
+    return None if index < 0 else MIN_POWER + index * step
+
+
+def solve_powers(
+    player_x,
+    player_y,
+    plat_left,
+    plat_top,
+    plat_right,
+    config=DEFAULT_CONFIG,
+    step=1,
+    max_power=MAX_POWER,
+):
+    """
+    批量求解（参数为等长的 float64 数组），返回候选下标数组，无解处为 -1。
+    JIT不可用时返回 None，由调用方使用自己的实现。
+    """
+    kernels = get_kernels()
+    if kernels is None:
+        return None
+    count = int(round((max_power - MIN_POWER) / step))
+    return kernels.solve_many(
+        player_x,
+        player_y,
+        plat_left,
+        plat_top,
+        plat_right,
+        float(step),
+        count,
+        *_physics_args(config),
+    )
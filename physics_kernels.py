@@ -0,0 +1,141 @@
+"""
+跳一跳游戏 - Numba 编译的物理内核
+逐行对应 jump_physics.simulate_jump / solve_power，运算顺序相同，结果逐位一致。
+编译结果缓存在 __pycache__ 中，只有第一次使用时需要编译。
+不要直接导入本模块，请通过 physics_jit 使用（没有安装 numba 时会自动退回纯Python实现）。
+"""
+
+import numba
+import numpy as np
+
+from jump_physics import MAX_STEPS, MIN_POWER
+
+
+@numba.njit(cache=True)
+def simulate(
+    power,
+    px,
+    py,
+    plat_left,
+    plat_top,
+    plat_right,
+    gravity,
+    vx_multiplier,
+    vy_multiplier,
+    player_size,
+    platform_height,
+    fall_limit,
+):
+    """返回 (是否成功, 最终x, 最终y, 步数)"""
+    vx = power * vx_multiplier
+    vy = power * vy_multiplier
+
+    x, y = px, py
+    for step in range(MAX_STEPS):
+        x += vx
+        y += vy
+        vy += gravity
+
+        if y > fall_limit:
+            return False, x, y, step
+
+        if vy > 0:
+            player_left = x - player_size / 2
+            player_right = x + player_size / 2
+            player_bottom = y + player_size / 2
+
+            if (
+                player_right >= plat_left
+                and player_left <= plat_right
+                and player_bottom >= plat_top
+                and player_bottom <= plat_top + platform_height
+            ):
+                vertical_distance = abs(player_bottom - plat_top)
+                horizontal_in_bounds = x >= plat_left and x <= plat_right
+
+                if vertical_distance <= 10 and horizontal_in_bounds:
+                    return True, x, plat_top - player_size / 2, step
+
+    return False, x, y, MAX_STEPS
+
+
+@numba.njit(cache=True)
+def solve(
+    px,
+    py,
+    plat_left,
+    plat_top,
+    plat_right,
+    step,
+    count,
+    gravity,
+    vx_multiplier,
+    vy_multiplier,
+    player_size,
+    platform_height,
+    fall_limit,
+):
+    """枚举 MIN_POWER + i * step（i = 0..count），返回最佳的 i，没有成功的力度时返回 -1"""
+    best_index = -1
+    best_error = np.inf
+    center = (plat_left + plat_right) / 2
+    for i in range(count + 1):
+        power = MIN_POWER + i * step
+        success, x, _, _ = simulate(
+            power,
+            px,
+            py,
+            plat_left,
+            plat_top,
+            plat_right,
+            gravity,
+            vx_multiplier,
+            vy_multiplier,
+            player_size,
+            platform_height,
+            fall_limit,
+        )
+        if not success:
+            continue
+        error = abs(x - center)
+        if error < best_error:
+            best_index, best_error = i, error
+    return best_index
+
+
+@numba.njit(cache=True)
+def solve_many(
+    px,
+    py,
+    plat_left,
+    plat_top,
+    plat_right,
+    step,
+    count,
+    gravity,
+    vx_multiplier,
+    vy_multiplier,
+    player_size,
+    platform_height,
+    fall_limit,
+):
+    """对每个场景调用 solve，返回最佳下标数组"""
+    n = px.shape[0]
+    best = np.empty(n, dtype=np.int64)
+    for j in range(n):
+        best[j] = solve(
+            px[j],
+            py[j],
+            plat_left[j],
+            plat_top[j],
+            plat_right[j],
+            step,
+            count,
+            gravity,
+            vx_multiplier,
+            vy_multiplier,
+            player_size,
+            platform_height,
+            fall_limit,
+        )
+    return best
@@ -0,0 +1,99 @@
+"""
+跳一跳游戏 - 根据回报的落点在线修正推荐力度
+浏览器和批量测试在跳跃结束后通过 /api/report_outcome 回报落点，
+按相对几何量 (dx, dy) 分桶记录"要让落点正好落在平台中心，力度还需要乘的倍数"，
+之后同一区域（同一物理参数、同一推荐来源）的推荐都乘上这个倍数，不需要再请求模型。
+
+水平飞行距离大致与力度的平方成正比，因此一次回报给出的倍数估计为
+sqrt(目标距离 / 实际距离) 再乘上当时已经使用的倍数；桶内取对数的增量平均，
+计数封顶在 MAX_WEIGHT_COUNT，物理环境变化（如换了浏览器帧率）后仍能跟上。
+纯Python实现，服务端可以直接导入。
+"""
+
+import math
+import threading
+
+from jump_physics import config_for, physics_key, relative_geometry
+
+BIN_SIZE = 20.0  # 分桶边长（像素）
+MAX_WEIGHT_COUNT = 10  # 单次回报的权重不低于 1/MAX_WEIGHT_COUNT
+MIN_RATIO, MAX_RATIO = 0.5, 2.0  # 单次回报的修正倍数范围，防止异常落点把桶带偏
+MIN_DISTANCE = 5.0  # 目标或实际水平距离小于该值（像素）时回报不可靠，忽略
+
+
+class PowerCorrection:
+    """
+    分桶的力度修正表：{(物理参数, 来源, 桶坐标): [对数倍数均值, 回报次数]}，
+    没有回报过的区域不修正
+    """
+
+    def __init__(self, bin_size=BIN_SIZE):
+        self.bin_size = bin_size
+        self.bins = {}
+        # Flask 开发服务器是多线程的，修正表的读写都在锁内进行
+        self._lock = threading.Lock()
+        # 统计
+        self.applied = 0
+        self.updates = 0
+        self.ignored = 0
+
+    def _key(self, player_pos, target_platform, physics_params, source):
+        dx, dy, _ = relative_geometry(player_pos, target_platform)
+        return (
+            physics_key(config_for(physics_params)),
+            source,
+            math.floor(dx / self.bin_size),
+            math.floor(dy / self.bin_size),
+        )
+
+    def factor(self, player_pos, target_platform, physics_params, source):
+        """该区域当前的修正倍数，没有回报时为 1.0"""
+        key = self._key(player_pos, target_platform, physics_params, source)
+        with self._lock:
+            entry = self.bins.get(key)
+            return 1.0 if entry is None else math.exp(entry[0])
+
+    def apply(self, player_pos, target_platform, physics_params, source, power):
+        """返回修正后的力度；没有修正时原样返回（整数力度保持整数）"""
+        factor = self.factor(player_pos, target_platform, physics_params, source)
+        if factor == 1.0:
+            return power
+        with self._lock:
+            self.applied += 1
+        return round(power * factor, 2)
+
+    def update(self, player_pos, target_platform, physics_params, source, applied, landing_x):
+        """
+        记录一次回报。applied 为实际使用的力度相对原始推荐的倍数，
+        landing_x 为下落到平台顶面高度时的水平位置（与推荐请求同一坐标系）。
+        返回更新后的修正倍数，回报不可靠时返回 None
+        """
+        px = player_pos[0]
+        target_dx, _, _ = relative_geometry(player_pos, target_platform)
+        landed_dx = landing_x - px
+        if applied <= 0 or target_dx < MIN_DISTANCE or landed_dx < MIN_DISTANCE:
+            with self._lock:
+                self.ignored += 1
+            return None
+        ratio = min(max(math.sqrt(target_dx / landed_dx), MIN_RATIO), MAX_RATIO)
+        key = self._key(player_pos, target_platform, physics_params, source)
+        with self._lock:
+            entry = self.bins.setdefault(key, [0.0, 0])
+            entry[1] = min(entry[1] + 1, MAX_WEIGHT_COUNT)
+            entry[0] += (math.log(applied * ratio) - entry[0]) / entry[1]
+            self.updates += 1
+            return math.exp(entry[0])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bins": len(self.bins),
+                "bin_size": self.bin_size,
+                "updates": self.updates,
+                "ignored": self.ignored,
+                "applied": self.applied,
+                "max_correction": max(
+                    (abs(math.exp(log_factor) - 1) for log_factor, _ in self.bins.values()),
+                    default=0.0,
+                ),
+            }
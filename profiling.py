@@ -0,0 +1,238 @@
+"""
+跳一跳游戏 - 性能剖析工具
+PhaseProfiler 按阶段（推荐、跳跃模拟、平台生成、相机滚动、结果记录）累计耗时和调用次数，
+可选用 cProfile 做函数级剖析，并输出火焰图工具（flamegraph.pl / speedscope）可读的折叠栈文件。
+MemorySampler 用 tracemalloc 和进程RSS统计长时间批量运行的内存占用。
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+
+class PhaseProfiler:
+    def __init__(self, use_cprofile=False, root="play_single_game"):
+        self.root = root
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+
+    @contextmanager
+    def phase(self, name):
+        """统计 with 块内的耗时，计入阶段 name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] += time.perf_counter() - start
+            self.counts[name] += 1
+
+    def add(self, name, seconds, count=1):
+        self.totals[name] += seconds
+        self.counts[name] += count
+
+    def start(self):
+        """批量运行开始时调用，开启 cProfile（如果启用）"""
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def stop(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+    def save(self, prefix):
+        """写出阶段折叠栈以及 cProfile 结果，返回生成的文件列表"""
+        files = [self.write_collapsed(f"{prefix}_phases.folded")]
+        if self.cprofile is not None:
+            files.extend(
+                self.write_cprofile(f"{prefix}_cprofile.prof", f"{prefix}_cprofile.folded")
+            )
+        return files
+
+    def print_summary(self):
+        """打印各阶段耗时汇总"""
+        total = sum(self.totals.values())
+        print("\n⏱️  阶段耗时分析")
+        print("=" * 50)
+        if not total:
+            print("   没有记录到阶段耗时")
+            return
+        print(f"   {'阶段':<20}{'总耗时(s)':>10}{'占比':>8}{'调用次数':>10}{'平均(µs)':>10}")
+        for name, seconds in sorted(self.totals.items(), key=lambda kv: -kv[1]):
+            count = self.counts[name]
+            print(
+                f"   {name:<20}{seconds:>10.3f}{seconds / total:>8.1%}"
+                f"{count:>10}{seconds / count * 1e6:>10.1f}"
+            )
+
+    def write_collapsed(self, path):
+        """写出阶段级折叠栈：每行 "根;阶段 微秒数" """
+        with open(path, "w", encoding="utf-8") as f:
+            for name, seconds in sorted(self.totals.items()):
+                f.write(f"{self.root};{name} {int(seconds * 1e6)}\n")
+        return path
+
+    def write_cprofile(self, prof_path, collapsed_path):
+        """保存 cProfile 原始数据，并转换为函数级折叠栈"""
+        if self.cprofile is None:
+            return None
+        self.cprofile.dump_stats(prof_path)
+        stats = pstats.Stats(self.cprofile).stats
+
+        def label(func):
+            filename, line, name = func
+            return f"{name} ({os.path.basename(filename)}:{line})"
+
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for func, (_, _, tottime, _, callers) in stats.items():
+                if tottime <= 0:
+                    continue
+                # 沿耗时最多的调用者向上回溯，得到一条近似的调用栈
+                stack = [label(func)]
+                seen = {func}
+                current = callers
+                while current:
+                    parent = max(current, key=lambda c: current[c][3])
+                    if parent in seen:
+                        break
+                    seen.add(parent)
+                    stack.append(label(parent))
+                    current = stats[parent][4] if parent in stats else None
+                f.write(f"{';'.join(reversed(stack))} {int(tottime * 1e6)}\n")
+        return prof_path, collapsed_path
+
+
+def current_rss():
+    """当前进程的常驻内存（字节），无法获取时返回 None"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss():
+    """进程的峰值常驻内存（字节），无法获取时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位是KB，macOS 上是字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(size):
+    if size is None:
+        return "未知"
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class MemorySampler:
+    """
+    批量运行的内存统计：
+    每次 sample() 记录已完成的游戏数/跳跃数与 tracemalloc 跟踪到的内存，
+    据此估算每场游戏、每次跳跃的内存增长，并预测跑完 total_games 场时的内存占用。
+    """
+
+    def __init__(self, total_games, limit_mb=None, top=10):
+        self.total_games = total_games
+        self.limit_bytes = limit_mb * 1024 * 1024 if limit_mb else None
+        self.top = top
+        self.samples = []  # [(游戏数, 跳跃数, 跟踪内存, RSS)]
+        self.baseline = 0
+        self.warned = False
+        self.snapshot = None
+        self.peak = None
+
+    def start(self):
+        tracemalloc.start()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+
+    def sample(self, games, jumps):
+        traced = tracemalloc.get_traced_memory()[0]
+        self.samples.append((games, jumps, traced, current_rss()))
+        projected = self.projected_bytes()
+        if (
+            not self.warned
+            and self.limit_bytes
+            and projected is not None
+            and projected > self.limit_bytes
+        ):
+            self.warned = True
+            print(
+                f"   ⚠️  内存预警: 按当前增长估算 {self.total_games} 场游戏需要 "
+                f"{format_bytes(projected)}，超过上限 {format_bytes(self.limit_bytes)}"
+            )
+
+    def stop(self):
+        """停止跟踪并保留最后一次快照，用于统计分配位置"""
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+        )
+        self.peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    def growth(self):
+        """返回 (每场游戏字节数, 每次跳跃字节数)"""
+        if not self.samples:
+            return None, None
+        games, jumps, traced, _ = self.samples[-1]
+        grown = traced - self.baseline
+        return (grown / games if games else None, grown / jumps if jumps else None)
+
+    def projected_bytes(self):
+        per_game, _ = self.growth()
+        if per_game is None:
+            return None
+        games, _, traced, rss = self.samples[-1]
+        # 有RSS时以进程当前的实际占用为起点，否则只看Python对象
+        current = rss if rss is not None else traced
+        return current + per_game * max(self.total_games - games, 0)
+
+    def top_sites(self):
+        if self.snapshot is None:
+            return []
+        return self.snapshot.statistics("lineno")[: self.top]
+
+    def print_summary(self):
+        print("\n🧠 内存统计")
+        print("=" * 50)
+        per_game, per_jump = self.growth()
+        if per_game is None:
+            print("   没有采样数据")
+            return
+        games, jumps, traced, rss = self.samples[-1]
+        print(f"   采样: {games} 场游戏, {jumps} 次跳跃")
+        print(f"   Python对象增长: {format_bytes(traced - self.baseline)}")
+        print(f"   每场游戏: {format_bytes(per_game)}，每次跳跃: {format_bytes(per_jump)}")
+        print(f"   tracemalloc峰值: {format_bytes(self.peak)}")
+        print(f"   当前RSS: {format_bytes(rss)}，峰值RSS: {format_bytes(peak_rss())}")
+        projected = self.projected_bytes()
+        print(f"   预计 {self.total_games} 场游戏占用: {format_bytes(projected)}")
+        if self.limit_bytes and projected > self.limit_bytes:
+            print(f"   ⚠️  超过内存上限 {format_bytes(self.limit_bytes)}")
+        sites = self.top_sites()
+        if sites:
+            print(f"\n   内存占用最多的 {len(sites)} 处分配:")
+            for stat in sites:
+                frame = stat.traceback[0]
+                print(
+                    f"   {format_bytes(stat.size):>10} {stat.count:>8} 个对象  "
+                    f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                )
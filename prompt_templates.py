@@ -0,0 +1,318 @@
+"""
+跳一跳游戏 - Prompt模板
+提供多种长度的prompt变体，按物理参数预编译，并记录每个变体的token数和延迟分布。
+直接运行本文件可在历史日志的场景上离线对比各变体相对求解器的准确率。
+"""
+
+import bisect
+import json
+import math
+import threading
+import time
+from functools import lru_cache
+from string import Template
+
+from jump_physics import config_for, simulate_jump, solve_power
+from strategies import SOLVER_MAX_POWER, SOLVER_STEP
+
+# 模板分两步填充：
+#   1. 编译时用 string.Template 填入物理参数（$vx_mul, $vy_mul, $gravity）
+#   2. 每次请求时用 str.format 填入玩家和平台坐标
+PROMPT_VARIANTS = {
+    "detailed": """你是一个跳一跳游戏的AI助手。根据以下物理参数和游戏状态，计算出最佳的跳跃力度。
+
+=== 游戏参数详解 ===
+
+【坐标系统】
+- 玩家位置: ({px}, {py})
+  * X坐标：水平位置，数值越大越靠右
+  * Y坐标：垂直位置，数值越大越靠下（屏幕坐标系）
+
+- 目标平台位置: 左边界={plat_left}, 顶部={plat_top}, 右边界={plat_right}
+  * 左边界(L)：平台的最左侧X坐标
+  * 顶部(T)：平台的最上方Y坐标（着陆目标高度）
+  * 右边界(R)：平台的最右侧X坐标
+  * 平台宽度：{width}像素
+  * 平台中心X坐标：{center_x}
+
+【物理运动参数】
+- 横向速度倍率 vx_multiplier = $vx_mul
+  * 含义：跳跃力度转换为水平速度的系数
+  * 计算：水平初始速度 = 跳跃力度 × $vx_mul
+  * 影响：数值越大，相同力度下水平飞行距离越远
+
+- 纵向速度倍率 vy_multiplier = $vy_mul
+  * 含义：跳跃力度转换为垂直速度的系数
+  * 计算：垂直初始速度 = 跳跃力度 × $vy_mul
+  * 特点：负值表示向上运动（与屏幕坐标系相反）
+  * 影响：绝对值越大，相同力度下跳跃高度越高
+
+- 重力加速度 gravity = $gravity
+  * 含义：每个时间步长内，垂直速度的增量
+  * 作用：使玩家在空中时持续向下加速
+  * 影响：数值越大，抛物线弧度越陡峭
+
+【距离分析】
+- 水平距离：{dx:.1f}像素（正值=需向右跳，负值=需向左跳）
+- 垂直距离：{dy:.1f}像素（正值=需向下跳，负值=需向上跳）
+- 直线距离：{distance:.1f}像素
+
+【物理运动方程】
+每个时间步长内：
+1. 水平位置更新：x = x + vx（匀速运动）
+2. 垂直位置更新：y = y + vy
+3. 垂直速度更新：vy = vy + gravity（重力加速）
+
+【成功条件】
+玩家必须在垂直下降过程中，在Y坐标接近平台顶部({plat_top})时，
+X坐标落在平台范围内[{plat_left}, {plat_right}]。
+
+请根据抛物线运动轨迹计算最佳跳跃力度（0-100，可以是小数，保留两位）。
+
+""",
+    "compact": """跳一跳：力度P(0-100，可保留两位小数)，vx=P×$vx_mul，vy=P×$vy_mul，每步x+=vx，y+=vy，vy+=$gravity（y向下为正）。
+玩家({px},{py})，目标平台x∈[{plat_left},{plat_right}]，顶部y={plat_top}，dx={dx:.1f}，dy={dy:.1f}。
+下落时落在平台内即成功。""",
+    "minimal": """Per step: x+=P*$vx_mul; y+=vy; vy+=$gravity; vy0=P*$vy_mul (y down).
+From ({px},{py}) land x in [{plat_left},{plat_right}] at y={plat_top} while falling. """,
+}
+
+# 输出格式要求，按变体语言区分：
+#   single     - 只输出一个力度数字
+#   candidates - 以JSON输出 $k 个候选力度，由服务端用物理模拟挑选
+OUTPUT_INSTRUCTIONS = {
+    "detailed": {
+        "single": "只需要输出推荐的跳跃力度数字，不需要其他解释。",
+        "candidates": '请给出$k个不同的候选力度（0-100，可以是小数，保留两位，如2.74；最可能成功的在前），'
+        '只输出JSON：{{"candidates": [P1, P2, ...]}}',
+    },
+    "compact": {
+        "single": "只输出P。",
+        "candidates": '输出$k个不同候选P（保留两位小数），可能性高的在前，只输出JSON：{{"candidates": [...]}}',
+    },
+    "minimal": {
+        "single": "Output P 0-100 only (up to 2 decimals).",
+        "candidates": 'Give $k distinct candidate P (2 decimals), best first, JSON only: {{"candidates": [...]}}',
+    },
+}
+
+DEFAULT_PROMPT_VARIANT = "detailed"
+
+# 延迟直方图的桶边界（毫秒）
+LATENCY_BUCKETS_MS = [50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def estimate_tokens(text):
+    """粗略估算token数：中文等宽字符按1个token，其余按4个字符1个token"""
+    wide = sum(1 for ch in text if ord(ch) > 0x2E7F)
+    return wide + math.ceil((len(text) - wide) / 4)
+
+
+class PromptTemplate:
+    """绑定了物理参数的prompt模板，只需填入坐标即可使用"""
+
+    def __init__(self, variant, physics_params, text):
+        self.variant = variant
+        self.physics_params = physics_params
+        self.text = text
+        # 固定部分的token数，用于快速估算
+        self.static_tokens = estimate_tokens(text)
+
+    def render(self, player_pos, target_platform):
+        """填入玩家和平台坐标，生成最终prompt"""
+        px, py = player_pos
+        plat_left, plat_top, plat_right = target_platform
+        center_x = (plat_left + plat_right) / 2
+        dx = center_x - px
+        dy = plat_top - py
+        return self.text.format(
+            px=px,
+            py=py,
+            plat_left=plat_left,
+            plat_top=plat_top,
+            plat_right=plat_right,
+            width=plat_right - plat_left,
+            center_x=center_x,
+            dx=dx,
+            dy=dy,
+            distance=math.sqrt(dx**2 + dy**2),
+        )
+
+
+@lru_cache(maxsize=64)
+def _compile(variant, physics_params, candidates):
+    vx_mul, vy_mul, gravity = physics_params
+    output = OUTPUT_INSTRUCTIONS[variant]["candidates" if candidates else "single"]
+    text = Template(PROMPT_VARIANTS[variant] + output).substitute(
+        vx_mul=vx_mul, vy_mul=vy_mul, gravity=gravity, k=candidates
+    )
+    return PromptTemplate(variant, physics_params, text)
+
+
+def compile_prompt(variant, physics_params, candidates=0):
+    """
+    获取某个变体在指定物理参数下的预编译模板（按参数元组缓存）
+    candidates > 0 时要求模型以JSON输出该数量的候选力度
+    """
+    if variant not in PROMPT_VARIANTS:
+        raise ValueError(f"未知的prompt变体: {variant}")
+    return _compile(variant, tuple(physics_params), int(candidates))
+
+
+class PromptStats:
+    """按变体统计调用次数、token数和延迟直方图（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, variant, prompt_tokens, latency_s, ok=True):
+        latency_ms = latency_s * 1000
+        with self._lock:
+            entry = self._stats.setdefault(
+                variant,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "prompt_tokens": 0,
+                    "total_latency_ms": 0.0,
+                    "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                },
+            )
+            entry["calls"] += 1
+            entry["errors"] += 0 if ok else 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["total_latency_ms"] += latency_ms
+            entry["histogram"][bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def snapshot(self):
+        """返回可JSON序列化的统计摘要"""
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [
+            f">{LATENCY_BUCKETS_MS[-1]}ms"
+        ]
+        with self._lock:
+            summary = {}
+            for variant, entry in self._stats.items():
+                calls = entry["calls"]
+                summary[variant] = {
+                    "calls": calls,
+                    "errors": entry["errors"],
+                    "avg_prompt_tokens": entry["prompt_tokens"] / calls,
+                    "avg_latency_ms": entry["total_latency_ms"] / calls,
+                    "latency_histogram": dict(zip(labels, entry["histogram"])),
+                }
+            return summary
+
+
+def load_recorded_scenarios(log_file, limit=None):
+    """从 batch_ai_test 的详细日志中读取 (玩家位置, 目标平台, 物理参数) 场景"""
+    with open(log_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    config = data.get("config", {})
+    physics_params = (
+        config.get("vx_multiplier", 2.0),
+        config.get("vy_multiplier", -3.0),
+        config.get("gravity", 0.5),
+    )
+
+    scenarios = []
+    for game in data["results"]:
+        for jump in game["jumps"]:
+            scenarios.append(
+                (tuple(jump["player_pos"]), tuple(jump["target_platform"]), physics_params)
+            )
+            if limit and len(scenarios) >= limit:
+                return scenarios
+    return scenarios
+
+
+def compare_variants(agent, scenarios, variants):
+    """
+    离线A/B对比：对每个变体在相同场景上请求模型，
+    统计成功着陆率、与求解器力度（SOLVER_STEP 间隔的小数力度）的平均偏差、平均token数和平均延迟。
+    """
+    report = {}
+    for variant in variants:
+        hits = 0
+        answered = 0
+        power_errors = []
+        tokens = 0
+        latency = 0.0
+
+        for player_pos, target_platform, physics_params in scenarios:
+            config = config_for(physics_params)
+            template = compile_prompt(variant, physics_params)
+            prompt = template.render(player_pos, target_platform)
+            tokens += estimate_tokens(prompt)
+
+            start = time.perf_counter()
+            power, _ = agent.query_model(
+                prompt, variant, (player_pos, target_platform, physics_params)
+            )
+            latency += time.perf_counter() - start
+
+            if power is None:
+                continue
+            answered += 1
+            success, _, _ = simulate_jump(power, player_pos, target_platform, config)
+            hits += success
+            best = solve_power(
+                player_pos, target_platform, config, SOLVER_STEP, SOLVER_MAX_POWER
+            )
+            if best is not None:
+                power_errors.append(abs(power - best))
+
+        n = len(scenarios)
+        report[variant] = {
+            "scenarios": n,
+            "answered": answered,
+            "accuracy": hits / n if n else 0,
+            "mean_power_error": (
+                sum(power_errors) / len(power_errors) if power_errors else None
+            ),
+            "avg_prompt_tokens": tokens / n if n else 0,
+            "avg_latency_ms": latency / n * 1000 if n else 0,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="在历史场景上离线对比prompt变体")
+    parser.add_argument("log_file", help="batch_ai_test 生成的详细日志JSON")
+    parser.add_argument("--api-key", help="Gemini API Key")
+    parser.add_argument(
+        "--fake-model", action="store_true", help="使用本地Gemini替身代替真实API"
+    )
+    parser.add_argument(
+        "--variants",
+        default=",".join(PROMPT_VARIANTS),
+        help="逗号分隔的变体列表",
+    )
+    parser.add_argument("--limit", type=int, default=50, help="最多使用的场景数")
+    args = parser.parse_args()
+
+    from ai_agent import JumpAIAgent
+
+    if args.fake_model:
+        from fake_gemini import FakeGeminiModel
+
+        agent = JumpAIAgent(fake_model=FakeGeminiModel(latency_ms=0, noise=1.0))
+    elif args.api_key:
+        agent = JumpAIAgent(args.api_key)
+    else:
+        parser.error("需要 --api-key 或 --fake-model")
+    scenarios = load_recorded_scenarios(args.log_file, args.limit)
+    print(f"📋 加载场景: {len(scenarios)} 个")
+
+    report = compare_variants(agent, scenarios, args.variants.split(","))
+
+    print(f"\n{'变体':<10}{'准确率':>8}{'力度偏差':>10}{'tokens':>8}{'延迟(ms)':>10}")
+    for variant, r in sorted(report.items(), key=lambda kv: kv[1]["avg_prompt_tokens"]):
+        error = "-" if r["mean_power_error"] is None else f"{r['mean_power_error']:.2f}"
+        print(
+            f"{variant:<10}{r['accuracy']:>8.1%}{error:>10}"
+            f"{r['avg_prompt_tokens']:>8.0f}{r['avg_latency_ms']:>10.0f}"
+        )
@@ -0,0 +1,315 @@
+"""
+跳一跳游戏 - 离线回放：在记录下来的跳跃场景上批量评估推荐策略
+场景来自 batch_ai_test 的详细日志（玩家位置、目标平台、物理参数以及当时推荐的力度和结果），
+或来自场景语料（.npz，只有平台序列，没有记录的力度）。
+对 strategies.py 中注册的每个策略，在所有场景上给出力度并用模拟器的物理计算结果，
+统计成功率、落点偏差，以及与记录力度的差异（改对了多少、改错了多少）。
+场景按块分给多个进程并行回放，不需要启动任何服务，也不会请求模型。
+
+用法:
+    python replay.py ai_detailed_log_20250101_120000.json                   # heuristic 和 solver
+    python replay.py ai_detailed_log_*.json --policies heuristic,solver --set solver.step=0.5
+    python replay.py --corpus scenarios_1000.npz --policies solver --workers 8
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import strategies
+from jump_index import expand_paths
+from jump_physics import DEFAULT_CONFIG, config_for, landing_error, simulate_jump
+from scenarios import ScenarioCorpus
+
+REPORT_FILE = "replay_report.json"
+RECORDED = "recorded"  # 伪策略：原样回放记录中的力度
+DEFAULT_POLICIES = "heuristic,solver"
+CHUNKS_PER_WORKER = 4
+
+# power / success 为记录中的力度和结果，来自语料的场景没有记录（None）
+Scenario = namedtuple(
+    "Scenario", ["player_pos", "target_platform", "physics_params", "power", "success"]
+)
+
+
+def load_log_scenarios(log_file):
+    """详细日志中的每一次跳跃"""
+    with open(log_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    config = data.get("config", {})
+    physics_params = (
+        config.get("vx_multiplier", 2.0),
+        config.get("vy_multiplier", -3.0),
+        config.get("gravity", 0.5),
+    )
+    return [
+        Scenario(
+            tuple(jump["player_pos"]),
+            tuple(jump["target_platform"]),
+            physics_params,
+            jump["recommended_power"],
+            jump["success"],
+        )
+        for game in data["results"]
+        for jump in game["jumps"]
+    ]
+
+
+def corpus_scenarios(corpus, config=DEFAULT_CONFIG, seed=0):
+    """
+    把语料中的平台序列展开为逐跳场景：玩家站在上一个平台上的随机位置（相机已居中），
+    第一跳从起始位置出发。每场游戏都按平台序列走完，不受策略影响。
+    """
+    rng = random.Random(seed)
+    px = config.canvas_width / 2
+    half = config.player_size / 2
+    scenarios = []
+    for distances, heights in zip(corpus.distances, corpus.heights):
+        player_y = 300.0
+        for distance, height in zip(distances.tolist(), heights.tolist()):
+            left = px - rng.uniform(0, config.platform_width) + distance
+            scenarios.append(
+                Scenario(
+                    (px, player_y),
+                    (left, height, left + config.platform_width),
+                    config.physics_params,
+                    None,
+                    None,
+                )
+            )
+            player_y = height - half
+    return scenarios
+
+
+_strategy_cache = {}
+
+
+def _strategy(name, options, physics_params):
+    """每个进程对每组 (策略, 选项, 物理参数) 只构建一次策略"""
+    key = (name, json.dumps(options, sort_keys=True), physics_params)
+    if key not in _strategy_cache:
+        config = config_for(physics_params)
+        _strategy_cache[key] = strategies.make_strategy(name, config, **options)
+    return _strategy_cache[key]
+
+
+def replay_chunk(name, options, scenarios):
+    """
+    回放一块场景，返回 (力度列表, 成功列表, 落点偏差列表, 决策耗时秒)。
+    未作答的场景力度为 None、视为失败；落点偏差只对成功的跳跃有意义，其余为 None。
+    """
+    powers, successes, errors = [], [], []
+    decide_time = 0.0
+    for scenario in scenarios:
+        if name == RECORDED:
+            power = scenario.power
+        else:
+            recommend = _strategy(name, options, tuple(scenario.physics_params))
+            start = time.perf_counter()
+            power = recommend(scenario.player_pos, scenario.target_platform)
+            decide_time += time.perf_counter() - start
+        success, error = False, None
+        if power is not None:
+            success, final_pos, _ = simulate_jump(
+                power,
+                scenario.player_pos,
+                scenario.target_platform,
+                config_for(scenario.physics_params),
+            )
+            if success:
+                error = landing_error(final_pos, scenario.target_platform)
+        powers.append(power)
+        successes.append(success)
+        errors.append(error)
+    return powers, successes, errors, decide_time
+
+
+def replay(name, scenarios, options=None, workers=None):
+    """在所有场景上回放一个策略，返回逐场景的 (力度, 成功, 落点偏差) 和总决策耗时"""
+    options = options or {}
+    workers = workers or os.cpu_count() or 1
+    size = max(1, math.ceil(len(scenarios) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [scenarios[i : i + size] for i in range(0, len(scenarios), size)]
+    powers, successes, errors, decide_time = [], [], [], 0.0
+    if workers == 1 or len(chunks) == 1:
+        parts = [replay_chunk(name, options, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(
+                pool.map(
+                    replay_chunk, [name] * len(chunks), [options] * len(chunks), chunks
+                )
+            )
+    for chunk_powers, chunk_successes, chunk_errors, chunk_time in parts:
+        powers += chunk_powers
+        successes += chunk_successes
+        errors += chunk_errors
+        decide_time += chunk_time
+    return powers, successes, errors, decide_time
+
+
+def summarize(scenarios, powers, successes, errors, decide_time):
+    """成功率、落点偏差和与记录力度的差异"""
+    n = len(scenarios)
+    answered = [p for p in powers if p is not None]
+    landed = [abs(e) for e in errors if e is not None]
+    summary = {
+        "scenarios": n,
+        "answered": len(answered),
+        "success_rate": sum(successes) / n if n else 0.0,
+        "landing_error_mean_abs": sum(landed) / len(landed) if landed else None,
+        "landing_error_max_abs": max(landed) if landed else None,
+        "decision_ms": decide_time / n * 1000 if n else 0.0,
+    }
+
+    recorded = [
+        (s, p, ok)
+        for s, p, ok in zip(scenarios, powers, successes)
+        if s.power is not None and p is not None
+    ]
+    if recorded:
+        deltas = [p - s.power for s, p, _ in recorded]
+        summary.update(
+            {
+                "power_delta_mean": sum(deltas) / len(deltas),
+                "power_delta_mean_abs": sum(abs(d) for d in deltas) / len(deltas),
+                "same_power": sum(d == 0 for d in deltas) / len(deltas),
+                # 记录中失败、回放成功（改对） / 记录中成功、回放失败（改错）
+                "fixed": sum(ok and not s.success for s, _, ok in recorded),
+                "broken": sum(s.success and not ok for s, _, ok in recorded),
+            }
+        )
+    return summary
+
+
+def parse_options(items, names):
+    """--set solver.step=0.5 → {"solver": {"step": 0.5}}，值按JSON解析，不是JSON时当作字符串"""
+    options = {name: {} for name in names}
+    for item in items:
+        key, _, raw = item.partition("=")
+        name, _, option = key.partition(".")
+        if name not in options or not option or not raw:
+            raise ValueError(f"无效的策略选项: {item}（格式: 策略.选项=值）")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        options[name][option] = value
+    return options
+
+
+def print_report(report):
+    print(f"\n📊 回放结果（{report['scenarios']} 个场景，{report['workers']} 个进程）")
+    print("=" * 86)
+    print(
+        f"{'策略':<12}{'作答':>8}{'成功率':>9}{'平均|偏差|':>12}"
+        f"{'力度差':>9}{'|力度差|':>10}{'改对':>7}{'改错':>7}{'决策ms':>9}{'耗时s':>8}"
+    )
+    print("-" * 86)
+
+    def fmt(value, spec):
+        return "-" if value is None else format(value, spec)
+
+    for name, row in report["policies"].items():
+        print(
+            f"{name:<12}{row['answered']:>10}{row['success_rate']:>11.2%}"
+            f"{fmt(row['landing_error_mean_abs'], '.2f'):>14}"
+            f"{fmt(row.get('power_delta_mean'), '+.2f'):>12}"
+            f"{fmt(row.get('power_delta_mean_abs'), '.2f'):>12}"
+            f"{fmt(row.get('fixed'), 'd'):>9}{fmt(row.get('broken'), 'd'):>9}"
+            f"{row['decision_ms']:>11.3f}{row['elapsed']:>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在记录的跳跃场景上离线评估推荐策略")
+    parser.add_argument("logs", nargs="*", help="batch_ai_test 的详细日志（支持通配符）")
+    parser.add_argument("--corpus", help="场景语料（.npz），与日志二选一")
+    parser.add_argument(
+        "--physics",
+        type=float,
+        nargs=3,
+        metavar=("VX_MUL", "VY_MUL", "GRAVITY"),
+        help="语料场景使用的物理参数（默认与游戏相同）",
+    )
+    parser.add_argument(
+        "--policies",
+        default=DEFAULT_POLICIES,
+        help=f"逗号分隔的策略（可选: {', '.join(strategies.STRATEGIES)}）",
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="策略.选项=值",
+        help="策略选项，如 solver.step=0.5、index.radius=1.5（可重复）",
+    )
+    parser.add_argument("--limit", type=int, help="最多回放的场景数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="并行进程数")
+    parser.add_argument("--output", default=REPORT_FILE, help="报告文件（JSON）")
+    args = parser.parse_args()
+
+    if bool(args.logs) == bool(args.corpus):
+        parser.error("需要指定详细日志或 --corpus（二选一）")
+    names = [name.strip() for name in args.policies.split(",") if name.strip()]
+    unknown = [name for name in names if name not in strategies.STRATEGIES]
+    if unknown:
+        parser.error(f"未知的策略: {', '.join(unknown)}")
+    try:
+        options = parse_options(args.set, names)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.corpus:
+        config = config_for(args.physics) if args.physics else DEFAULT_CONFIG
+        scenarios = corpus_scenarios(ScenarioCorpus.load(args.corpus), config)
+        sources = [args.corpus]
+    else:
+        sources = expand_paths(args.logs)
+        scenarios = []
+        for path in sources:
+            if not os.path.exists(path):
+                print(f"❌ 找不到日志: {path}")
+                return 1
+            scenarios += load_log_scenarios(path)
+        names.insert(0, RECORDED)
+        options[RECORDED] = {}
+    scenarios = scenarios[: args.limit]
+    if not scenarios:
+        print("❌ 没有可回放的场景")
+        return 1
+
+    print("⏪ 离线回放")
+    print("=" * 50)
+    print(f"   场景: {len(scenarios)} 个，来自 {len(sources)} 个文件")
+    print(f"   策略: {', '.join(names)}")
+
+    report = {
+        "sources": sources,
+        "scenarios": len(scenarios),
+        "workers": args.workers,
+        "options": options,
+        "policies": {},
+    }
+    for name in names:
+        start = time.perf_counter()
+        outcome = replay(name, scenarios, options[name], args.workers)
+        row = summarize(scenarios, *outcome)
+        row["elapsed"] = time.perf_counter() - start
+        report["policies"][name] = row
+        print(f"   ✅ {name}: 成功率 {row['success_rate']:.2%}（{row['elapsed']:.2f} 秒）")
+
+    print_report(report)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 报告已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
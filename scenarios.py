@@ -0,0 +1,167 @@
+"""
+跳一跳游戏 - 可复现的场景生成器
+基于计数器的随机数（Philox）：第 g 场游戏的平台序列只由 (seed, g) 决定，
+因此可以批量预生成为数组、保存为场景语料文件，并被多个进程按游戏区间切片使用而无需协调。
+"""
+
+import numpy as np
+
+# 与 GameSimulator.generate_platform 相同的平台分布
+MIN_DISTANCE = 80
+MAX_DISTANCE = 200
+MIN_HEIGHT = 280
+HEIGHT_RANGE = 80
+
+
+def game_rng(seed, game_id):
+    """第 game_id 场游戏专用的随机数发生器（计数器高位为游戏编号）"""
+    return np.random.Generator(np.random.Philox(key=seed, counter=[0, 0, 0, game_id]))
+
+
+def uniforms_to_platforms(uniforms):
+    """把成对的 [0,1) 随机数转换为 (平台间距, 平台高度)，公式与 generate_platform 一致"""
+    distances = MIN_DISTANCE + uniforms[..., 0] * (MAX_DISTANCE - MIN_DISTANCE)
+    heights = MIN_HEIGHT + uniforms[..., 1] * HEIGHT_RANGE
+    return distances, heights
+
+
+def generate_platforms(seed, first_game_id, num_games, num_platforms):
+    """批量生成多场游戏的平台序列，返回形状为 (num_games, num_platforms) 的两个数组"""
+    game_ids = range(first_game_id, first_game_id + num_games)
+    return platform_block(seed, game_ids, 0, num_platforms)
+
+
+def platform_block(seed, game_ids, start, count):
+    """
+    批量生成多场游戏中第 [start, start + count) 个平台，返回形状为 (游戏数, count) 的两个数组。
+    复用同一个 Philox 发生器，直接把计数器设置到对应位置，
+    既不必为每场游戏创建发生器，也不必先生成前面的平台。
+    """
+    bit_generator = np.random.Philox(key=seed)
+    rng = np.random.Generator(bit_generator)
+    state = bit_generator.state
+    skip = start * 2  # 每个平台使用两个随机数，每个计数器块产生四个
+    uniforms = np.empty((len(game_ids), count * 2))
+    for i, game_id in enumerate(game_ids):
+        state["state"]["counter"] = np.array([skip // 4, 0, 0, game_id], dtype=np.uint64)
+        state["buffer_pos"] = 4
+        bit_generator.state = state
+        if skip % 4:
+            rng.random(skip % 4)
+        uniforms[i] = rng.random(count * 2)
+    return uniforms_to_platforms(uniforms.reshape(len(game_ids), count, 2))
+
+
+class PlatformStream:
+    """
+    单场游戏的平台序列，按顺序返回 (间距, 高度)。
+    优先使用语料中预生成的部分，用完后从同一计数器位置继续按块生成，序列保持一致。
+    用过的块会被丢弃，因此很长的游戏也只占用固定的内存。
+    """
+
+    CHUNK = 64  # 语料用完后每次生成的平台数
+
+    def __init__(self, seed, game_id, distances=None, heights=None):
+        self.seed = seed
+        self.game_id = game_id
+        self._distances = [] if distances is None else distances.tolist()
+        self._heights = [] if heights is None else heights.tolist()
+        self._index = 0
+        self._rng = None
+
+    def next_platform(self):
+        if self._index >= len(self._distances):
+            self._extend()
+        platform = self._distances[self._index], self._heights[self._index]
+        self._index += 1
+        return platform
+
+    def _extend(self):
+        if self._rng is None:
+            # 跳过语料中已经使用过的随机数
+            self._rng = game_rng(self.seed, self.game_id)
+            self._rng.random(len(self._distances) * 2)
+        uniforms = self._rng.random(self.CHUNK * 2).reshape(self.CHUNK, 2)
+        distances, heights = uniforms_to_platforms(uniforms)
+        self._distances = distances.tolist()
+        self._heights = heights.tolist()
+        self._index = 0
+
+
+class ScenarioCorpus:
+    """预生成的场景语料：first_game_id 起连续若干场游戏的平台序列"""
+
+    def __init__(self, seed, first_game_id, distances, heights):
+        self.seed = seed
+        self.first_game_id = first_game_id
+        self.distances = distances
+        self.heights = heights
+
+    @classmethod
+    def generate(cls, seed, num_games, num_platforms, first_game_id=0):
+        distances, heights = generate_platforms(
+            seed, first_game_id, num_games, num_platforms
+        )
+        return cls(seed, first_game_id, distances, heights)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                int(data["seed"]),
+                int(data["first_game_id"]),
+                data["distances"],
+                data["heights"],
+            )
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            seed=self.seed,
+            first_game_id=self.first_game_id,
+            distances=self.distances,
+            heights=self.heights,
+        )
+
+    def __len__(self):
+        return len(self.distances)
+
+    @property
+    def game_ids(self):
+        return range(self.first_game_id, self.first_game_id + len(self))
+
+    def slice(self, start, stop):
+        """按游戏编号区间 [start, stop) 切片（不复制数据）"""
+        lo = max(start - self.first_game_id, 0)
+        hi = min(stop - self.first_game_id, len(self))
+        return ScenarioCorpus(
+            self.seed, self.first_game_id + lo, self.distances[lo:hi], self.heights[lo:hi]
+        )
+
+    def stream(self, game_id):
+        """获取某场游戏的平台序列；不在语料范围内时直接由生成器产生"""
+        row = game_id - self.first_game_id
+        if 0 <= row < len(self):
+            return PlatformStream(
+                self.seed, game_id, self.distances[row], self.heights[row]
+            )
+        return PlatformStream(self.seed, game_id)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="预生成可复现的场景语料")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--games", type=int, default=1000, help="游戏场数")
+    parser.add_argument("--platforms", type=int, default=100, help="每场预生成的平台数")
+    parser.add_argument("--first-game-id", type=int, default=1, help="起始游戏编号")
+    parser.add_argument("-o", "--output", default="scenario_corpus.npz", help="输出文件")
+    args = parser.parse_args()
+
+    corpus = ScenarioCorpus.generate(
+        args.seed, args.games, args.platforms, args.first_game_id
+    )
+    corpus.save(args.output)
+    print(f"💾 场景语料已保存: {args.output}")
+    print(f"   种子: {args.seed}, 游戏: {len(corpus)}, 每场平台数: {args.platforms}")
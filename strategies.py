@@ -0,0 +1,200 @@
+"""
+跳一跳游戏 - 推荐策略注册表
+策略是一个工厂函数：factory(config, **options) 返回 recommend(player_pos, target_platform)，
+后者给出推荐力度（无法作答时返回 None）。批量测试（RECOMMEND_POLICY）、AI服务的备用推荐、
+离线回放和策略锦标赛都按名字创建策略，因此策略可以在子进程中重新构建，不需要能被 pickle。
+
+请求模型的策略（uses_model=True）的 recommend 带有 usage() 方法，
+返回 {"model_calls": 调用次数, "prompt_tokens": prompt token 总数}，用于估算成本。
+
+    @register("my_policy", "一句话说明")
+    def make_my_policy(config, scale=1.0):
+        def recommend(player_pos, target_platform):
+            ...
+        return recommend
+"""
+
+import os
+from collections import namedtuple
+
+import jump_physics
+import physics_jit
+from jump_physics import (
+    DEFAULT_CONFIG,
+    heuristic_for,
+    heuristic_power,
+    load_heuristic_profile,
+    relative_geometry,
+)
+
+# 求解器的默认力度间隔和最大力度，solver 和 table（以及它们的向量化版本）共用。
+# 整数力度经常无解（默认物理参数下一个力度单位就是十几像素），需要小数力度；
+# 力度10的水平距离已超过2000像素，更大的力度不可能落到下一个平台上。
+SOLVER_STEP = 0.1
+SOLVER_MAX_POWER = 10
+# 使用求解器、接受 step / max_power / jit 选项的策略
+SOLVER_POLICIES = ("solver", "table")
+
+Strategy = namedtuple("Strategy", ["name", "description", "factory", "uses_model"])
+
+STRATEGIES = {}
+
+
+def register(name, description, uses_model=False):
+    """注册策略工厂的装饰器"""
+
+    def decorator(factory):
+        if name in STRATEGIES:
+            raise ValueError(f"策略已注册: {name}")
+        STRATEGIES[name] = Strategy(name, description, factory, uses_model)
+        return factory
+
+    return decorator
+
+
+def make_strategy(name, config=DEFAULT_CONFIG, **options):
+    """按名字创建策略，返回 recommend(player_pos, target_platform)"""
+    if name not in STRATEGIES:
+        raise ValueError(f"未知的推荐策略: {name}（可选: {', '.join(sorted(STRATEGIES))}）")
+    return STRATEGIES[name].factory(config, **options)
+
+
+@register("heuristic", "物理计算推荐（系数来自启发式系数配置）")
+def make_heuristic(config, coefficients=None):
+    if coefficients is None:
+        coefficients = heuristic_for(config, load_heuristic_profile())
+
+    def recommend(player_pos, target_platform):
+        return heuristic_power(player_pos, target_platform, coefficients)
+
+    return recommend
+
+
+@register("solver", "模拟枚举求最优力度，无解时退回物理计算推荐")
+def make_solver(
+    config, step=SOLVER_STEP, max_power=SOLVER_MAX_POWER, jit=False, fallback=None
+):
+    """
+    jit: 使用JIT物理内核（physics_jit，需要安装numba，第一次使用时编译或读取缓存）；
+    fallback: 无解时使用的推荐函数，默认为物理计算推荐
+    """
+    backend = physics_jit if jit else jump_physics
+    fallback = fallback or make_heuristic(config)
+
+    def recommend(player_pos, target_platform):
+        power = backend.solve_power(
+            player_pos, target_platform, config, step=step, max_power=max_power
+        )
+        if power is None:
+            return fallback(player_pos, target_platform)
+        return power
+
+    return recommend
+
+
+@register("table", "按相对几何量分格的求解结果查找表（第一次用到某格时求解格中心）")
+def make_table(
+    config, resolution=1.0, step=SOLVER_STEP, max_power=SOLVER_MAX_POWER, jit=False
+):
+    solver = make_solver(config, step, max_power, jit)
+    table = {}
+
+    def recommend(player_pos, target_platform):
+        dx, dy, width = relative_geometry(player_pos, target_platform)
+        cell = (round(dx / resolution), round(dy / resolution), round(width / resolution))
+        if cell not in table:
+            # 按格中心的几何量还原目标平台再求解（掉出屏幕的判定与玩家的绝对高度有关，保留玩家位置）
+            px, py = player_pos
+            center_dx, center_dy, center_width = (value * resolution for value in cell)
+            left = px + center_dx - center_width / 2
+            table[cell] = solver(player_pos, (left, py + center_dy, left + center_width))
+        return table[cell]
+
+    return recommend
+
+
+@register("index", "历史成功跳跃的最近邻索引（jump_index.py），未命中时不作答")
+def make_index(config, path=None, radius=None):
+    from jump_index import INDEX_FILE, JumpIndex
+
+    index = JumpIndex.load(path or INDEX_FILE, radius)
+    physics_params = config.physics_params
+
+    def recommend(player_pos, target_platform):
+        return index.lookup(player_pos, target_platform, physics_params)
+
+    return recommend
+
+
+def _make_agent(
+    api_key=None,
+    fake=False,
+    fake_latency_ms=0.0,
+    fake_noise=0.0,
+    fake_seed=None,
+    prompt_variant=None,
+    candidates=0,
+    index=None,
+):
+    """在进程内创建 JumpAIAgent；fake=True 时使用本地替身模型（fake_gemini.py）"""
+    from ai_agent import JumpAIAgent
+
+    options = {"candidate_count": candidates, "index": index}
+    if prompt_variant:
+        options["prompt_variant"] = prompt_variant
+    if fake:
+        from fake_gemini import FakeGeminiModel
+
+        options["fake_model"] = FakeGeminiModel(
+            latency_dist="fixed", latency_ms=fake_latency_ms, noise=fake_noise, seed=fake_seed
+        )
+    return JumpAIAgent(api_key=api_key, **options)
+
+
+def _agent_recommender(agent, config):
+    physics_params = config.physics_params
+
+    def recommend(player_pos, target_platform):
+        return agent.recommend(player_pos, target_platform, physics_params)[0]
+
+    def usage():
+        stats = agent.prompt_stats.snapshot().values()
+        return {
+            "model_calls": sum(entry["calls"] for entry in stats),
+            "prompt_tokens": sum(entry["calls"] * entry["avg_prompt_tokens"] for entry in stats),
+        }
+
+    recommend.usage = usage
+    return recommend
+
+
+@register("llm", "每一跳都请求模型（JumpAIAgent），失败时退回物理计算推荐", uses_model=True)
+def make_llm(config, **agent_options):
+    return _agent_recommender(_make_agent(**agent_options), config)
+
+
+@register("cached_llm", "相对几何量按 resolution 像素取整后缓存模型的回答", uses_model=True)
+def make_cached_llm(config, resolution=1.0, **agent_options):
+    ask = make_llm(config, **agent_options)
+    cache = {}
+
+    def recommend(player_pos, target_platform):
+        geometry = relative_geometry(player_pos, target_platform)
+        key = tuple(round(value / resolution) for value in geometry)
+        if key not in cache:
+            cache[key] = ask(player_pos, target_platform)
+        return cache[key]
+
+    recommend.usage = ask.usage
+    return recommend
+
+
+@register("knn", "最近邻索引命中时直接回答，未命中时请求模型并把成功的回答加入索引", uses_model=True)
+def make_knn(config, path=None, radius=None, **agent_options):
+    from jump_index import DEFAULT_RADIUS, JumpIndex
+
+    if path and os.path.exists(path):
+        index = JumpIndex.load(path, radius)
+    else:
+        index = JumpIndex(radius or DEFAULT_RADIUS)
+    return _agent_recommender(_make_agent(index=index, **agent_options), config)
@@ -0,0 +1,138 @@
+"""
+自适应采样测试
+SequentialEstimate 的均值和置信区间与按定义直接计算的结果一致；
+批量测试在置信区间第一次足够窄（且达到最少场数）的那一场停止，预算用完仍不够窄时不算提前停止。
+"""
+
+import json
+import math
+import statistics
+import tempfile
+
+import batch_ai_test
+from batch_ai_test import SequentialEstimate
+from test_checkpoint import batch_run, interrupt_at
+
+# 已知样本：均值 5，样本标准差 sqrt(32/7)
+SAMPLE = [2, 4, 4, 4, 5, 5, 7, 9]
+# 得分按 0, 10, 20, 30 循环的游戏
+SCORES = [(i % 4) * 10 for i in range(40)]
+ADAPTIVE = {
+    "ADAPTIVE_SAMPLING": True,
+    "ADAPTIVE_METRIC": "score",
+    "ADAPTIVE_CI_WIDTH": 10,
+    "ADAPTIVE_CONFIDENCE": 0.95,
+    "ADAPTIVE_MIN_GAMES": 5,
+    "TOTAL_GAMES": len(SCORES),
+}
+
+
+def test_interval_matches_known_sample():
+    estimate = SequentialEstimate(0.95)
+    assert estimate.half_width == math.inf
+    for value in SAMPLE:
+        estimate.add(value)
+    assert estimate.count == 8
+    assert math.isclose(estimate.mean, 5)
+    # z(0.975) = 1.959964，半宽 = z * s / sqrt(n)
+    half_width = 1.959964 * math.sqrt(32 / 7) / math.sqrt(8)
+    assert math.isclose(estimate.half_width, half_width, rel_tol=1e-6)
+    assert math.isclose(estimate.half_width, 1.481594, rel_tol=1e-6)
+    low, high = estimate.interval
+    assert math.isclose(low, 5 - half_width, rel_tol=1e-6)
+    assert math.isclose(high, 5 + half_width, rel_tol=1e-6)
+
+    # 置信水平越高区间越宽
+    wider = SequentialEstimate(0.99)
+    for value in SAMPLE:
+        wider.add(value)
+    assert wider.half_width > estimate.half_width
+
+
+def expected_stop(scores, width, confidence, min_games):
+    """按定义逐场计算置信区间，返回第一次足够窄的场数（None 表示预算内达不到）"""
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    for n in range(max(2, min_games), len(scores) + 1):
+        if 2 * z * statistics.stdev(scores[:n]) / math.sqrt(n) <= width:
+            return n
+    return None
+
+
+def expected_width(scores):
+    """前 len(scores) 场的 95% 置信区间宽度"""
+    z = statistics.NormalDist().inv_cdf(0.975)
+    return 2 * z * statistics.stdev(scores) / math.sqrt(len(scores))
+
+
+def fixed_scores(scores):
+    """让每场游戏的得分取 scores 中对应的值（不进行真正的模拟）"""
+
+    def play_single_game(self, game_id, *args, **kwargs):
+        score = scores[game_id - 1]
+        return {
+            "game_id": game_id,
+            "score": score,
+            "jumps_count": score // 10 + 1,
+            "success_rate": score / (score + 10),
+            "ai_mode": False,
+            "jumps": [],
+        }
+
+    return play_single_game
+
+
+def sampling_run(**overrides):
+    """运行批量测试，返回 (实际进行的游戏编号, 详细日志中的采样结论)"""
+    played = []
+    play = batch_ai_test.GameSimulator.play_single_game
+    batch_ai_test.GameSimulator.play_single_game = fixed_scores(SCORES)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            with batch_run(directory, **{**ADAPTIVE, **overrides}), interrupt_at(None, played):
+                _, detailed_log = batch_ai_test.run_batch_games()
+                with open(detailed_log, "r", encoding="utf-8") as f:
+                    summary = json.load(f)["summary"]
+    finally:
+        batch_ai_test.GameSimulator.play_single_game = play
+    return played, summary["adaptive_sampling"]
+
+
+def test_stops_when_interval_is_narrow_enough():
+    stop = expected_stop(SCORES, 10, 0.95, 5)
+    assert stop == 21
+    played, sampling = sampling_run()
+    assert played == list(range(1, stop + 1))
+    assert sampling["stopped_early"] and sampling["games_needed"] == stop
+    assert math.isclose(sampling["mean"], statistics.mean(SCORES[:stop]))
+    low, high = sampling["interval"]
+    assert high - low <= 10 < expected_width(SCORES[: stop - 1])
+
+    # 最少场数晚于区间足够窄的场数时，到最少场数才停止
+    played, sampling = sampling_run(ADAPTIVE_MIN_GAMES=30)
+    assert len(played) == 30 and sampling["stopped_early"]
+
+
+def test_budget_exhausted_without_stopping():
+    assert expected_stop(SCORES, 2, 0.95, 5) is None
+    played, sampling = sampling_run(ADAPTIVE_CI_WIDTH=2)
+    assert played == list(range(1, len(SCORES) + 1))
+    assert not sampling["stopped_early"]
+    assert sampling["games_needed"] == sampling["max_games"] == len(SCORES)
+    low, high = sampling["interval"]
+    assert math.isclose(high - low, expected_width(SCORES))
+
+
+def main():
+    print("🧮 自适应采样测试")
+    print("=" * 50)
+    test_interval_matches_known_sample()
+    print("✅ 均值和置信区间与已知样本一致")
+    test_stops_when_interval_is_narrow_enough()
+    print("✅ 置信区间第一次足够窄时停止，最少场数之前不停止")
+    test_budget_exhausted_without_stopping()
+    print("✅ 预算用完仍不够窄时不算提前停止")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
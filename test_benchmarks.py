@@ -0,0 +1,81 @@
+"""
+性能基准回退测试
+缺少基准线时比较必须失败；在记录基准线的参考机器上运行 benchmarks.QUICK_BENCHMARKS，
+与提交的 bench_baseline.json 比较，慢 REGRESSION_THRESHOLD 以上的项重新计时 RETRIES 次后仍然回退则失败。
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+import benchmarks
+
+RETRIES = 3  # 单次计时可能受系统噪声影响，回退的项最多重新计时的次数
+RETRY_DELAY = 3  # 重新计时前等待的秒数，避开短时间的噪声（如虚拟机的CPU争用）
+
+
+def load_baseline():
+    with open(benchmarks.BASELINE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_missing_baseline_is_an_error():
+    with tempfile.TemporaryDirectory() as directory:
+        missing = os.path.join(directory, "bench_baseline.json")
+        assert benchmarks.check_baseline({}, missing) != 0
+
+
+def test_baseline_covers_quick_benchmarks():
+    baseline = load_baseline()
+    assert set(benchmarks.QUICK_BENCHMARKS) <= set(baseline["results"])
+    assert set(benchmarks.QUICK_BENCHMARKS) <= {name for name, _, _ in benchmarks.BENCHMARKS}
+
+
+def find_regressions():
+    """返回重新计时后仍然回退的项；基准线不是在本机记录的返回 None"""
+    baseline = load_baseline()
+    if not benchmarks.same_machine(baseline["meta"]):
+        return None
+    results = benchmarks.run_benchmarks(names=benchmarks.QUICK_BENCHMARKS)
+    regressions = benchmarks.compare_with_baseline(results, baseline["results"])
+    for _ in range(RETRIES):
+        if not regressions:
+            break
+        # 只对回退的项重新计时，每项保留各次中最快的一轮
+        time.sleep(RETRY_DELAY)
+        names = [name for name, _, _, _ in regressions]
+        for name, result in benchmarks.run_benchmarks(names=names).items():
+            if result["min_s"] < results[name]["min_s"]:
+                results[name] = result
+        regressions = benchmarks.compare_with_baseline(results, baseline["results"])
+    return regressions
+
+
+def test_no_regression_against_baseline():
+    regressions = find_regressions()
+    if regressions is None:
+        pytest.skip("bench_baseline.json 不是在本机记录的，计时不可比较")
+    assert not regressions, regressions
+
+
+def main():
+    print("⏱️  性能基准回退测试")
+    print("=" * 50)
+    test_missing_baseline_is_an_error()
+    print("✅ 缺少基准线时比较失败")
+    test_baseline_covers_quick_benchmarks()
+    print("✅ 基准线包含快速子集的全部项")
+    regressions = find_regressions()
+    if regressions is None:
+        print("⏭️  基准线不是在本机记录的，跳过计时比较")
+    else:
+        assert not regressions, regressions
+        print("✅ 快速子集没有性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+"""
+多候选验证模式测试
+候选力度保留小数并限制在 0-100；服务端用物理模拟从候选中选出能着陆且最接近中心的力度，
+都落空时由物理计算兜底；/api/get_recommendation 的 candidates 参数校验。
+"""
+
+import json
+
+import ai_agent as service
+from ai_agent import MAX_CANDIDATES, JumpAIAgent, parse_candidates
+from fake_gemini import FakeGeminiModel, FakeResponse
+from jump_physics import DEFAULT_CONFIG, simulate_jump
+
+PHYSICS = DEFAULT_CONFIG.physics_params
+PLAYER = (100, 300)
+# 整数力度 2 和 3 都落不到这个平台上（求解器给出 2.74）
+PLATFORM = (260, 300, 300)
+
+
+def test_parse_candidates():
+    assert parse_candidates('{"candidates": [2.74, 2.6, 3]}') == [2.74, 2.6, 3]
+    assert parse_candidates("[3, 3.0, 2.741, 2.7449]") == [3, 2.74]
+    # 超出范围的限制到 0-100，不是数字的忽略
+    assert parse_candidates('{"candidates": [-5, 150, "2.5", "abc", true, null]}') == [
+        0,
+        100,
+        2.5,
+    ]
+    assert parse_candidates('```json\n{"candidates": [2.8, 2.7]}\n```') == [2.8, 2.7]
+    # JSON不合法时提取所有数字
+    assert parse_candidates("候选: 2.74, 2.9 或者 3") == [2.74, 2.9, 3]
+    assert parse_candidates("没有数字") == []
+
+
+def json_agent(candidates, candidate_count=3):
+    """模型总是以JSON返回同一组候选的 agent，返回 (agent, 收到的prompt列表)"""
+    model = FakeGeminiModel(latency_ms=0, seed=1)
+    prompts = []
+
+    def generate_content(prompt, generation_config=None, scenario=None):
+        prompts.append(prompt)
+        assert generation_config.response_mime_type == "application/json"
+        return FakeResponse(json.dumps({"candidates": candidates}))
+
+    model.generate_content = generate_content
+    return JumpAIAgent(fake_model=model, candidate_count=candidate_count), prompts
+
+
+def test_select_verified_candidate():
+    assert not simulate_jump(3, PLAYER, PLATFORM)[0]
+    agent, prompts = json_agent([3, 2.74, 2.6])
+    # 只有小数候选 2.74 能着陆
+    assert agent.select_verified_candidate(PLAYER, PLATFORM, PHYSICS, 3) == 2.74
+    assert len(prompts) == 1 and "3个" in prompts[0]
+
+    # 多个候选能着陆时选落点最接近平台中心的
+    platform = (240, 300, 340)
+    landing = [p for p in (2.6, 2.7, 2.8, 2.9) if simulate_jump(p, PLAYER, platform)[0]]
+    assert len(landing) > 1
+    agent, _ = json_agent(landing)
+    best = agent.select_verified_candidate(PLAYER, platform, PHYSICS, len(landing))
+    errors = {
+        p: abs(simulate_jump(p, PLAYER, platform)[1][0] - 290) for p in landing
+    }
+    assert best == min(errors, key=errors.get)
+
+
+def test_all_candidates_miss_falls_back():
+    agent, _ = json_agent([2, 3])
+    assert agent.select_verified_candidate(PLAYER, PLATFORM, PHYSICS, 2) is None
+    power, source = agent.recommend(PLAYER, PLATFORM, PHYSICS)
+    assert source == "fallback"
+    assert power == agent.fallback_recommendation(PLAYER, PLATFORM, PHYSICS)
+
+
+def test_candidates_parameter_validation():
+    agent, prompts = json_agent([3, 2.74], candidate_count=0)
+    original, service.ai_agent = service.ai_agent, agent
+    try:
+        client = service.app.test_client()
+        request = {
+            "player_pos": list(PLAYER),
+            "target_platform": list(PLATFORM),
+            "physics_params": list(PHYSICS),
+        }
+        for candidates in ("3", 2.5, True, -1, MAX_CANDIDATES + 1, 1000):
+            response = client.post(
+                "/api/get_recommendation", json={**request, "candidates": candidates}
+            )
+            assert response.status_code == 400, candidates
+        assert not prompts
+
+        response = client.post("/api/get_recommendation", json={**request, "candidates": 2})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["recommended_power"] == 2.74 and data["source"] == "ai"
+        assert len(prompts) == 1
+    finally:
+        service.ai_agent = original
+
+
+def main():
+    print("🎯 多候选验证模式测试")
+    print("=" * 50)
+    test_parse_candidates()
+    print("✅ 候选力度保留小数、限制范围并去重")
+    test_select_verified_candidate()
+    print("✅ 物理验证选出能着陆且最接近中心的候选")
+    test_all_candidates_miss_falls_back()
+    print("✅ 候选都落空时由物理计算兜底")
+    test_candidates_parameter_validation()
+    print("✅ candidates 参数校验")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
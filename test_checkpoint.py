@@ -0,0 +1,169 @@
+"""
+批量测试检查点测试
+中断后用检查点继续的运行只进行剩下的游戏，最终结果与一次跑完的运行相同，完成后删除检查点；
+崩溃时写了一半的结果行被忽略；运行配置与检查点不一致时拒绝继续（总游戏数除外）。
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+import batch_ai_test
+from checkpoint import BatchCheckpoint, CheckpointMismatch
+
+SETTINGS = {
+    "USE_AI_MODE": False,
+    "RECOMMEND_POLICY": "solver",
+    "SOLVER_STEP": 1,  # 整数力度求解器：每场游戏有几十次跳跃，又足够快
+    "SCENARIO_SEED": 7,
+    "SCENARIO_CORPUS": None,
+    "TOTAL_GAMES": 6,
+    "CHECKPOINT_FILE": "batch_checkpoint.json",
+    "CHECKPOINT_EVERY": 1,
+    "VECTOR_ENGINE": False,
+    "ADAPTIVE_SAMPLING": False,
+    "PROFILE_PHASES": False,
+    "MEMORY_PROFILE": False,
+    "MARGIN_ANALYSIS": False,
+    "AI_CANDIDATES": 0,
+}
+
+
+@contextmanager
+def batch_run(directory, **overrides):
+    """在 directory 中以 SETTINGS（加上 overrides）运行批量测试，退出时恢复全局配置"""
+    settings = {**SETTINGS, **overrides}
+    original = {name: getattr(batch_ai_test, name) for name in settings}
+    cwd = os.getcwd()
+    for name, value in settings.items():
+        setattr(batch_ai_test, name, value)
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+        for name, value in original.items():
+            setattr(batch_ai_test, name, value)
+
+
+@contextmanager
+def interrupt_at(game_id, played):
+    """第 game_id 场游戏开始时模拟 Ctrl+C；played 记录实际进行的游戏编号"""
+    play = batch_ai_test.GameSimulator.play_single_game
+
+    def interrupted(self, game_num, *args, **kwargs):
+        if game_num == game_id:
+            raise KeyboardInterrupt
+        played.append(game_num)
+        return play(self, game_num, *args, **kwargs)
+
+    batch_ai_test.GameSimulator.play_single_game = interrupted
+    try:
+        yield
+    finally:
+        batch_ai_test.GameSimulator.play_single_game = play
+
+
+def load_results(detailed_log):
+    with open(detailed_log, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def outcome(results):
+    return [(r["game_id"], r["score"], r["jumps_count"], r["success_rate"]) for r in results]
+
+
+def interrupted_run(directory, at=4):
+    """运行到第 at 场游戏时中断，返回中断前进行的游戏编号"""
+    played = []
+    with batch_run(directory), interrupt_at(at, played):
+        with pytest.raises(KeyboardInterrupt):
+            batch_ai_test.run_batch_games()
+    return played
+
+
+def test_interrupted_run_resumes():
+    with tempfile.TemporaryDirectory() as directory:
+        with batch_run(directory):
+            _, detailed_log = batch_ai_test.run_batch_games()
+            expected = outcome(load_results(detailed_log))
+    assert [game_id for game_id, *_ in expected] == [1, 2, 3, 4, 5, 6]
+
+    with tempfile.TemporaryDirectory() as directory:
+        assert interrupted_run(directory) == [1, 2, 3]
+        path = os.path.join(directory, SETTINGS["CHECKPOINT_FILE"])
+        with open(path, "r", encoding="utf-8") as f:
+            assert json.load(f)["completed"] == [1, 2, 3]
+
+        played = []
+        with batch_run(directory), interrupt_at(None, played):
+            _, detailed_log = batch_ai_test.run_batch_games(resume=SETTINGS["CHECKPOINT_FILE"])
+            resumed = outcome(load_results(detailed_log))
+        # 只进行剩下的游戏，结果与一次跑完相同，完成后检查点和结果文件都被删除
+        assert played == [4, 5, 6]
+        assert resumed == expected
+        assert not os.path.exists(path)
+        assert not os.path.exists(os.path.splitext(path)[0] + "_results.jsonl")
+
+
+def test_partial_result_line_is_ignored():
+    with tempfile.TemporaryDirectory() as directory:
+        interrupted_run(directory)
+        path = os.path.join(directory, SETTINGS["CHECKPOINT_FILE"])
+        with open(path, "r", encoding="utf-8") as f:
+            settings = json.load(f)["settings"]
+        checkpoint, results = BatchCheckpoint.resume(path, settings)
+        # 崩溃时写了一半的行，以及检查点之后才写入的结果都不算完成
+        with open(checkpoint.results_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**results[0], "game_id": 4}) + "\n")
+            f.write('{"game_id": 5, "sco')
+        checkpoint, resumed = BatchCheckpoint.resume(path, settings)
+    assert checkpoint.completed == [1, 2, 3]
+    assert resumed == results
+    assert checkpoint.stats["total_jumps"] == sum(r["jumps_count"] for r in results)
+
+
+def test_settings_mismatch_is_rejected():
+    with tempfile.TemporaryDirectory() as directory:
+        interrupted_run(directory)
+        with batch_run(directory, SCENARIO_SEED=8):
+            with pytest.raises(CheckpointMismatch, match="seed: 7 → 8"):
+                batch_ai_test.run_batch_games(resume=SETTINGS["CHECKPOINT_FILE"])
+        # 与分布式运行检查同样的配置，包括求解器精度、多候选和落点余量分析
+        for name, value, key in (
+            ("RECOMMEND_POLICY", "default", "policy"),
+            ("SOLVER_STEP", 0.1, "solver_step: 1 → 0.1"),
+            ("SOLVER_MAX_POWER", 20, "solver_max_power"),
+            ("AI_CANDIDATES", 3, "ai_candidates"),
+            ("MARGIN_ANALYSIS", True, "margin_analysis"),
+        ):
+            with batch_run(directory, **{name: value}):
+                with pytest.raises(CheckpointMismatch, match=key):
+                    batch_ai_test.run_batch_games(resume=SETTINGS["CHECKPOINT_FILE"])
+
+        # 总游戏数可以改：扩大预算后继续，已完成的游戏不重玩
+        played = []
+        with batch_run(directory, TOTAL_GAMES=8), interrupt_at(None, played):
+            _, detailed_log = batch_ai_test.run_batch_games(resume=SETTINGS["CHECKPOINT_FILE"])
+            results = load_results(detailed_log)
+    assert played == [4, 5, 6, 7, 8]
+    assert [r["game_id"] for r in results] == list(range(1, 9))
+
+
+def main():
+    print("♻️  批量测试检查点测试")
+    print("=" * 50)
+    test_interrupted_run_resumes()
+    print("✅ 中断后继续只进行剩下的游戏，结果与一次跑完相同")
+    test_partial_result_line_is_ignored()
+    print("✅ 写了一半的结果行和检查点之后的结果被忽略")
+    test_settings_mismatch_is_rejected()
+    print("✅ 运行配置不一致时拒绝继续，总游戏数可以修改")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
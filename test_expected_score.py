@@ -0,0 +1,72 @@
+"""
+期望得分计算测试
+马尔可夫链给出的期望得分应落在固定种子的蒙特卡洛模拟的95%置信区间内，
+逐个调用的推荐函数包装后应与对应的向量化策略给出相同的结果。
+"""
+
+import numpy as np
+
+from batch_ai_test import GameSimulator
+from expected_score import expected_score, scalar_policy
+from vector_engine import MAX_JUMPS, VectorGameEngine
+
+GAMES = 20000
+SEED = 11
+# (solver 参数, 跳跃上限)：接近满分的小数力度（失败集中在比网格还窄的区域），和经常失败的整数力度
+CASES = (
+    ({"step": 0.1, "max_power": 4, "jit": True}, 20),
+    ({"step": 1, "max_power": 10}, MAX_JUMPS),
+)
+
+
+def monte_carlo(max_jumps, **options):
+    """固定种子的蒙特卡洛平均得分及其95%置信区间的半宽"""
+    engine = VectorGameEngine(policy="solver", max_jumps=max_jumps, **options)
+    scores = engine.run(GAMES, seed=SEED).scores
+    return scores.mean(), 1.96 * scores.std(ddof=1) / np.sqrt(GAMES)
+
+
+def test_matches_monte_carlo():
+    for options, max_jumps in CASES:
+        result = expected_score("solver", max_jumps=max_jumps, **options)
+        mean, margin = monte_carlo(max_jumps, **options)
+        assert margin > 0
+        assert abs(result.score - mean) <= margin, (options, result.score, mean, margin)
+
+
+def test_survival_curve():
+    result = expected_score("solver", max_jumps=30, step=1, max_power=10)
+    survival = result.survival
+    assert survival.shape == (31,)
+    assert survival[0] == 1.0
+    assert np.all(np.diff(survival) <= 1e-12)
+    assert np.isclose(result.score, 10 * survival[1:].sum())
+    assert np.isclose(result.expected_jumps, survival[:-1].sum())
+    assert np.all((result.state_success >= 0) & (result.state_success <= 1 + 1e-12))
+
+
+def test_scalar_policy_matches_vector_policy():
+    options = {"step": 1, "max_power": 10}
+    simulator = GameSimulator(policy="solver", policy_options=options)
+    grid = {"spacing": 20, "height_bins": 2, "max_jumps": 5}
+    scalar = expected_score(scalar_policy(simulator.recommend), **grid)
+    vector = expected_score("solver", **options, **grid)
+    assert scalar.survival[1] > 0
+    assert np.array_equal(scalar.survival, vector.survival)
+    assert np.array_equal(scalar.state_success, vector.state_success)
+
+
+def main():
+    print("🧪 期望得分计算测试")
+    print("=" * 40)
+    test_matches_monte_carlo()
+    print("✅ 期望得分在蒙特卡洛模拟的置信区间内")
+    test_survival_curve()
+    print("✅ 生存曲线单调且与期望得分一致")
+    test_scalar_policy_matches_vector_policy()
+    print("✅ 逐个调用的推荐函数与向量化策略结果相同")
+    print("🎉 期望得分计算测试通过")
+
+
+if __name__ == "__main__":
+    main()
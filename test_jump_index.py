@@ -0,0 +1,134 @@
+"""
+最近邻推荐索引测试
+用向量化引擎生成一份详细日志，检查索引只收录成功的跳跃、按相对几何量命中、
+按物理参数隔离、保存后可以原样读回、多线程同时加入和保存，以及 JumpAIAgent 在索引命中时不再请求模型。
+"""
+
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_agent import JumpAIAgent
+from fake_gemini import FakeGeminiModel
+from jump_index import JumpIndex
+from jump_log import json_default
+from jump_physics import DEFAULT_CONFIG
+from vector_engine import VectorGameEngine
+
+PHYSICS = DEFAULT_CONFIG.physics_params
+
+
+def write_log(directory, games=50, seed=3):
+    results = (
+        VectorGameEngine(policy="solver", step=1, max_power=10)
+        .run(games, seed=seed, record_jumps=True)
+        .to_results()
+    )
+    path = os.path.join(directory, "ai_detailed_log_test.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"config": DEFAULT_CONFIG.to_dict(), "results": results}, f, default=json_default
+        )
+    with open(path, "r", encoding="utf-8") as f:
+        return path, [jump for game in json.load(f)["results"] for jump in game["jumps"]]
+
+
+def test_index_keeps_successful_jumps():
+    with tempfile.TemporaryDirectory() as directory:
+        path, jumps = write_log(directory)
+        index = JumpIndex()
+        successes = [jump for jump in jumps if jump["success"]]
+        assert index.add_log(path) == len(successes) == index.size
+        assert len(successes) < len(jumps)
+
+        jump = successes[-1]
+        (px, py), (left, top, right) = jump["player_pos"], jump["target_platform"]
+        power = jump["recommended_power"]
+        assert index.lookup((px, py), (left, top, right), PHYSICS) == power
+        # 整体平移不影响相对几何量
+        assert index.lookup((px + 1000, py), (left + 1000, top, right + 1000), PHYSICS) == power
+        # 其他物理参数、或距离所有记录都很远的场景不命中
+        assert index.lookup((px, py), (left, top, right), (1.5, -2.5, 0.4)) is None
+        assert index.lookup((px, py), (left + 500, top, right + 500), PHYSICS) is None
+        assert index.stats()["hits"] == 2 and index.stats()["misses"] == 2
+
+        saved = os.path.join(directory, "index.json")
+        index.save(saved)
+        loaded = JumpIndex.load(saved)
+        assert loaded.size == index.size
+        for jump in jumps[:200]:
+            scenario = (jump["player_pos"], jump["target_platform"], PHYSICS)
+            assert loaded.nearest(*scenario) == index.nearest(*scenario)
+
+
+def test_agent_answers_from_index():
+    with tempfile.TemporaryDirectory() as directory:
+        _, jumps = write_log(directory, games=20)
+        scenarios = [(jump["player_pos"], jump["target_platform"]) for jump in jumps]
+        model = FakeGeminiModel(latency_ms=0, seed=1)
+        calls = []
+        generate = model.generate_content
+        model.generate_content = lambda *a, **k: calls.append(1) or generate(*a, **k)
+        agent = JumpAIAgent(fake_model=model, index=JumpIndex())
+
+        sources = [agent.recommend(pos, target, PHYSICS)[1] for pos, target in scenarios]
+        first_calls = len(calls)
+        assert first_calls == sources.count("ai")
+        assert sources.count("ai") + sources.count("index") == len(scenarios)
+        assert agent.index.size == agent.index_added > 0
+
+        # 第二遍：模型答对过的场景都由索引回答
+        calls.clear()
+        sources = [agent.recommend(pos, target, PHYSICS)[1] for pos, target in scenarios]
+        assert sources.count("index") >= agent.index_added
+        assert len(calls) == sources.count("ai") < first_calls
+
+
+def test_concurrent_add_lookup_save():
+    """服务端多线程同时加入、查询和保存：不丢失跳跃，保存的文件总是完整的"""
+    index = JumpIndex()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "jump_index.json")
+
+        def writer(worker):
+            for i in range(500):
+                # 每次都落在新的桶里，保存时字典不断变大
+                index.add((100, 300), (200 + worker * 1000 + i * 3, 300, 300), PHYSICS, 2.5)
+
+        def reader(_):
+            for i in range(500):
+                index.lookup((100, 300), (200 + i * 3, 300, 300), PHYSICS)
+                index.stats()
+
+        def saver(_):
+            for _ in range(50):
+                index.save(path)
+
+        with ThreadPoolExecutor(6) as pool:
+            futures = [pool.submit(writer, w) for w in range(3)]
+            futures += [pool.submit(reader, 0), pool.submit(saver, 0), pool.submit(saver, 1)]
+            for future in futures:
+                future.result()
+
+        index.save(path)
+        loaded = JumpIndex.load(path)
+    stats = index.stats()
+    assert index.size == loaded.size == 3 * 500
+    assert stats["hits"] + stats["misses"] == 500
+
+
+def main():
+    print("🧪 最近邻推荐索引测试")
+    print("=" * 40)
+    test_index_keeps_successful_jumps()
+    print("✅ 索引只收录成功的跳跃，按相对几何量和物理参数查询")
+    test_agent_answers_from_index()
+    print("✅ 索引命中时不再请求模型")
+    test_concurrent_add_lookup_save()
+    print("✅ 多线程同时加入、查询和保存")
+    print("🎉 最近邻推荐索引测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+物理内核差分测试
+在随机场景上比对参考实现 jump_physics 与 JIT 后端（physics_jit）、向量化内核（vector_engine），
+要求成功标志、落点、步数和求解出的力度完全相同。
+没有安装 numba 时 physics_jit 退回参考实现，JIT 相关的比对仍会运行但不再有区分度。
+"""
+
+import os
+import random
+import tempfile
+
+import numpy as np
+
+import jump_physics
+import physics_jit
+from jump_physics import (
+    DEFAULT_CONFIG,
+    DEFAULT_HEURISTIC,
+    HeuristicCoefficients,
+    config_for,
+    heuristic_for,
+    heuristic_power,
+    load_heuristic_profile,
+    save_heuristic_profile,
+)
+from vector_engine import make_solver_policy, physics_policy, simulate_jumps
+
+SCENARIOS = 3000
+SEED = 20240601
+
+# 除默认参数外再覆盖几组不同的物理参数
+CONFIGS = [
+    DEFAULT_CONFIG,
+    config_for((1.5, -2.5, 0.4)),
+    config_for((2.5, -3.5, 0.8)),
+]
+
+
+def random_scenarios(count, seed=SEED):
+    """随机的 (力度, 玩家位置, 目标平台) 场景，力度集中在容易落到平台附近的小力度"""
+    rng = random.Random(seed)
+    scenarios = []
+    for _ in range(count):
+        px = rng.uniform(50, 500)
+        py = rng.uniform(250, 360)
+        left = px + rng.uniform(-50, 300)
+        top = rng.uniform(250, 380)
+        target = (left, top, left + 100)
+        if rng.random() < 0.8:
+            power = rng.uniform(0, 6)
+        else:
+            power = rng.choice([0, 1, 50, 99, 100, rng.uniform(0, 100)])
+        scenarios.append((power, (px, py), target))
+    return scenarios
+
+
+def test_jit_simulate_jump_matches_reference():
+    for config in CONFIGS:
+        for power, player_pos, target in random_scenarios(SCENARIOS):
+            expected = jump_physics.simulate_jump(power, player_pos, target, config)
+            actual = physics_jit.simulate_jump(power, player_pos, target, config)
+            assert actual == expected, (power, player_pos, target, expected, actual)
+
+
+def test_jit_solve_power_matches_reference():
+    for config in CONFIGS:
+        for _, player_pos, target in random_scenarios(300):
+            for step, max_power in ((1, 100), (0.1, 10)):
+                expected = jump_physics.solve_power(
+                    player_pos, target, config, step, max_power
+                )
+                actual = physics_jit.solve_power(
+                    player_pos, target, config, step, max_power
+                )
+                assert actual == expected, (player_pos, target, step, expected, actual)
+                assert type(actual) is type(expected)
+
+
+def test_vector_simulate_jumps_matches_reference():
+    for config in CONFIGS:
+        scenarios = random_scenarios(SCENARIOS)
+        columns = np.array(
+            [(p, pos[0], pos[1], t[0], t[1], t[2]) for p, pos, t in scenarios]
+        ).T
+        success, final_x, final_y, steps = simulate_jumps(*columns, config)
+        for i, (power, player_pos, target) in enumerate(scenarios):
+            expected = jump_physics.simulate_jump(power, player_pos, target, config)
+            actual = (bool(success[i]), (final_x[i], final_y[i]), int(steps[i]))
+            assert actual == expected, (power, player_pos, target, expected, actual)
+
+
+def test_vector_solver_matches_reference():
+    """向量化求解器（NumPy广播路径和JIT路径）与逐个求解一致；无解时两者都退回物理计算推荐"""
+    scenarios = random_scenarios(300)
+    rows = [(pos[0], pos[1], t[0], t[1], t[2]) for _, pos, t in scenarios]
+    columns = [np.array(values, dtype=np.float64) for values in zip(*rows)]
+    for jit in (False, True):
+        policy = make_solver_policy(step=0.1, max_power=10, jit=jit)
+        powers = policy(*columns)
+        for i, (_, player_pos, target) in enumerate(scenarios):
+            expected = jump_physics.solve_power(player_pos, target, step=0.1, max_power=10)
+            if expected is not None:
+                assert powers[i] == expected, (jit, player_pos, target, expected, powers[i])
+
+
+def test_vector_heuristic_matches_reference():
+    scenarios = random_scenarios(SCENARIOS)
+    rows = [(pos[0], pos[1], t[0], t[1], t[2]) for _, pos, t in scenarios]
+    columns = [np.array(values, dtype=np.float64) for values in zip(*rows)]
+    for coefficients in (DEFAULT_HEURISTIC, HeuristicCoefficients(62.9, 507, 92.8, 0.1)):
+        powers = physics_policy(*columns, coefficients=coefficients)
+        for i, (_, player_pos, target) in enumerate(scenarios):
+            expected = heuristic_power(player_pos, target, coefficients)
+            assert powers[i] == expected, (player_pos, target, expected, powers[i])
+
+
+def test_heuristic_power_rounded_to_step():
+    scenarios = random_scenarios(500)
+    for step in (0.1, 0.25, 0.05):
+        coefficients = HeuristicCoefficients(62.9, 507, 92.8, step)
+        digits = jump_physics.step_digits(step)
+        for _, player_pos, target in scenarios:
+            power = heuristic_power(player_pos, target, coefficients)
+            # 没有 2.7000000000000002 这样的浮点尾巴
+            assert power == round(power, digits) and len(repr(power)) <= digits + 4
+
+
+def test_heuristic_profile_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "profile.json")
+        assert load_heuristic_profile(path) == {}
+        fitted = HeuristicCoefficients(60.0, 500.0, 90.0, 0.1)
+        save_heuristic_profile(CONFIGS[1], HeuristicCoefficients(1, 2, 3, 1), path)
+        save_heuristic_profile(CONFIGS[1], fitted, path, success_rate=0.9)
+        save_heuristic_profile(CONFIGS[2], HeuristicCoefficients(4, 5, 6, 1), path)
+        profile = load_heuristic_profile(path)
+        assert len(profile) == 2
+        # 同一组物理参数的条目被替换；配置中没有的物理参数使用默认系数
+        assert heuristic_for(config_for([1.5, -2.5, 0.4]), profile) == fitted
+        assert heuristic_for(DEFAULT_CONFIG, profile) == DEFAULT_HEURISTIC
+
+
+def main():
+    backend = "numba" if physics_jit.available() else "纯Python（未安装numba或已禁用）"
+    print("🧪 物理内核差分测试")
+    print(f"   JIT后端: {backend}")
+    print("=" * 40)
+    test_jit_simulate_jump_matches_reference()
+    print("✅ physics_jit.simulate_jump 与参考实现一致")
+    test_jit_solve_power_matches_reference()
+    print("✅ physics_jit.solve_power 与参考实现一致")
+    test_vector_simulate_jumps_matches_reference()
+    print("✅ vector_engine.simulate_jumps 与参考实现一致")
+    test_vector_solver_matches_reference()
+    print("✅ 向量化求解器与参考实现一致")
+    test_vector_heuristic_matches_reference()
+    print("✅ 向量化物理计算推荐与参考实现一致")
+    test_heuristic_power_rounded_to_step()
+    print("✅ 物理计算推荐的力度按间隔的小数位数取整")
+    test_heuristic_profile_round_trip()
+    print("✅ 启发式系数配置可以按物理参数写入和读取")
+    print("🎉 物理内核差分测试通过")
+
+
+if __name__ == "__main__":
+    main()
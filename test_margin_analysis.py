@@ -0,0 +1,118 @@
+"""
+落点余量分析测试
+检查一次向量化模拟求出的获胜力度与逐个力度的参考模拟一致、有间断的获胜力度只取所选力度所在的一段、
+余量写入跳跃记录后格式正确，
+以及 ResultAnalyzer 能从详细日志中统计余量。
+"""
+
+import json
+import math
+import os
+import tempfile
+
+import batch_ai_test
+from analyze_results import ResultAnalyzer
+from jump_log import json_default
+from jump_physics import DEFAULT_CONFIG, simulate_jump
+from vector_engine import landing_margin, power_grid, winning_powers, winning_runs
+
+SCENARIOS = [
+    ((100, 300), (260, 300, 300)),
+    ((100, 300), (162.4, 359.4, 262.4)),
+    ((214, 344.4), (308.9, 343.0, 408.9)),
+]
+# 获胜力度分成三段：3.59-3.65、3.68-3.74、3.77-3.82
+GAPPED = ((100, 300), (430.174, 327.559, 472.861))
+
+
+def test_winning_powers_match_reference():
+    for step in (1, 0.05):
+        for player_pos, platform in SCENARIOS:
+            expected = [
+                power
+                for power in power_grid(step, 10)
+                if simulate_jump(power, player_pos, platform)[0]
+            ]
+            assert list(winning_powers(player_pos, platform, DEFAULT_CONFIG, step, 10)) == expected
+
+
+def test_landing_margin():
+    player_pos, platform = SCENARIOS[0]
+    # 整数力度都落不到这个平台上
+    low, high, width, error, gaps = landing_margin(3, player_pos, platform, DEFAULT_CONFIG, 1, 10)
+    assert math.isnan(low) and math.isnan(high) and width == gaps == 0
+    assert error == 316 - 280
+
+    low, high, width, error, gaps = landing_margin(
+        2.74, player_pos, platform, DEFAULT_CONFIG, 0.01, 10
+    )
+    assert low < 2.74 < high and gaps == 0
+    assert math.isclose(high - low, width)
+    assert abs(error) < 5
+
+
+def test_gapped_winners_use_own_run():
+    runs = winning_runs(*GAPPED, DEFAULT_CONFIG, 0.01, 10)
+    assert len(runs) == 3
+    flat = [p for first, last in runs for p in power_grid(0.01, 10) if first <= p <= last]
+    assert flat == list(winning_powers(*GAPPED, DEFAULT_CONFIG, 0.01, 10))
+
+    # 所选力度在第二段中：区间只包含这一段
+    low, high, width, _, gaps = landing_margin(3.71, *GAPPED, DEFAULT_CONFIG, 0.01, 10)
+    assert gaps == 2
+    assert math.isclose(low, runs[1][0] - 0.005) and math.isclose(high, runs[1][1] + 0.005)
+    assert math.isclose(width, 0.07)
+    # 落在两段之间的空隙里：取最近的一段，位置在区间外
+    low, high, _, _, _ = landing_margin(3.665, *GAPPED, DEFAULT_CONFIG, 0.01, 10)
+    assert math.isclose(high, runs[0][1] + 0.005)
+    low, high, _, _, _ = landing_margin(3.758, *GAPPED, DEFAULT_CONFIG, 0.01, 10)
+    assert math.isclose(low, runs[2][0] - 0.005)
+
+
+def test_simulator_logs_margins():
+    use_ai_mode, margin_analysis = batch_ai_test.USE_AI_MODE, batch_ai_test.MARGIN_ANALYSIS
+    batch_ai_test.USE_AI_MODE, batch_ai_test.MARGIN_ANALYSIS = False, True
+    try:
+        simulator = batch_ai_test.GameSimulator(seed=1, policy="solver")
+        results = [simulator.play_single_game(game_id, max_jumps=20) for game_id in (1, 2)]
+    finally:
+        batch_ai_test.USE_AI_MODE, batch_ai_test.MARGIN_ANALYSIS = use_ai_mode, margin_analysis
+
+    jumps = [jump for result in results for jump in result["jumps"]]
+    for jump in jumps:
+        margin = jump["margin"]
+        if jump["success"]:
+            # 成功的跳跃一定在获胜区间内
+            assert 0 <= margin["position"] <= 1 and margin["edge_margin"] >= 0
+            assert margin["window_width"] > 0
+        assert margin["window_gaps"] >= 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ai_detailed_log_test.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, default=json_default)
+        analyzer = ResultAnalyzer(path)
+        assert analyzer.load_data()
+        stats = analyzer.margin_stats()
+    assert stats["jumps"] == len(jumps)
+    assert stats["inside_window_rate"] >= sum(j["success"] for j in jumps) / len(jumps)
+    assert stats["mean_window_width"] > 0
+    assert 0 <= stats["gapped_window_rate"] <= 1
+
+
+def main():
+    print("📐 落点余量分析测试")
+    print("=" * 50)
+    test_winning_powers_match_reference()
+    print("✅ 向量化求出的获胜力度与参考模拟一致")
+    test_landing_margin()
+    print("✅ 获胜区间、区间宽度与落点偏差")
+    test_gapped_winners_use_own_run()
+    print("✅ 获胜力度有间断时只取所选力度所在（或最近）的一段")
+    test_simulator_logs_margins()
+    print("✅ 跳跃记录中的余量与 ResultAnalyzer 统计")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+"""
+落点回报与在线力度修正测试
+检查回报的落点与模拟器一致、同一区域反复落空的推荐在回报后自行修正且不增加模型调用、
+修正只作用于同一区域和同一来源，以及 /api/report_outcome 的参数校验。
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import ai_agent as service
+from ai_agent import JumpAIAgent
+from fake_gemini import FakeGeminiModel
+from jump_physics import DEFAULT_CONFIG, landing_x, simulate_jump
+
+PHYSICS = DEFAULT_CONFIG.physics_params
+PLAYER = (100, 300)
+# 整数力度 2 和 3 都落不到这个平台上（求解器给出 2.74）
+PLATFORM = (260, 300, 300)
+
+
+def biased_agent(answer=3):
+    """模型总是回答同一个整数力度的 agent，返回 (agent, 调用计数)"""
+    model = FakeGeminiModel(latency_ms=0, seed=1)
+    model.answer_power = lambda scenario: answer
+    calls = []
+    generate = model.generate_content
+    model.generate_content = lambda *a, **k: calls.append(1) or generate(*a, **k)
+    return JumpAIAgent(fake_model=model), calls
+
+
+def play(agent, player_pos=PLAYER, platform=PLATFORM):
+    """按推荐跳一次并回报落点，返回 (力度, 是否成功)"""
+    power, _, recommendation_id = agent.recommend_with_id(player_pos, platform, PHYSICS)
+    success, _, _ = simulate_jump(power, player_pos, platform)
+    agent.report_outcome(
+        recommendation_id, landing_x(power, player_pos, platform), success
+    )
+    return power, success
+
+
+def test_landing_x_matches_simulator():
+    for power in (1.5, 2.0, 2.74, 2.9, 3.0, 5.0):
+        for platform in (PLATFORM, (280, 300, 320), (230, 320, 270)):
+            success, final_pos, _ = simulate_jump(power, PLAYER, platform)
+            if success:
+                assert landing_x(power, PLAYER, platform) == final_pos[0]
+
+
+def test_repeated_misses_correct_themselves():
+    agent, calls = biased_agent()
+    results = [play(agent) for _ in range(10)]
+    assert results[0] == (3, False)
+    assert all(success for _, success in results[1:])
+    # 修正不请求模型：每次推荐恰好一次调用
+    assert len(calls) == len(results)
+    assert agent.corrections.stats()["updates"] == len(results)
+    assert not agent.pending
+
+    # 平移后的同一几何量沿用修正；远处的区域和其他来源不受影响
+    shifted = (PLAYER[0] + 500, PLAYER[1])
+    shifted_platform = (PLATFORM[0] + 500, PLATFORM[1], PLATFORM[2] + 500)
+    assert agent.recommend(shifted, shifted_platform, PHYSICS)[0] == results[-1][0]
+    # 带ID与不带ID的推荐经过同样的修正
+    power, source, _ = agent.recommend_with_id(shifted, shifted_platform, PHYSICS)
+    assert (power, source) == agent.recommend(shifted, shifted_platform, PHYSICS)
+    assert agent.recommend(PLAYER, (560, 300, 600), PHYSICS)[0] == 3
+    assert agent.corrections.factor(PLAYER, PLATFORM, PHYSICS, "physics") == 1.0
+
+
+def test_report_uses_power_actually_jumped():
+    agent, _ = biased_agent()
+    _, _, recommendation_id = agent.recommend_with_id(PLAYER, PLATFORM, PHYSICS)
+    # 浏览器手动改成了 2（落点偏左）：修正倍数相对模型的 3 计算，修正后的力度介于 2 和 3 之间
+    factor = agent.report_outcome(recommendation_id, landing_x(2, PLAYER, PLATFORM), False, 2)
+    assert 2 / 3 < factor < 1.0
+    assert 2.6 < agent.recommend(PLAYER, PLATFORM, PHYSICS)[0] < 2.9
+
+
+def test_concurrent_reports():
+    """多线程同时推荐、回报和淘汰：不丢失更新，待回报表也不会出错"""
+    agent, _ = biased_agent()
+    agent.physics_only = True
+    agent.fallback_recommendation = lambda *args: 3
+    original_limit, service.PENDING_LIMIT = service.PENDING_LIMIT, 20
+    evicted = []
+
+    def worker(report):
+        for _ in range(200):
+            _, _, recommendation_id = agent.recommend_with_id(PLAYER, PLATFORM, PHYSICS)
+            if report:
+                try:
+                    agent.report_outcome(recommendation_id, 316, False, 3)
+                except KeyError:
+                    evicted.append(recommendation_id)  # 回报前已被淘汰
+
+    try:
+        # 一半线程只推荐不回报，不断挤满待回报表触发淘汰
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(worker, [True, False] * 4))
+    finally:
+        service.PENDING_LIMIT = original_limit
+    stats = agent.corrections.stats()
+    assert stats["updates"] + stats["ignored"] + len(evicted) == 4 * 200
+    assert stats["bins"] == 1
+    assert agent.pending_count() <= 20
+
+
+def test_report_outcome_endpoint():
+    agent, _ = biased_agent()
+    original, service.ai_agent = service.ai_agent, agent
+    try:
+        client = service.app.test_client()
+        response = client.post(
+            "/api/get_recommendation",
+            json={
+                "player_pos": list(PLAYER),
+                "target_platform": list(PLATFORM),
+                "physics_params": list(PHYSICS),
+            },
+        )
+        data = response.get_json()
+        assert data["recommended_power"] == 3 and data["recommendation_id"]
+
+        report = {"recommendation_id": data["recommendation_id"], "landing_x": 316, "success": False}
+        assert client.post("/api/report_outcome", json={"landing_x": 316}).status_code == 400
+        response = client.post("/api/report_outcome", json=report)
+        assert response.status_code == 200 and response.get_json()["correction"] < 1.0
+        # 同一个推荐ID只能回报一次
+        assert client.post("/api/report_outcome", json=report).status_code == 404
+
+        stats = client.get("/api/correction_stats").get_json()
+        assert stats["bins"] == 1 and stats["updates"] == 1 and stats["pending"] == 0
+    finally:
+        service.ai_agent = original
+
+
+def main():
+    print("🎯 落点回报与在线力度修正测试")
+    print("=" * 50)
+    test_landing_x_matches_simulator()
+    print("✅ 回报的落点与模拟器的着陆位置一致")
+    test_repeated_misses_correct_themselves()
+    print("✅ 同一区域反复落空的推荐在回报后自行修正，不增加模型调用")
+    test_report_uses_power_actually_jumped()
+    print("✅ 按实际使用的力度修正")
+    test_concurrent_reports()
+    print("✅ 多线程推荐和回报")
+    test_report_outcome_endpoint()
+    print("✅ /api/report_outcome 参数校验与修正统计")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+"""
+Prompt模板测试
+检查预编译模板填入物理参数和坐标后的内容、按参数缓存、PromptStats 的调用统计和延迟直方图，
+以及 compare_variants 按求解器的小数力度计算力度偏差。
+"""
+
+import math
+
+import pytest
+
+from ai_agent import JumpAIAgent
+from fake_gemini import FakeGeminiModel
+from jump_physics import DEFAULT_CONFIG
+from prompt_templates import (
+    LATENCY_BUCKETS_MS,
+    PROMPT_VARIANTS,
+    PromptStats,
+    _compile,
+    compare_variants,
+    compile_prompt,
+)
+
+PHYSICS = DEFAULT_CONFIG.physics_params
+PLAYER = (100, 300)
+# 整数力度 2 和 3 都落不到这个平台上（求解器给出 2.8）
+PLATFORM = (260, 300, 300)
+
+
+def test_compile_prompt_renders():
+    for variant in PROMPT_VARIANTS:
+        template = compile_prompt(variant, PHYSICS)
+        assert template.variant == variant and template.static_tokens > 0
+        # 物理参数在编译时填入，坐标在渲染时填入
+        assert str(PHYSICS[0]) in template.text and "$" not in template.text
+        prompt = template.render(PLAYER, PLATFORM)
+        assert "{" not in prompt and "}" not in prompt
+        assert "260" in prompt and "300" in prompt
+
+        candidates = compile_prompt(variant, PHYSICS, candidates=3).render(PLAYER, PLATFORM)
+        assert "3" in candidates and '{"candidates": [' in candidates
+
+    detailed = compile_prompt("detailed", PHYSICS).render(PLAYER, PLATFORM)
+    assert "水平距离：180.0像素" in detailed and "直线距离：180.0像素" in detailed
+    with pytest.raises(ValueError, match="未知的prompt变体"):
+        compile_prompt("nonexistent", PHYSICS)
+
+
+def test_compile_prompt_is_cached():
+    _compile.cache_clear()
+    template = compile_prompt("compact", list(PHYSICS))
+    # 列表和元组形式的物理参数命中同一个缓存项
+    assert compile_prompt("compact", tuple(PHYSICS)) is template
+    assert _compile.cache_info().hits == 1
+    assert compile_prompt("compact", PHYSICS, candidates=3) is not template
+    assert compile_prompt("compact", (2.5, -3.0, 0.5)) is not template
+    assert "2.5" in compile_prompt("compact", (2.5, -3.0, 0.5)).text
+
+
+def test_prompt_stats():
+    stats = PromptStats()
+    assert stats.snapshot() == {}
+    for latency_ms in (10, 50, 51, 300, 20000):
+        stats.record("compact", 100, latency_ms / 1000)
+    stats.record("compact", 200, 0.3, ok=False)
+    stats.record("minimal", 40, 0.05)
+
+    summary = stats.snapshot()
+    compact = summary["compact"]
+    assert compact["calls"] == 6 and compact["errors"] == 1
+    assert math.isclose(compact["avg_prompt_tokens"], 700 / 6)
+    assert math.isclose(compact["avg_latency_ms"], (10 + 50 + 51 + 300 + 20000 + 300) / 6)
+    histogram = compact["latency_histogram"]
+    assert list(histogram) == [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [">10000ms"]
+    # 桶的边界值算在该桶内
+    assert histogram["<=50ms"] == 2 and histogram["<=100ms"] == 1
+    assert histogram["<=500ms"] == 2 and histogram[">10000ms"] == 1
+    assert sum(histogram.values()) == compact["calls"]
+    assert summary["minimal"]["latency_histogram"]["<=50ms"] == 1
+
+
+def test_compare_variants_uses_fractional_solver():
+    agent = JumpAIAgent(fake_model=FakeGeminiModel(latency_ms=0, seed=1))
+    scenarios = [(PLAYER, PLATFORM, PHYSICS), ((100, 300), (240, 300, 340), PHYSICS)]
+    report = compare_variants(agent, scenarios, ["compact", "minimal"])
+    for variant in ("compact", "minimal"):
+        # 替身模型按求解器的小数力度作答：全部着陆，与求解器没有偏差
+        assert report[variant]["answered"] == 2
+        assert report[variant]["accuracy"] == 1
+        assert report[variant]["mean_power_error"] < 1e-9
+    assert report["minimal"]["avg_prompt_tokens"] < report["compact"]["avg_prompt_tokens"]
+
+
+def main():
+    print("📝 Prompt模板测试")
+    print("=" * 50)
+    test_compile_prompt_renders()
+    print("✅ 模板填入物理参数和坐标")
+    test_compile_prompt_is_cached()
+    print("✅ 模板按物理参数缓存")
+    test_prompt_stats()
+    print("✅ 调用统计和延迟直方图")
+    test_compare_variants_uses_fractional_solver()
+    print("✅ 力度偏差按求解器的小数力度计算")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""
+离线回放测试
+原样回放记录的力度应复现日志中的结果；多进程回放与单进程结果相同；
+注册表中的策略与 GameSimulator 的同名策略给出相同的力度。
+"""
+
+import json
+import os
+import tempfile
+
+import batch_ai_test
+import strategies
+from jump_log import json_default
+from jump_physics import DEFAULT_CONFIG
+from replay import RECORDED, corpus_scenarios, load_log_scenarios, replay, summarize
+from scenarios import ScenarioCorpus
+from vector_engine import VectorGameEngine
+
+
+def recorded_scenarios(games=60, seed=9):
+    results = (
+        VectorGameEngine(policy="solver", step=1, max_power=10)
+        .run(games, seed=seed, record_jumps=True)
+        .to_results()
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ai_detailed_log_test.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"config": DEFAULT_CONFIG.to_dict(), "results": results},
+                f,
+                default=json_default,
+            )
+        return load_log_scenarios(path)
+
+
+def test_recorded_replay_reproduces_log():
+    scenarios = recorded_scenarios()
+    outcome = replay(RECORDED, scenarios, workers=1)
+    assert outcome[1] == [s.success for s in scenarios]
+    summary = summarize(scenarios, *outcome)
+    assert summary["fixed"] == summary["broken"] == 0
+    assert summary["same_power"] == 1.0
+
+
+def test_parallel_matches_serial():
+    scenarios = corpus_scenarios(ScenarioCorpus.generate(4, 20, 30))
+    options = {"step": 0.5, "max_power": 10}
+    serial = replay("solver", scenarios, options, workers=1)
+    parallel = replay("solver", scenarios, options, workers=3)
+    assert serial[:3] == parallel[:3]
+
+
+def test_registry_matches_game_simulator():
+    batch_ai_test.USE_AI_MODE = False
+    scenarios = recorded_scenarios(games=10)
+    for name, policy in (("heuristic", "default"), ("solver", "solver")):
+        simulator = batch_ai_test.GameSimulator(policy=policy)
+        recommend = strategies.make_strategy(
+            name,
+            **(
+                {"step": batch_ai_test.SOLVER_STEP, "max_power": batch_ai_test.SOLVER_MAX_POWER}
+                if name == "solver"
+                else {}
+            ),
+        )
+        for s in scenarios:
+            expected = simulator.recommend(s.player_pos, s.target_platform)
+            assert recommend(s.player_pos, s.target_platform) == expected
+
+
+def main():
+    print("🧪 离线回放测试")
+    print("=" * 40)
+    test_recorded_replay_reproduces_log()
+    print("✅ 原样回放记录的力度复现日志结果")
+    test_parallel_matches_serial()
+    print("✅ 多进程回放与单进程结果相同")
+    test_registry_matches_game_simulator()
+    print("✅ 注册表策略与 GameSimulator 一致")
+    print("🎉 离线回放测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+可复现场景测试
+同一种子（和游戏编号）总是生成相同的平台序列和相同的游戏，不同种子不同；
+按块生成、逐个读取和语料用完后继续生成的序列一致；场景语料保存再读取后游戏不变。
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import batch_ai_test
+from jump_log import json_default
+from scenarios import PlatformStream, ScenarioCorpus, generate_platforms, platform_block
+
+SEED = 5
+MAX_JUMPS = 20
+
+
+def stream_platforms(stream, count):
+    return np.array([stream.next_platform() for _ in range(count)]).T
+
+
+def test_same_seed_same_platforms():
+    distances, heights = generate_platforms(SEED, 1, 4, 30)
+    again = generate_platforms(SEED, 1, 4, 30)
+    assert np.array_equal(distances, again[0]) and np.array_equal(heights, again[1])
+    other = generate_platforms(SEED + 1, 1, 4, 30)
+    assert not np.array_equal(distances, other[0])
+    # 每场游戏的序列只由 (种子, 游戏编号) 决定，与同批生成的其他游戏无关
+    assert np.array_equal(distances[2], generate_platforms(SEED, 3, 1, 30)[0][0])
+    assert not np.array_equal(distances[0], distances[1])
+
+
+def test_block_and_stream_agree():
+    distances, heights = generate_platforms(SEED, 1, 3, 200)
+    # 从任意位置开始的块（包括不与计数器块对齐的位置）
+    for start in (0, 1, 2, 7, 64, 129):
+        block = platform_block(SEED, range(1, 4), start, 50)
+        assert np.allclose(block[0], distances[:, start : start + 50])
+        assert np.allclose(block[1], heights[:, start : start + 50])
+    # 逐个读取，超过一个生成块
+    for row, game_id in enumerate(range(1, 4)):
+        streamed = stream_platforms(PlatformStream(SEED, game_id), 200)
+        assert np.allclose(streamed, [distances[row], heights[row]])
+
+
+def test_corpus_round_trip():
+    corpus = ScenarioCorpus.generate(SEED, 4, 10, first_game_id=1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scenario_corpus.npz")
+        corpus.save(path)
+        loaded = ScenarioCorpus.load(path)
+    assert (loaded.seed, loaded.first_game_id, len(loaded)) == (SEED, 1, 4)
+    assert np.array_equal(loaded.distances, corpus.distances)
+    assert np.array_equal(loaded.heights, corpus.heights)
+
+    # 语料用完后从同一位置继续生成；语料范围外的游戏直接由生成器产生
+    for game_id in (2, 4, 9):
+        streamed = stream_platforms(loaded.stream(game_id), 150)
+        assert np.allclose(streamed, stream_platforms(PlatformStream(SEED, game_id), 150))
+    part = loaded.slice(2, 4)
+    assert list(part.game_ids) == [2, 3]
+    assert np.array_equal(part.distances, corpus.distances[1:3])
+
+
+def play_games(game_ids, **options):
+    """物理计算模式下用 solver 策略进行若干场游戏，返回可比较的 JSON 文本"""
+    use_ai_mode, batch_ai_test.USE_AI_MODE = batch_ai_test.USE_AI_MODE, False
+    try:
+        simulator = batch_ai_test.GameSimulator(policy="solver", **options)
+        results = [
+            simulator.play_single_game(game_id, max_jumps=MAX_JUMPS) for game_id in game_ids
+        ]
+    finally:
+        batch_ai_test.USE_AI_MODE = use_ai_mode
+    return [json.dumps(result, default=json_default) for result in results]
+
+
+def test_same_seed_same_games():
+    games = play_games((1, 2, 3), seed=SEED)
+    assert games == play_games((1, 2, 3), seed=SEED)
+    assert games != play_games((1, 2, 3), seed=SEED + 1)
+    # 游戏编号决定序列：单独进行第 3 场与批量中的第 3 场相同
+    assert play_games((3,), seed=SEED) == games[2:]
+
+    # 保存再读取的语料（平台数少于跳跃上限，需要继续生成）进行的游戏与种子相同
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scenario_corpus.npz")
+        ScenarioCorpus.generate(SEED, 3, MAX_JUMPS // 2, first_game_id=1).save(path)
+        corpus = ScenarioCorpus.load(path)
+    assert play_games((1, 2, 3), corpus=corpus) == games
+
+
+def main():
+    print("🎲 可复现场景测试")
+    print("=" * 50)
+    test_same_seed_same_platforms()
+    print("✅ 同一种子生成相同的平台序列，不同种子不同")
+    test_block_and_stream_agree()
+    print("✅ 按块生成与逐个读取的序列一致")
+    test_corpus_round_trip()
+    print("✅ 场景语料保存再读取后不变，用完后继续生成的序列一致")
+    test_same_seed_same_games()
+    print("✅ 同一种子和保存的语料进行的游戏完全相同")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""
+启动速度测试
+检查各模块的导入耗时是否在预算之内，以及重依赖是否被延迟加载
+"""
+
+import os
+import subprocess
+import sys
+
+# 导入耗时预算（毫秒），可通过环境变量 IMPORT_BUDGET_MS 调整
+IMPORT_BUDGET_MS = int(os.environ.get("IMPORT_BUDGET_MS", "500"))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_import(module):
+    """在新的解释器中导入模块，返回 (耗时毫秒, 已加载的模块名集合)"""
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = (time.perf_counter() - start) * 1000\n"
+        "print(elapsed)\n"
+        "print(' '.join(sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    return float(output[-2]), set(output[-1].split())
+
+
+def test_ai_agent_import():
+    """ai_agent 导入时不应加载 Gemini SDK"""
+    elapsed, modules = measure_import("ai_agent")
+    print(f"ai_agent 导入耗时: {elapsed:.0f} ms")
+    assert "google.generativeai" not in modules
+    assert elapsed < IMPORT_BUDGET_MS
+
+
+def test_analyze_results_import():
+    """analyze_results 导入时不应加载 matplotlib"""
+    elapsed, modules = measure_import("analyze_results")
+    print(f"analyze_results 导入耗时: {elapsed:.0f} ms")
+    assert "matplotlib" not in modules
+    assert elapsed < IMPORT_BUDGET_MS
+
+
+def test_physics_only_server():
+    """纯物理模式下推荐请求不应触发 Gemini SDK 导入"""
+    code = (
+        "import sys\n"
+        "import ai_agent\n"
+        "ai_agent.ai_agent.physics_only = True\n"
+        "client = ai_agent.app.test_client()\n"
+        "client.post('/api/set_api_key', json={'api_key': 'x' * 39})\n"
+        "r = client.post('/api/get_recommendation', json={\n"
+        "    'player_pos': [100, 300],\n"
+        "    'target_platform': [250, 280, 350],\n"
+        "    'physics_params': [2.0, -3.0, 0.5]})\n"
+        "assert r.status_code == 200, r.status_code\n"
+        "assert not r.get_json()['using_ai']\n"
+        "assert 'google.generativeai' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=HERE, check=True)
+
+
+def main():
+    print("🧪 启动速度测试")
+    print(f"   导入预算: {IMPORT_BUDGET_MS} ms")
+    print("=" * 40)
+    test_ai_agent_import()
+    test_analyze_results_import()
+    test_physics_only_server()
+    print("🎉 启动速度测试通过")
+
+
+if __name__ == "__main__":
+    main()
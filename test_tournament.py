@@ -0,0 +1,70 @@
+"""
+策略注册表与锦标赛测试
+锦标赛中各策略使用相同的场景：替身模型按求解器的小数力度作答，llm 策略应与默认间隔的 solver 得分完全相同；
+solver 和 table 使用同样的求解器默认值；AI服务的备用推荐可以换成注册表中的策略。
+"""
+
+import math
+
+from ai_agent import JumpAIAgent
+from jump_physics import DEFAULT_CONFIG
+from strategies import make_strategy
+from tournament import run_tournament
+
+PHYSICS = DEFAULT_CONFIG.physics_params
+SOLVER_POWER = 2.8  # 力度间隔0.1时的求解结果（整数力度无解）
+
+
+def test_tournament_uses_identical_scenarios():
+    options = {"solver": {}, "llm": {"fake": True}, "table": {"step": 1}}
+    table = run_tournament(["solver", "llm", "table"], options, games=12, seed=5, max_jumps=30)
+    solver, llm = table["solver"], table["llm"]
+    assert solver["games"] == llm["games"] == 12
+    assert solver["average_score"] == llm["average_score"] > 0
+    assert solver["success_rate"] == llm["success_rate"]
+    assert solver["model_calls_per_game"] is None and solver["cost_per_game"] == 0
+    assert llm["model_calls_per_game"] > 0 and llm["cost_per_game"] > 0
+    assert table["table"]["success_rate"] > 0.5
+
+
+def test_solver_policies_share_defaults():
+    # 分格极细的 table 等价于逐跳求解：不指定选项时两者的力度间隔和最大力度相同，得分也相同
+    options = {"solver": {}, "table": {"resolution": 1e-6}}
+    table = run_tournament(["solver", "table"], options, games=6, seed=5, max_jumps=30)
+    assert table["table"]["average_score"] == table["solver"]["average_score"] > 0
+    assert table["table"]["success_rate"] == table["solver"]["success_rate"] > 0.9
+
+    scenario = ((100, 300), (260, 300, 300))  # 整数力度都落不到这个平台上
+    assert make_strategy("solver")(*scenario) == make_strategy("table", resolution=1e-6)(*scenario)
+    assert math.isclose(make_strategy("solver")(*scenario), SOLVER_POWER)
+
+
+def test_agent_fallback_policy():
+    agent = JumpAIAgent(physics_only=True, fallback_policy="solver")
+    solver = make_strategy("solver")
+    scenario = ((400, 305), (520, 320, 620))
+    power, source = agent.recommend(*scenario, PHYSICS)
+    assert source == "physics"
+    assert power == solver(*scenario)
+    try:
+        JumpAIAgent(fallback_policy="llm")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("请求模型的策略不能作为备用推荐")
+
+
+def main():
+    print("🧪 策略注册表与锦标赛测试")
+    print("=" * 40)
+    test_tournament_uses_identical_scenarios()
+    print("✅ 锦标赛中各策略使用相同的场景")
+    test_solver_policies_share_defaults()
+    print("✅ solver 和 table 使用同样的求解器默认值")
+    test_agent_fallback_policy()
+    print("✅ AI服务的备用推荐可以使用注册表中的策略")
+    print("🎉 策略注册表与锦标赛测试通过")
+
+
+if __name__ == "__main__":
+    main()
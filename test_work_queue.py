@@ -0,0 +1,167 @@
+"""
+分布式任务队列测试
+检查租约的互斥、过期后重新租用、续租/完成的归属，以及分片合并时的去重；
+工作进程遇到失败的游戏时把区间放回队列重试，不把缺少结果的区间标记为完成。
+"""
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import batch_ai_test
+from test_checkpoint import batch_run
+from work_queue import WorkQueue
+
+SETTINGS = {"total_games": 10, "seed": 7}
+
+
+def make_queue(directory, total_games=10, chunk_size=4):
+    return WorkQueue.create(
+        os.path.join(directory, "queue.sqlite"), total_games, chunk_size, SETTINGS
+    )
+
+
+def write_shard(queue, worker, game_ids, score=1):
+    os.makedirs(queue.shard_dir, exist_ok=True)
+    with open(os.path.join(queue.shard_dir, f"{worker}.jsonl"), "a", encoding="utf-8") as f:
+        for game_id in game_ids:
+            f.write(json.dumps({"game_id": game_id, "score": score}) + "\n")
+
+
+def test_tasks_are_leased_once():
+    with tempfile.TemporaryDirectory() as directory:
+        queue = make_queue(directory)
+        other = WorkQueue(queue.path)
+        assert queue.settings == SETTINGS
+        tasks = [queue.lease("a", 60), other.lease("b", 60), queue.lease("a", 60)]
+        assert [task[1:] for task in tasks] == [(1, 4), (5, 8), (9, 10)]
+        assert other.lease("b", 60) is None
+        assert queue.progress() == {"pending": 0, "leased": 10, "done": 0}
+        other.close()
+        queue.close()
+
+
+def test_expired_lease_is_taken_over():
+    with tempfile.TemporaryDirectory() as directory:
+        queue = make_queue(directory, total_games=4)
+        task_id, _, _ = queue.lease("dead", 0.05)
+        assert queue.lease("b", 60) is None
+        time.sleep(0.1)
+        assert queue.lease("b", 60)[0] == task_id
+        # 原来的工作进程既不能续租也不能提交
+        assert not queue.renew(task_id, "dead", 60)
+        assert not queue.complete(task_id, "dead")
+        assert queue.complete(task_id, "b")
+        assert queue.finished()
+        assert queue.workers() == {"b": 4}
+        queue.close()
+
+
+def test_release_returns_task_to_pending():
+    with tempfile.TemporaryDirectory() as directory:
+        queue = make_queue(directory, total_games=4)
+        task_id, _, _ = queue.lease("a", 60)
+        queue.release(task_id, "a")
+        assert queue.progress()["pending"] == 4
+        assert queue.lease("b", 60)[0] == task_id
+        queue.close()
+
+
+def test_merge_deduplicates_and_reports_missing():
+    with tempfile.TemporaryDirectory() as directory:
+        queue = make_queue(directory)
+        write_shard(queue, "a", [1, 2, 3, 4, 9], score=1)
+        write_shard(queue, "b", [3, 4, 5, 6, 7], score=2)
+        with open(os.path.join(queue.shard_dir, "b.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"game_id": 8, "sc')  # 崩溃时写了一半的行
+        results, missing = queue.load_results()
+        assert [r["game_id"] for r in results] == [1, 2, 3, 4, 5, 6, 7, 9]
+        assert [r["score"] for r in results[2:4]] == [1, 1]
+        assert missing == [8, 10]
+        queue.close()
+
+
+@contextmanager
+def failing_games(failures):
+    """failures 为 {游戏编号: 失败次数}，这些游戏前几次进行时抛出异常"""
+    play = batch_ai_test.GameSimulator.play_single_game
+    remaining = dict(failures)
+
+    def flaky(self, game_id, *args, **kwargs):
+        if remaining.get(game_id, 0) > 0:
+            remaining[game_id] -= 1
+            raise RuntimeError("模拟失败")
+        return play(self, game_id, *args, **kwargs)
+
+    batch_ai_test.GameSimulator.play_single_game = flaky
+    try:
+        yield
+    finally:
+        batch_ai_test.GameSimulator.play_single_game = play
+
+
+def worker_run(directory, failures):
+    """按测试配置创建队列并运行一个工作进程，返回 (队列, 工作进程的异常)"""
+    # 工作进程会用队列中的配置覆盖这些全局配置，batch_run 退出时恢复
+    overrides = {
+        name: getattr(batch_ai_test, name)
+        for name in ("POLICY_OPTIONS", "SOLVER_MAX_POWER", "MAX_JUMPS", "MARGIN_STEP",
+                     "PHYSICS_JIT", "REPORT_OUTCOMES")
+    }
+    with batch_run(directory, **{**overrides, "TOTAL_GAMES": 6, "MAX_JUMPS": 10}):
+        queue = WorkQueue.create(
+            os.path.join(directory, "queue.sqlite"), 6, 3, batch_ai_test._run_settings()
+        )
+        assert queue.settings["physics_jit"] is False
+        assert "report_outcomes" in queue.settings
+        error = None
+        with failing_games(failures):
+            try:
+                batch_ai_test.run_worker(queue.path, worker_id="w")
+            except RuntimeError as e:
+                error = e
+    return queue, error
+
+
+def test_failed_game_requeues_range():
+    with tempfile.TemporaryDirectory() as directory:
+        queue, error = worker_run(directory, {2: 1})
+        assert error is None
+        results, missing = queue.load_results()
+        assert missing == [] and [r["game_id"] for r in results] == [1, 2, 3, 4, 5, 6]
+        assert queue.finished()
+        assert queue.attempts(1) == 2 and queue.attempts(2) == 1
+        queue.close()
+
+
+def test_repeatedly_failing_range_is_not_completed():
+    with tempfile.TemporaryDirectory() as directory:
+        queue, error = worker_run(directory, {5: batch_ai_test.QUEUE_MAX_ATTEMPTS})
+        assert "4-6" in str(error)
+        assert queue.progress() == {"pending": 3, "leased": 0, "done": 3}
+        assert queue.load_results()[1] == [5, 6]
+        queue.close()
+
+
+def main():
+    print("🧪 分布式任务队列测试")
+    print("=" * 40)
+    test_tasks_are_leased_once()
+    print("✅ 每个任务只能被一个工作进程租用")
+    test_expired_lease_is_taken_over()
+    print("✅ 过期的租约可以被接手")
+    test_release_returns_task_to_pending()
+    print("✅ 放弃的租约立即回到待处理状态")
+    test_merge_deduplicates_and_reports_missing()
+    print("✅ 分片合并去重并报告缺少的游戏")
+    test_failed_game_requeues_range()
+    print("✅ 游戏失败时区间放回队列重试")
+    test_repeatedly_failing_range_is_not_completed()
+    print("✅ 反复失败的区间不标记完成")
+    print("🎉 分布式任务队列测试通过")
+
+
+if __name__ == "__main__":
+    main()
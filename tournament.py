@@ -0,0 +1,204 @@
+"""
+跳一跳游戏 - 推荐策略锦标赛
+所有参赛策略（strategies.py 中注册的名字）在相同种子的平台序列上各玩同样多场游戏，
+每个策略在独立的进程中运行（--split 可以把每个策略的游戏再分给多个进程），
+最后打印积分榜：平均得分、跳跃成功率、每次决策的耗时、每场游戏的模型调用次数和成本。
+
+请求模型的策略（llm、cached_llm、knn）默认使用本地替身模型（fake_gemini.py），不产生费用，
+此时决策耗时只反映替身的设定延迟；指定 --api-key 后请求真实的Gemini。
+
+用法:
+    python tournament.py                                           # heuristic、solver、table
+    python tournament.py --strategies solver,table,llm,cached_llm,knn --games 500
+    python tournament.py --strategies solver,table --set table.resolution=2 --set solver.step=0.5
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import strategies
+from replay import parse_options
+
+REPORT_FILE = "tournament_report.json"
+DEFAULT_STRATEGIES = "heuristic,solver,table"
+# 成本估算（美元），按 Gemini Flash 的公开价格，价格变化时修改
+PRICE_PER_MTOK_INPUT = 0.30
+PRICE_PER_MTOK_OUTPUT = 2.50
+OUTPUT_TOKENS_PER_CALL = 5  # 只回答一个数字
+
+
+def play_games(name, options, first_game, count, seed, max_jumps):
+    """
+    在子进程中用 GameSimulator 玩 count 场游戏（物理计算模式，不连接AI服务），
+    返回 (每场得分, 跳跃次数, 成功次数, 决策次数, 决策总耗时, 模型用量)
+    """
+    import batch_ai_test
+
+    batch_ai_test.USE_AI_MODE = False
+    simulator = batch_ai_test.GameSimulator(seed=seed, policy=name, policy_options=options)
+    strategy = simulator.strategy
+    timing = {"decisions": 0, "seconds": 0.0}
+
+    def timed(player_pos, target_platform):
+        start = time.perf_counter()
+        power = strategy(player_pos, target_platform)
+        timing["seconds"] += time.perf_counter() - start
+        timing["decisions"] += 1
+        return power
+
+    simulator.strategy = timed
+    scores, jumps, successes = [], 0, 0
+    # 逐跳的推荐日志对积分榜没有意义
+    with contextlib.redirect_stdout(io.StringIO()):
+        for game_id in range(first_game, first_game + count):
+            result = simulator.play_single_game(game_id, max_jumps=max_jumps)
+            scores.append(result["score"])
+            jumps += result["jumps_count"]
+            successes += result["jumps"].success_count
+    usage = strategy.usage() if hasattr(strategy, "usage") else None
+    return scores, jumps, successes, timing["decisions"], timing["seconds"], usage
+
+
+def run_tournament(names, options, games, seed, max_jumps, split=1, workers=None):
+    """每个策略的游戏分成 split 块并行进行，返回 {策略: 统计}"""
+    size = -(-games // split)
+    tasks = [
+        (name, first, min(size, games - first + 1))
+        for name in names
+        for first in range(1, games + 1, size)
+    ]
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(play_games, name, options[name], first, count, seed, max_jumps)
+            for name, first, count in tasks
+        ]
+        parts = {}
+        for (name, _, _), future in zip(tasks, futures):
+            parts.setdefault(name, []).append(future.result())
+
+    table = {}
+    for name in names:
+        scores, jumps, successes, decisions, seconds = [], 0, 0, 0, 0.0
+        model_calls, prompt_tokens, uses_model = 0, 0.0, False
+        for part in parts[name]:
+            scores += part[0]
+            jumps += part[1]
+            successes += part[2]
+            decisions += part[3]
+            seconds += part[4]
+            if part[5] is not None:
+                uses_model = True
+                model_calls += part[5]["model_calls"]
+                prompt_tokens += part[5]["prompt_tokens"]
+        cost = (
+            prompt_tokens * PRICE_PER_MTOK_INPUT
+            + model_calls * OUTPUT_TOKENS_PER_CALL * PRICE_PER_MTOK_OUTPUT
+        ) / 1e6
+        table[name] = {
+            "games": len(scores),
+            "average_score": statistics.mean(scores),
+            "score_stdev": statistics.stdev(scores) if len(scores) > 1 else 0.0,
+            "max_score": max(scores),
+            "success_rate": successes / jumps if jumps else 0.0,
+            "ms_per_decision": seconds / decisions * 1000 if decisions else 0.0,
+            "model_calls_per_game": model_calls / len(scores) if uses_model else None,
+            "cost_per_game": cost / len(scores) if uses_model else 0.0,
+        }
+    return table
+
+
+def print_league_table(table):
+    ranking = sorted(table.items(), key=lambda item: -item[1]["average_score"])
+    print("\n🏆 积分榜")
+    print("=" * 92)
+    print(
+        f"{'名次':<4}{'策略':<12}{'平均得分':>10}{'标准差':>9}{'最高':>7}"
+        f"{'成功率':>10}{'ms/决策':>10}{'调用/场':>9}{'成本/场($)':>13}"
+    )
+    print("-" * 92)
+    for rank, (name, row) in enumerate(ranking, 1):
+        calls = row["model_calls_per_game"]
+        print(
+            f"{rank:<6}{name:<12}{row['average_score']:>12.1f}{row['score_stdev']:>11.1f}"
+            f"{row['max_score']:>9}{row['success_rate']:>12.2%}{row['ms_per_decision']:>11.3f}"
+            f"{'-' if calls is None else format(calls, '.1f'):>11}{row['cost_per_game']:>15.6f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推荐策略锦标赛")
+    parser.add_argument(
+        "--strategies",
+        default=DEFAULT_STRATEGIES,
+        help=f"逗号分隔的参赛策略（可选: {', '.join(strategies.STRATEGIES)}）",
+    )
+    parser.add_argument("--games", type=int, default=200, help="每个策略的游戏场数")
+    parser.add_argument("--seed", type=int, default=42, help="场景种子（所有策略相同）")
+    parser.add_argument("--max-jumps", type=int, default=100, help="每场游戏的跳跃上限")
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="策略.选项=值",
+        help="策略选项，如 table.resolution=2、llm.fake_latency_ms=300（可重复）",
+    )
+    parser.add_argument("--split", type=int, default=1, help="每个策略的游戏分给几个进程")
+    parser.add_argument("--workers", type=int, help="最多同时运行的进程数（默认CPU核数）")
+    parser.add_argument("--api-key", help="Gemini API Key（不指定时请求模型的策略使用本地替身）")
+    parser.add_argument("--output", default=REPORT_FILE, help="报告文件（JSON）")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.strategies.split(",") if name.strip()]
+    unknown = [name for name in names if name not in strategies.STRATEGIES]
+    if unknown:
+        parser.error(f"未知的策略: {', '.join(unknown)}")
+    try:
+        options = parse_options(args.set, names)
+    except ValueError as e:
+        parser.error(str(e))
+    for name in names:
+        if strategies.STRATEGIES[name].uses_model:
+            if args.api_key:
+                options[name].setdefault("api_key", args.api_key)
+            else:
+                options[name].setdefault("fake", True)
+
+    print("🏟️  推荐策略锦标赛")
+    print("=" * 50)
+    print(f"   参赛策略: {', '.join(names)}")
+    print(f"   每个策略 {args.games} 场，场景种子 {args.seed}，跳跃上限 {args.max_jumps}")
+    start = time.perf_counter()
+    table = run_tournament(
+        names, options, args.games, args.seed, args.max_jumps, args.split, args.workers
+    )
+    elapsed = time.perf_counter() - start
+    print_league_table(table)
+    print(f"\n⏱️  总耗时 {elapsed:.1f} 秒")
+
+    # API Key 不写入报告
+    for name in names:
+        options[name].pop("api_key", None)
+    report = {
+        "strategies": names,
+        "options": options,
+        "games": args.games,
+        "seed": args.seed,
+        "max_jumps": args.max_jumps,
+        "elapsed_s": elapsed,
+        "table": table,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 报告已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,642 @@
+"""
+跳一跳游戏 - 向量化多局游戏引擎
+用 NumPy 数组同时推进成千上万场相互独立的游戏（平台、玩家位置、得分、存活掩码），
+每一轮向向量化策略批量索取所有存活游戏的力度，并一次性模拟全部跳跃。
+
+物理常数、平台分布和逐步的浮点运算顺序与 GameSimulator / jump_physics 完全一致，
+因此使用相同的场景种子或语料时，得到的每场游戏结果与逐场模拟相同。
+
+用法:
+    python vector_engine.py --games 100000                  # 物理计算策略，吞吐量测试
+    python vector_engine.py --games 2000 --seed 42 --verify 200   # 与 GameSimulator 逐场比对
+    python vector_engine.py --games 10000 --policy solver --solver-step 0.1 --solver-max-power 10
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+import physics_jit
+from jump_log import JumpLog
+from jump_physics import (
+    DEFAULT_CONFIG,
+    DEFAULT_HEURISTIC,
+    MAX_POWER,
+    MAX_STEPS,
+    MIN_POWER,
+    heuristic_for,
+    landing_x,
+    load_heuristic_profile,
+    step_digits,
+)
+from scenarios import platform_block, uniforms_to_platforms
+from strategies import SOLVER_MAX_POWER, SOLVER_STEP
+
+# 与 GameSimulator.play_single_game 相同的初始状态
+START_PLAYER = (100, 300)
+START_PLATFORM_X = 50
+
+MAX_JUMPS = 100
+BATCH_SIZE = 65536  # 每批同时推进的游戏数，限制内存占用
+SOLVER_CHUNK = 8  # 求解器每次同时模拟的候选力度数
+
+# 逐跳记录中的浮点列，顺序与 _run_batch 中的取值一致
+FLOAT_COLUMNS = (
+    "player_x",
+    "player_y",
+    "target_left",
+    "target_y",
+    "target_right",
+    "power",
+    "final_x",
+    "final_y",
+)
+
+
+def simulate_jumps(
+    power, player_x, player_y, plat_left, plat_top, plat_right, config=DEFAULT_CONFIG
+):
+    """
+    jump_physics.simulate_jump 的向量化版本，参数可以是任意可广播的数组。
+    返回 (是否成功, 最终x, 最终y, 步数) 四个与广播形状相同的数组。
+    已结束的跳跃会从工作数组中移除，剩余的计算量随存活跳跃数减少。
+    """
+    arrays = np.broadcast_arrays(
+        power, player_x, player_y, plat_left, plat_top, plat_right
+    )
+    shape = arrays[0].shape
+    power, x, y, left, top, right = (
+        np.array(a, dtype=np.float64).ravel() for a in arrays
+    )
+    n = power.size
+
+    success = np.zeros(n, dtype=bool)
+    final_x = np.empty(n)
+    final_y = np.empty(n)
+    steps = np.full(n, MAX_STEPS, dtype=np.int32)
+
+    gravity = config.gravity
+    half = config.player_size / 2
+    platform_height = config.platform_height
+    fall_limit = config.canvas_height + 50
+
+    vx = power * config.vx_multiplier
+    vy = power * config.vy_multiplier
+    index = np.arange(n)
+
+    for step in range(MAX_STEPS):
+        if not index.size:
+            break
+        x += vx
+        y += vy
+        vy += gravity
+
+        fell = y > fall_limit
+        descending = vy > 0
+        if descending.any():
+            # 仅在下落过程中检查碰撞
+            player_bottom = y + half
+            landed = (
+                ~fell
+                & descending
+                & (x + half >= left)
+                & (x - half <= right)
+                & (player_bottom >= top)
+                & (player_bottom <= top + platform_height)
+                & (np.abs(player_bottom - top) <= 10)
+                & (x >= left)
+                & (x <= right)
+            )
+        else:
+            landed = descending
+        done = fell | landed
+        if done.any():
+            ended = index[done]
+            success[ended] = landed[done]
+            final_x[ended] = x[done]
+            final_y[ended] = np.where(landed[done], top[done] - half, y[done])
+            steps[ended] = step
+
+            keep = ~done
+            index = index[keep]
+            x, y, vx, vy = x[keep], y[keep], vx[keep], vy[keep]
+            left, top, right = left[keep], top[keep], right[keep]
+
+    # 超过最大步数仍未结束
+    final_x[index] = x
+    final_y[index] = y
+
+    return (
+        success.reshape(shape),
+        final_x.reshape(shape),
+        final_y.reshape(shape),
+        steps.reshape(shape),
+    )
+
+
+def physics_policy(
+    player_x,
+    player_y,
+    plat_left,
+    plat_top,
+    plat_right,
+    config=DEFAULT_CONFIG,
+    coefficients=DEFAULT_HEURISTIC,
+):
+    """jump_physics.heuristic_power（GameSimulator.calculate_physics_recommendation）的向量化版本"""
+    dx = (plat_left + plat_right) / 2 - player_x
+    dy = plat_top - player_y
+    distance = np.sqrt(dx * dx + dy * dy)
+    base_power = np.minimum(
+        MAX_POWER, np.maximum(MIN_POWER, distance / coefficients.distance_divisor)
+    )
+    base_power = np.where(
+        dy < 0,
+        base_power + np.abs(dy) / coefficients.up_divisor,
+        base_power - dy / coefficients.down_divisor,
+    )
+    base_power = np.clip(base_power, MIN_POWER, MAX_POWER)
+    if coefficients.power_step == 1:
+        return np.floor(base_power)
+    step = coefficients.power_step
+    return np.round(np.floor(base_power / step) * step, step_digits(step))
+
+
+def power_grid(step=1, max_power=MAX_POWER):
+    """与 jump_physics.solve_power 相同的候选力度：MIN_POWER 到 max_power，间隔 step"""
+    count = int(round((max_power - MIN_POWER) / step))
+    return np.array([MIN_POWER + i * step for i in range(count + 1)], dtype=np.float64)
+
+
+def _winning_mask(player_pos, target_platform, config, step, max_power):
+    """返回 (候选力度, 每个候选是否成功着陆)"""
+    candidates = power_grid(step, max_power)
+    px, py = player_pos
+    plat_left, plat_top, plat_right = target_platform
+    success, _, _, _ = simulate_jumps(
+        candidates, px, py, plat_left, plat_top, plat_right, config
+    )
+    return candidates, success
+
+
+def winning_powers(
+    player_pos, target_platform, config=DEFAULT_CONFIG, step=1, max_power=MAX_POWER
+):
+    """一次向量化模拟全部候选力度，返回能成功着陆的力度（升序数组）"""
+    candidates, success = _winning_mask(player_pos, target_platform, config, step, max_power)
+    return candidates[success]
+
+
+def winning_runs(
+    player_pos, target_platform, config=DEFAULT_CONFIG, step=1, max_power=MAX_POWER
+):
+    """
+    获胜力度按候选是否相邻分成连续段，返回 [(段内最小力度, 段内最大力度), ...]（升序）。
+    获胜力度不一定连续：模拟按时间步推进，落点随力度的变化不是单调的
+    """
+    candidates, success = _winning_mask(player_pos, target_platform, config, step, max_power)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], success.astype(np.int8), [0]))))
+    return [
+        (float(candidates[start]), float(candidates[end - 1]))
+        for start, end in zip(edges[::2], edges[1::2])
+    ]
+
+
+def landing_margin(
+    power, player_pos, target_platform, config=DEFAULT_CONFIG, step=1, max_power=MAX_POWER
+):
+    """
+    一次跳跃的落点余量，返回 (获胜力度下界, 上界, 区间宽度, 落点偏差, 间断数)。
+    区间是所选力度所在的获胜力度连续段（所选力度不在任何段内时取最近的一段），
+    两端各向外扩展半个 step，宽度为段内获胜力度个数 × step；间断数为获胜力度的连续段数减一。
+    没有获胜力度时上下界为 nan、宽度和间断数为 0；落点偏差为下落到平台顶面高度时与平台中心的水平距离（像素）
+    """
+    runs = winning_runs(player_pos, target_platform, config, step, max_power)
+    if runs:
+        low, high = min(
+            ((first - step / 2, last + step / 2) for first, last in runs),
+            key=lambda run: max(run[0] - power, power - run[1], 0),
+        )
+        width = high - low
+    else:
+        low = high = math.nan
+        width = 0
+    error = landing_x(power, player_pos, target_platform, config) - (
+        target_platform[0] + target_platform[2]
+    ) / 2
+    return low, high, width, error, max(len(runs) - 1, 0)
+
+
+def make_solver_policy(step=SOLVER_STEP, max_power=SOLVER_MAX_POWER, jit=False):
+    """
+    jump_physics.solve_power 的批量版本，无解时退回物理计算策略（系数来自启发式系数配置）。
+    jit=True 且JIT内核（physics_jit）可用时逐场求解，否则用NumPy广播逐块枚举候选力度。
+    """
+    profile = load_heuristic_profile()
+    candidates = power_grid(step, max_power)
+
+    def solver_policy(
+        player_x, player_y, plat_left, plat_top, plat_right, config=DEFAULT_CONFIG
+    ):
+        # 有JIT内核时逐场求解，提前结束的轨迹不会浪费计算
+        best_index = None
+        if jit:
+            best_index = physics_jit.solve_powers(
+                player_x, player_y, plat_left, plat_top, plat_right, config, step, max_power
+            )
+        if best_index is not None:
+            best_power = np.where(best_index >= 0, candidates[best_index], np.nan)
+        else:
+            best_power = broadcast_solve(
+                player_x, player_y, plat_left, plat_top, plat_right, config
+            )
+        missing = np.isnan(best_power)
+        if missing.any():
+            best_power[missing] = physics_policy(
+                player_x[missing],
+                player_y[missing],
+                plat_left[missing],
+                plat_top[missing],
+                plat_right[missing],
+                config,
+                heuristic_for(config, profile),
+            )
+        return best_power
+
+    def broadcast_solve(player_x, player_y, plat_left, plat_top, plat_right, config):
+        n = player_x.shape[0]
+        best_power = np.full(n, np.nan)
+        best_error = np.full(n, np.inf)
+        # 每场游戏一行、每个候选力度一列
+        px, py = player_x[:, None], player_y[:, None]
+        left, top, right = plat_left[:, None], plat_top[:, None], plat_right[:, None]
+        center = (left + right) / 2
+        for start in range(0, candidates.size, SOLVER_CHUNK):
+            chunk = candidates[start : start + SOLVER_CHUNK]
+            success, final_x, _, _ = simulate_jumps(
+                chunk[None, :], px, py, left, top, right, config
+            )
+            error = np.where(success, np.abs(final_x - center), np.inf)
+            # 与参考实现一样，误差相同时保留较小的力度
+            for j in range(chunk.size):
+                better = error[:, j] < best_error
+                best_error[better] = error[better, j]
+                best_power[better] = chunk[j]
+        return best_power
+
+    return solver_policy
+
+
+def make_physics_policy(coefficients=None):
+    """
+    物理计算策略。coefficients 为 None 时与 GameSimulator 一样，
+    按物理参数从启发式系数配置中选择系数
+    """
+    profile = load_heuristic_profile() if coefficients is None else None
+
+    def policy(player_x, player_y, plat_left, plat_top, plat_right, config=DEFAULT_CONFIG):
+        return physics_policy(
+            player_x,
+            player_y,
+            plat_left,
+            plat_top,
+            plat_right,
+            config,
+            coefficients if profile is None else heuristic_for(config, profile),
+        )
+
+    return policy
+
+
+# 策略名 -> 策略工厂
+VECTOR_POLICIES = {
+    "physics": make_physics_policy,
+    "solver": make_solver_policy,
+}
+
+
+class VectorResults:
+    """一批游戏的结果（按游戏编号排列的数组），可转换为 play_single_game 的结果格式"""
+
+    def __init__(self, game_ids, scores, jumps_count, success_count, columns=None):
+        self.game_ids = game_ids
+        self.scores = scores
+        self.jumps_count = jumps_count
+        self.success_count = success_count
+        # 逐跳记录：{列名: (游戏数, 跳跃上限) 数组}，未记录时为 None
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.game_ids)
+
+    def jump_log(self, i):
+        """第 i 场游戏的逐跳记录（JumpLog）"""
+        n = int(self.jumps_count[i])
+        return JumpLog.from_columns(
+            **{name: values[i, :n] for name, values in self.columns.items()}
+        )
+
+    def to_results(self, ai_mode=False):
+        results = []
+        for i, game_id in enumerate(self.game_ids.tolist()):
+            jumps_count = int(self.jumps_count[i])
+            results.append(
+                {
+                    "game_id": game_id,
+                    "score": int(self.scores[i]),
+                    "jumps_count": jumps_count,
+                    "success_rate": (
+                        int(self.success_count[i]) / jumps_count
+                        if jumps_count
+                        else 0
+                    ),
+                    "jumps": (
+                        self.jump_log(i) if self.columns is not None else JumpLog()
+                    ),
+                    "ai_mode": ai_mode,
+                }
+            )
+        return results
+
+
+class ArrayPlatforms:
+    """预先给定的平台数组（如场景语料），形状为 (游戏数, 平台数)"""
+
+    def __init__(self, distances, heights):
+        self.distances = distances
+        self.heights = heights
+
+    def column(self, rows, index):
+        return self.distances[rows, index], self.heights[rows, index]
+
+
+class SeededPlatforms:
+    """
+    按种子生成的平台：只为仍然存活的游戏按块生成后续平台，
+    与 PlatformStream 的序列一致。同一轮存活的游戏已生成的平台数总是相同的。
+    """
+
+    CHUNK = 8
+
+    def __init__(self, seed, game_ids, num_platforms):
+        self.seed = seed
+        self.game_ids = np.asarray(game_ids)
+        # np.empty 不会立即占用物理内存，提前结束的游戏后面的平台不会被生成
+        self.distances = np.empty((len(game_ids), num_platforms))
+        self.heights = np.empty((len(game_ids), num_platforms))
+
+    def column(self, rows, index):
+        if index % self.CHUNK == 0:
+            count = min(self.CHUNK, self.distances.shape[1] - index)
+            distances, heights = platform_block(
+                self.seed, self.game_ids[rows].tolist(), index, count
+            )
+            self.distances[rows, index : index + count] = distances
+            self.heights[rows, index : index + count] = heights
+        return self.distances[rows, index], self.heights[rows, index]
+
+
+class RandomPlatforms:
+    """不可复现的随机平台，每轮只为存活的游戏抽取"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def column(self, rows, index):
+        return uniforms_to_platforms(self.rng.random((len(rows), 2)))
+
+
+class VectorGameEngine:
+    """
+    以批为单位锁步推进多场游戏。
+
+    policy: VECTOR_POLICIES 中的名字；
+    policy_options 传给策略工厂（如 solver 的 step、max_power）
+    """
+
+    def __init__(
+        self, config=DEFAULT_CONFIG, policy="physics", max_jumps=MAX_JUMPS, **policy_options
+    ):
+        if policy not in VECTOR_POLICIES:
+            raise ValueError(f"未知的向量化策略: {policy}")
+        self.config = config
+        self.policy_name = policy
+        self.policy_options = policy_options
+        self.policy = VECTOR_POLICIES[policy](**policy_options)
+        self.max_jumps = max_jumps
+
+    def run(
+        self,
+        num_games,
+        seed=None,
+        corpus=None,
+        first_game_id=1,
+        record_jumps=False,
+        batch_size=BATCH_SIZE,
+    ):
+        """
+        进行 num_games 场游戏。平台来源：语料 > 种子 > 不可复现的随机数，
+        与 GameSimulator 相同的来源得到相同的平台序列。
+        """
+        rng = np.random.default_rng()
+        parts = []
+        for start in range(0, num_games, batch_size):
+            count = min(batch_size, num_games - start)
+            game_ids = np.arange(first_game_id + start, first_game_id + start + count)
+            if corpus is not None:
+                platforms = self._corpus_platforms(corpus, game_ids)
+            elif seed is not None:
+                platforms = SeededPlatforms(seed, game_ids, self.max_jumps)
+            else:
+                platforms = RandomPlatforms(rng)
+            parts.append(self._run_batch(game_ids, platforms, record_jumps))
+
+        columns = None
+        if record_jumps:
+            columns = {
+                name: np.concatenate([p.columns[name] for p in parts])
+                for name in parts[0].columns
+            }
+        return VectorResults(
+            np.concatenate([p.game_ids for p in parts]),
+            np.concatenate([p.scores for p in parts]),
+            np.concatenate([p.jumps_count for p in parts]),
+            np.concatenate([p.success_count for p in parts]),
+            columns,
+        )
+
+    def _corpus_platforms(self, corpus, game_ids):
+        first, count = int(game_ids[0]), len(game_ids)
+        subset = corpus.slice(first, first + count)
+        if len(subset) < count or subset.distances.shape[1] < self.max_jumps:
+            raise ValueError(
+                f"场景语料不足：需要游戏 {first}~{first + count - 1}、"
+                f"每场至少 {self.max_jumps} 个平台"
+            )
+        return ArrayPlatforms(subset.distances, subset.heights)
+
+    def _run_batch(self, game_ids, platforms, record_jumps):
+        config = self.config
+        count = len(game_ids)
+        width = config.platform_width
+        half_canvas = config.canvas_width / 2
+
+        # 世界坐标中的玩家、相机和目标平台
+        alive = np.arange(count)
+        distances, heights = platforms.column(alive, 0)
+        player_x = np.full(count, START_PLAYER[0], dtype=np.float64)
+        player_y = np.full(count, START_PLAYER[1], dtype=np.float64)
+        camera_x = np.zeros(count)
+        target_x = START_PLATFORM_X + distances
+        target_y = np.array(heights, dtype=np.float64)
+
+        scores = np.zeros(count, dtype=np.int64)
+        jumps_count = np.zeros(count, dtype=np.int64)
+        success_count = np.zeros(count, dtype=np.int64)
+
+        columns = None
+        if record_jumps:
+            shape = (count, self.max_jumps)
+            columns = {name: np.zeros(shape) for name in FLOAT_COLUMNS}
+            columns["success"] = np.zeros(shape, dtype=np.int8)
+            columns["steps"] = np.zeros(shape, dtype=np.int32)
+
+        for jump in range(self.max_jumps):
+            if not alive.size:
+                break
+            # 推荐和模拟都使用屏幕坐标
+            cam = camera_x[alive]
+            px = player_x[alive] - cam
+            py = player_y[alive]
+            left = target_x[alive] - cam
+            top = target_y[alive]
+            right = target_x[alive] + width - cam
+
+            power = self.policy(px, py, left, top, right, config)
+            success, final_x, final_y, steps = simulate_jumps(
+                power, px, py, left, top, right, config
+            )
+
+            if record_jumps:
+                values = (px, py, left, top, right, power, final_x, final_y)
+                for name, value in zip(FLOAT_COLUMNS, values):
+                    columns[name][alive, jump] = value
+                columns["success"][alive, jump] = success
+                columns["steps"][alive, jump] = steps
+
+            jumps_count[alive] += 1
+            landed = alive[success]
+            scores[landed] += 10
+            success_count[landed] += 1
+
+            # 成功着陆：更新玩家世界坐标、相机和下一个目标平台
+            landed_x = final_x[success]
+            player_x[landed] = landed_x + camera_x[landed]
+            player_y[landed] = final_y[success]
+            scroll = landed[landed_x > half_canvas]
+            camera_x[scroll] = player_x[scroll] - half_canvas
+            if jump + 1 < self.max_jumps and landed.size:
+                distances, heights = platforms.column(landed, jump + 1)
+                target_x[landed] = target_x[landed] + distances
+                target_y[landed] = heights
+            alive = landed
+
+        return VectorResults(game_ids, scores, jumps_count, success_count, columns)
+
+
+def verify_against_simulator(engine, num_games, seed, first_game_id=1):
+    """用 GameSimulator 逐场重放同一批种子场景，返回结果不一致的游戏编号"""
+    import batch_ai_test
+
+    # 同样的策略选项传给 GameSimulator，不修改 batch_ai_test 的全局配置
+    options = dict(engine.policy_options)
+    if engine.policy_name == "solver":
+        policy = "solver"
+        options.setdefault("step", SOLVER_STEP)
+        options.setdefault("max_power", SOLVER_MAX_POWER)
+    else:
+        policy = "heuristic"
+    simulator = batch_ai_test.GameSimulator(
+        seed=seed, config=engine.config, policy=policy, policy_options=options
+    )
+    results = engine.run(
+        num_games, seed=seed, first_game_id=first_game_id, record_jumps=True
+    )
+    mismatched = []
+    # 只使用物理计算（AI模式会探测服务），结束后恢复
+    use_ai_mode, batch_ai_test.USE_AI_MODE = batch_ai_test.USE_AI_MODE, False
+    try:
+        for i in range(num_games):
+            game_id = first_game_id + i
+            reference = simulator.play_single_game(game_id, max_jumps=engine.max_jumps)
+            if list(reference["jumps"]) != list(results.jump_log(i)):
+                mismatched.append(game_id)
+    finally:
+        batch_ai_test.USE_AI_MODE = use_ai_mode
+    return mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量化多局游戏引擎")
+    parser.add_argument("--games", type=int, default=100000, help="游戏场数")
+    parser.add_argument("--seed", type=int, help="场景种子（默认不可复现）")
+    parser.add_argument("--policy", choices=sorted(VECTOR_POLICIES), default="physics")
+    parser.add_argument(
+        "--solver-step", type=float, default=SOLVER_STEP, help="solver策略的力度间隔"
+    )
+    parser.add_argument(
+        "--solver-max-power",
+        type=float,
+        default=SOLVER_MAX_POWER,
+        help="solver策略的最大力度",
+    )
+    parser.add_argument("--max-jumps", type=int, default=MAX_JUMPS, help="每场游戏的跳跃上限")
+    parser.add_argument(
+        "--jit", action="store_true", help="solver策略使用JIT物理内核（需要安装numba）"
+    )
+    parser.add_argument(
+        "--verify", type=int, default=0, help="与 GameSimulator 逐场比对的游戏数（需要 --seed）"
+    )
+    args = parser.parse_args()
+
+    options = {}
+    if args.policy == "solver":
+        step = args.solver_step
+        options = {
+            "step": int(step) if step.is_integer() else step,
+            "max_power": args.solver_max_power,
+            "jit": args.jit,
+        }
+    engine = VectorGameEngine(policy=args.policy, max_jumps=args.max_jumps, **options)
+
+    start = time.perf_counter()
+    results = engine.run(args.games, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    total_jumps = int(results.jumps_count.sum())
+    print("⚡ 向量化引擎结果")
+    print("=" * 50)
+    print(f"   策略: {args.policy}，游戏数: {len(results)}，总跳跃: {total_jumps}")
+    print(f"   耗时: {elapsed:.2f} 秒")
+    print(
+        f"   吞吐量: {len(results) / elapsed:,.0f} 场/秒，"
+        f"{total_jumps / elapsed:,.0f} 跳/秒"
+    )
+    print(f"   平均得分: {results.scores.mean():.1f}，最高得分: {results.scores.max()}")
+
+    if args.verify:
+        if args.seed is None:
+            print("⚠️  逐场比对需要 --seed")
+            return 1
+        mismatched = verify_against_simulator(engine, args.verify, args.seed)
+        if mismatched:
+            print(f"❌ {len(mismatched)} 场游戏与 GameSimulator 不一致: {mismatched[:10]}")
+            return 1
+        print(f"✅ 前 {args.verify} 场游戏与 GameSimulator 逐跳一致")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+"""
+跳一跳游戏 - 分布式批量测试的共享任务队列
+任务是连续的游戏编号区间，保存在一个 SQLite 文件中（放在共享存储上即可让多台机器共用）。
+工作进程租用（lease）一个区间后必须在租期内续租，进程崩溃或失联后租约过期，
+区间会被其他工作进程重新租用。每个工作进程把结果写入自己的分片（JSONL），
+全部区间完成后由协调进程合并成一份报告。
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    first_game INTEGER NOT NULL,
+    last_game INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started REAL,
+    finished REAL
+);
+"""
+
+
+class WorkQueue:
+    """
+    基于 SQLite 的租约队列。任务状态: pending -> leased -> done；
+    leased 状态的任务租约过期后视同 pending。
+    """
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"找不到任务队列: {path}")
+        self.path = path
+        # isolation_level=None: 由我们自己控制事务（BEGIN IMMEDIATE 保证租用是原子的）
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+
+    @classmethod
+    def create(cls, path, total_games, chunk_size, settings):
+        """把 1..total_games 切成每段 chunk_size 场的任务，settings 为运行配置"""
+        if os.path.exists(path):
+            raise FileExistsError(f"任务队列已存在: {path}")
+        db = sqlite3.connect(path, isolation_level=None)
+        db.executescript(SCHEMA)
+        db.execute("BEGIN")
+        db.execute(
+            "INSERT INTO meta VALUES ('settings', ?)",
+            (json.dumps(settings, ensure_ascii=False),),
+        )
+        db.execute("INSERT INTO meta VALUES ('created', ?)", (repr(time.time()),))
+        db.executemany(
+            "INSERT INTO tasks (first_game, last_game) VALUES (?, ?)",
+            [
+                (first, min(first + chunk_size - 1, total_games))
+                for first in range(1, total_games + 1, chunk_size)
+            ],
+        )
+        db.execute("COMMIT")
+        db.close()
+        return cls(path)
+
+    @property
+    def settings(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+        return json.loads(row[0])
+
+    @property
+    def shard_dir(self):
+        """分片目录：与队列文件同名、去掉扩展名再加 _shards"""
+        return os.path.splitext(self.path)[0] + "_shards"
+
+    def lease(self, worker, lease_seconds):
+        """租用一个待处理（或租约已过期）的任务，返回 (任务id, 第一场, 最后一场)，没有可租任务时返回 None"""
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute(
+                "SELECT id, first_game, last_game FROM tasks "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                self.db.execute(
+                    "UPDATE tasks SET state = 'leased', worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, started = COALESCE(started, ?) WHERE id = ?",
+                    (worker, now + lease_seconds, now, row[0]),
+                )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return row
+
+    def renew(self, task_id, worker, lease_seconds):
+        """续租；任务已被别的工作进程接手（或已完成）时返回 False"""
+        cursor = self.db.execute(
+            "UPDATE tasks SET lease_expires = ? "
+            "WHERE id = ? AND worker = ? AND state = 'leased'",
+            (time.time() + lease_seconds, task_id, worker),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id, worker):
+        """标记任务完成；租约已转给别的工作进程时返回 False（结果以先完成者为准）"""
+        cursor = self.db.execute(
+            "UPDATE tasks SET state = 'done', finished = ? "
+            "WHERE id = ? AND worker = ? AND state = 'leased'",
+            (time.time(), task_id, worker),
+        )
+        return cursor.rowcount == 1
+
+    def release(self, task_id, worker):
+        """放弃租约（例如工作进程被中断），任务立即回到待处理状态"""
+        self.db.execute(
+            "UPDATE tasks SET state = 'pending', worker = NULL, lease_expires = NULL "
+            "WHERE id = ? AND worker = ? AND state = 'leased'",
+            (task_id, worker),
+        )
+
+    def attempts(self, task_id):
+        """任务被租用过的次数（包括当前这次）"""
+        return self.db.execute("SELECT attempts FROM tasks WHERE id = ?", (task_id,)).fetchone()[0]
+
+    def progress(self):
+        """返回各状态的游戏场数，如 {'pending': 100, 'leased': 50, 'done': 850}"""
+        counts = {"pending": 0, "leased": 0, "done": 0}
+        for state, games in self.db.execute(
+            "SELECT state, SUM(last_game - first_game + 1) FROM tasks GROUP BY state"
+        ):
+            counts[state] = games
+        return counts
+
+    def finished(self):
+        return self.progress()["done"] == self.total_games()
+
+    def total_games(self):
+        return self.db.execute("SELECT MAX(last_game) FROM tasks").fetchone()[0]
+
+    def elapsed(self):
+        """从第一个任务开始到最后一个任务完成的时间（秒）"""
+        started, finished = self.db.execute(
+            "SELECT MIN(started), MAX(finished) FROM tasks"
+        ).fetchone()
+        return 0.0 if started is None or finished is None else finished - started
+
+    def workers(self):
+        """完成每个任务的工作进程 {工作进程: 完成的场数}"""
+        return dict(
+            self.db.execute(
+                "SELECT worker, SUM(last_game - first_game + 1) FROM tasks "
+                "WHERE state = 'done' GROUP BY worker ORDER BY worker"
+            )
+        )
+
+    def load_results(self):
+        """
+        合并所有分片，返回 (按游戏编号排序的结果列表, 缺少结果的游戏编号)。
+        同一场游戏可能因租约过期被执行两次，只保留第一份；写了一半的最后一行会被忽略。
+        """
+        by_id = {}
+        for shard in sorted(glob.glob(os.path.join(self.shard_dir, "*.jsonl"))):
+            with open(shard, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    by_id.setdefault(result["game_id"], result)
+        total = self.total_games()
+        missing = [g for g in range(1, total + 1) if g not in by_id]
+        return [by_id[g] for g in sorted(by_id)], missing
+
+    def close(self):
+        self.db.close()